@@ -0,0 +1,172 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# Keep pygame's import banner out of the --json output
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from monkey_eyes_lib import AnimationState, MonkeyEyeApp, SimulatedClock
+
+"""
+Headless rendering benchmark for the Monkey Eyes library.
+
+Renders N frames of every animation state offscreen, driven by a simulated
+60 fps clock, and reports frames/sec plus the update and draw time per frame.
+A previous JSON report can be passed with --compare to fail on regressions.
+
+Usage:
+    python benchmark_eyes.py --frames 600
+    python benchmark_eyes.py --json > baseline.json
+    python benchmark_eyes.py --compare baseline.json --max-slowdown 0.2
+    python benchmark_eyes.py --compare-backends --software-renderer
+"""
+
+# How each state is (re)started whenever the animation falls back to IDLE,
+# so every measured frame is spent in the benchmarked state.
+STATE_TRIGGERS = {
+    AnimationState.IDLE: None,
+    AnimationState.BLINKING: lambda animation: animation.trigger_blinking(),
+    AnimationState.LAUGHING: lambda animation: animation.trigger_laugh(),
+    AnimationState.SMILING: lambda animation: animation.trigger_smile(2000),
+    AnimationState.STAR: lambda animation: animation.trigger_star(3000),
+    AnimationState.MOVING: lambda animation: animation.trigger_look(),
+    AnimationState.CONCENTRATING: lambda animation: animation.trigger_concentrate(2000),
+}
+
+
+def benchmark_state(app, state, frames):
+    """Renders `frames` frames of the given state and returns fps and per-frame times in ms."""
+    animation = app.animation
+    trigger = STATE_TRIGGERS[state]
+    update_time = 0.0
+    draw_time = 0.0
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        current_ticks = app.clock.get_ticks()
+        # Keep IDLE from blinking on its own
+        animation.last_blink_time = current_ticks
+        if trigger is not None and animation.current_state == AnimationState.IDLE:
+            trigger(animation)
+
+        t0 = time.perf_counter()
+        animation.update(current_ticks)
+        t1 = time.perf_counter()
+        app._draw_frame()
+        app._present_frame()
+        t2 = time.perf_counter()
+        app.clock.tick(app.target_fps)
+
+        update_time += t1 - t0
+        draw_time += t2 - t1
+    total_time = time.perf_counter() - start
+
+    animation.set_state(AnimationState.IDLE)
+    return {
+        "frames": frames,
+        "fps": frames / total_time if total_time > 0 else float("inf"),
+        "update_ms": update_time * 1000 / frames,
+        "draw_ms": draw_time * 1000 / frames,
+    }
+
+
+def run_benchmark(frames=600, seed=0, **app_options):
+    """Runs the benchmark for all animation states and returns a dict of results per state."""
+    random.seed(seed)
+    app = MonkeyEyeApp(None, headless=True, clock=SimulatedClock(), **app_options)
+    app._initialize_pygame_and_eyes()
+    try:
+        return {state: benchmark_state(app, state, frames) for state in STATE_TRIGGERS}
+    finally:
+        pygame.quit()
+
+
+def print_report(results):
+    print(f"{'state':<15}{'fps':>12}{'update ms':>12}{'draw ms':>12}")
+    for state, result in results.items():
+        print(f"{state:<15}{result['fps']:>12.1f}{result['update_ms']:>12.4f}{result['draw_ms']:>12.4f}")
+
+
+def print_backend_comparison(surface_results, texture_results):
+    print(f"{'state':<15}{'surface fps':>14}{'texture fps':>14}{'speedup':>10}")
+    for state, surface in surface_results.items():
+        texture = texture_results[state]
+        print(f"{state:<15}{surface['fps']:>14.1f}{texture['fps']:>14.1f}{texture['fps'] / surface['fps']:>9.2f}x")
+
+
+def find_regressions(results, baseline, max_slowdown):
+    """Returns the states whose fps dropped by more than `max_slowdown` (fraction) against the baseline."""
+    regressions = []
+    for state, result in results.items():
+        if state not in baseline:
+            continue
+        expected_fps = baseline[state]["fps"]
+        if result["fps"] < expected_fps * (1 - max_slowdown):
+            regressions.append((state, expected_fps, result["fps"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Monkey Eyes rendering per animation state.")
+    parser.add_argument("--frames", type=int, default=600, help="Frames rendered per state (default: 600)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the blink randomness (default: 0)")
+    parser.add_argument("--dirty-rects", action="store_true", help="Benchmark the dirty-rectangle mode")
+    parser.add_argument("--no-sprite-cache", action="store_true", help="Draw the shapes without the sprite cache")
+    parser.add_argument("--frame-based", action="store_true", help="Step animations once per frame")
+    parser.add_argument("--baked", action="store_true", help="Play animations from baked keyframe tracks")
+    parser.add_argument("--render-scale", type=float, default=1.0,
+                        help="Draw at this fraction of the screen resolution and upscale (default: 1.0)")
+    parser.add_argument("--backend", choices=("surface", "texture"), default="surface",
+                        help="Draw with pygame.draw into a Surface or with pygame._sdl2 textures (default: surface)")
+    parser.add_argument("--software-renderer", action="store_true",
+                        help="Use SDL's software renderer for the texture backend")
+    parser.add_argument("--compare-backends", action="store_true",
+                        help="Benchmark both backends and print their frame rates side by side")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="JSON report of a previous run to compare against")
+    parser.add_argument("--max-slowdown", type=float, default=0.2,
+                        help="Allowed fps drop against --compare as a fraction (default: 0.2)")
+    args = parser.parse_args()
+
+    options = {
+        "frames": args.frames,
+        "seed": args.seed,
+        "dirty_rects": args.dirty_rects,
+        "sprite_cache_bytes": 0 if args.no_sprite_cache else 4 * 1024 * 1024,
+        "frame_based_animation": args.frame_based,
+        "baked_animations": args.baked,
+        "render_scale": args.render_scale,
+        "software_renderer": args.software_renderer,
+    }
+    if args.compare_backends:
+        surface_results = run_benchmark(backend="surface", **options)
+        texture_results = run_benchmark(backend="texture", **options)
+        if args.json:
+            print(json.dumps({"surface": surface_results, "texture": texture_results}, indent=2))
+        else:
+            print_backend_comparison(surface_results, texture_results)
+        return
+    results = run_benchmark(backend=args.backend, **options)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.max_slowdown)
+        for state, expected_fps, fps in regressions:
+            print(f"Regression in '{state}': {fps:.1f} fps (baseline {expected_fps:.1f} fps)", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
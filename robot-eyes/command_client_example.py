@@ -0,0 +1,72 @@
+import argparse
+import json
+import socket
+import time
+
+"""
+Local stand-in for a backend driving the eye process's command server
+(`python serve_eyes.py`) over one persistent connection.
+
+Messages are newline-delimited JSON, either one request object or a JSON
+array of requests sent as a batch. Every request is acknowledged with
+{"type": "ack", "id": ...} (or {"type": "error", ...}) as soon as the server
+reads it, and expressions send {"type": "completed", "id": ...,
+"completed": true/false} when they end or are cut off. A WebSocket client
+connects to the same address and sends the same JSON as text frames.
+
+Usage:
+    python command_client_example.py --address tcp:127.0.0.1:8765
+"""
+
+
+def connect(address):
+    kind, _, location = address.partition(":")
+    if kind == "unix":
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(location)
+    else:
+        host, _, port = location.rpartition(":")
+        sock = socket.create_connection((host, int(port)))
+    return sock
+
+
+def read_messages(sock):
+    """Yields the JSON messages of the server, one per line."""
+    buffer = b""
+    while True:
+        data = sock.recv(65536)
+        if not data:
+            return
+        buffer += data
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            yield json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send a batch of expressions to the eye command server.")
+    parser.add_argument("--address", default="tcp:127.0.0.1:8765", help="Server address (default: tcp:127.0.0.1:8765)")
+    args = parser.parse_args()
+
+    sock = connect(args.address)
+    batch = [
+        {"id": 1, "expression": "smile", "duration_ms": 1000},
+        {"id": 2, "sequence": [[1500, "laugh"], [4500, "star", 1000]]},
+        {"id": 3, "query": "latency"},
+    ]
+    sent = time.perf_counter()
+    # One write for the whole batch, replies arrive as they happen
+    sock.sendall(json.dumps(batch).encode() + b"\n")
+
+    waiting = {request["id"] for request in batch if "expression" in request or "query" in request}
+    for message in read_messages(sock):
+        print(f"{(time.perf_counter() - sent) * 1000:8.1f} ms  {message}")
+        if message["type"] != "ack":
+            waiting.discard(message["id"])
+        if not waiting:
+            break
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import pygame
+
+from monkey_eyes_lib import EyeCrowd, SpriteCache
+
+"""
+A wall of 20 x 10 monkeys, animated with the vectorized EyeCrowd.
+Every few seconds a row squints and a column looks sideways.
+Press ESC or close the window to quit.
+"""
+
+if __name__ == "__main__":
+    pygame.init()
+    screen = pygame.display.set_mode((1280, 720))
+    pygame.display.set_caption("Monkey Eyes Crowd")
+    clock = pygame.time.Clock()
+
+    columns, rows = 20, 10
+    crowd = EyeCrowd(columns, rows, screen.get_size(), sprite_cache=SpriteCache())
+    next_event = 2000
+    row = 0
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT: running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE: running = False
+
+        current_time = pygame.time.get_ticks()
+        if current_time >= next_event:
+            crowd.trigger_squint(slice(row * columns, (row + 1) * columns), duration=1500)
+            crowd.trigger_look(slice(row * 2 % columns, None, columns))
+            row = (row + 1) % rows
+            next_event = current_time + 3000
+
+        crowd.update(current_time)
+        screen.fill(crowd.background_color)
+        crowd.draw(screen)
+        pygame.display.flip()
+        clock.tick(60)
+
+    pygame.quit()
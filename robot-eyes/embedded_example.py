@@ -0,0 +1,48 @@
+import pygame
+
+from monkey_eyes_lib import EmbeddedEyes
+
+"""
+The eyes composited into a host pygame UI with EmbeddedEyes: no eye
+process, the host's own loop steps and renders them into a panel.
+Keys: L laugh, S smile, T star, C concentrate, mouse moves the gaze.
+Press ESC or close the window to quit.
+"""
+
+if __name__ == "__main__":
+    pygame.init()
+    screen = pygame.display.set_mode((1280, 720))
+    pygame.display.set_caption("Monkey Eyes Embedded")
+    clock = pygame.time.Clock()
+    font = pygame.font.Font(None, 32)
+
+    panel = pygame.Rect(320, 40, 640, 360)
+    eyes = EmbeddedEyes(size=panel.size)
+    keys = {pygame.K_l: "laugh", pygame.K_s: "smile", pygame.K_t: "star", pygame.K_c: "concentrate"}
+    status = "idle"
+
+    def on_complete(completed):
+        global status
+        status = "finished" if completed else "cut off"
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT: running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE: running = False
+            elif event.type == pygame.KEYDOWN and event.key in keys:
+                status = keys[event.key]
+                eyes.trigger_expression(keys[event.key], on_complete=on_complete)
+            elif event.type == pygame.MOUSEMOTION:
+                x, y = event.pos
+                eyes.set_gaze((x - panel.centerx) / (screen.get_width() / 2),
+                              (y - panel.centery) / (screen.get_height() / 2))
+
+        eyes.step(clock.get_time())
+        screen.fill((40, 40, 60))
+        eyes.render(screen, panel)
+        screen.blit(font.render(f"Expression: {status}", True, (255, 255, 255)), (panel.x, panel.bottom + 20))
+        pygame.display.flip()
+        clock.tick(60)
+
+    pygame.quit()
@@ -27,6 +27,16 @@ if __name__ == "__main__":
         controller.stop_concentrate()
         time.sleep(2)
 
+        print("Playing the same expressions as one frame-accurate sequence")
+        controller.play_sequence([
+            (0, "smile", 2000),
+            (3000, "laugh"),
+            (6000, "star", 3000),
+            (10000, "concentrate", "indefinite"),
+            (14000, "stop_concentrate"),
+        ])
+        time.sleep(16)
+
         print("Idling for one minute")
         time.sleep(60)
 
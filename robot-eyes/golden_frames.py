@@ -0,0 +1,261 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+# Keep pygame's import banner out of the output
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+"""
+Golden-frame visual regression check for the Monkey Eyes rendering.
+
+Renders the full frame sequence of every expression offscreen, with a fixed
+seed for the blink randomness, in the default, dirty-rectangle and baked
+modes, hashes every frame and compares the hashes against the ones stored in
+golden_frames.json. For the first mismatching frame of a scenario a diff
+image (golden | current | changed pixels in red) is written, rendering the
+golden frame with the library of the revision the goldens were taken from.
+
+Usage:
+    python golden_frames.py                  # Check, exit with 1 on mismatch
+    python golden_frames.py --update         # Store new goldens (commit the change first)
+    python golden_frames.py --scenario laugh --reference ../old-checkout
+"""
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_FILE = os.path.join(SCRIPT_DIR, "golden_frames.json")
+SEED = 1234
+
+# App options per rendering mode
+MODES = {
+    "default": {},
+    "dirty_rects": {"dirty_rects": True},
+    "baked": {"baked_animations": True},
+}
+
+# How each scenario is started on the app, and the most frames it may take
+SCENARIOS = {
+    "idle": (None, 300),
+    "blink": (lambda app: app.animation.trigger_blinking(), 120),
+    "look": (lambda app: app.animation.trigger_look(), 400),
+    "laugh": (lambda app: app._process_command(CommandOp.LAUGH), 400),
+    "smile": (lambda app: app._process_command(CommandOp.SMILE, 1000), 120),
+    "star": (lambda app: app._process_command(CommandOp.STAR, 2000), 180),
+    "concentrate": (lambda app: app._process_command(CommandOp.CONCENTRATE, 1500), 180),
+    "gaze": (lambda app: app.animation.set_gaze_target(0.8, -0.5), 60),
+}
+
+# Frames rendered after a scenario returned to IDLE
+SETTLE_FRAMES = 5
+
+# Imported in main(), after --lib is put on the path
+pygame = None
+np = None
+CommandOp = None
+MonkeyEyeApp = None
+SimulatedClock = None
+
+
+def import_library(lib_dir=None):
+    global pygame, np, CommandOp, MonkeyEyeApp, SimulatedClock
+    sys.path.insert(0, lib_dir or SCRIPT_DIR)
+    import monkey_eyes_lib
+    import numpy
+    pygame = monkey_eyes_lib.pygame
+    np = numpy
+    CommandOp = monkey_eyes_lib.CommandOp
+    MonkeyEyeApp = monkey_eyes_lib.MonkeyEyeApp
+    SimulatedClock = monkey_eyes_lib.SimulatedClock
+
+
+def hash_frame(surface):
+    """
+    Hashes the pixels of a frame straight from the surface's own buffer,
+    without copying it. CRC-32 is several times faster than a cryptographic
+    hash on a 1280x720 frame and plenty to tell frames apart.
+    """
+    buffer = surface.get_buffer()
+    digest = f"{zlib.crc32(buffer):08x}"
+    del buffer  # Unlocks the surface
+    return digest
+
+
+def render_scenario(mode, scenario, on_frame):
+    """
+    Renders a scenario frame by frame, calling `on_frame(index, surface)`
+    after every frame until it returns False or the scenario is over.
+    """
+    start, max_frames = SCENARIOS[scenario]
+    random.seed(SEED)
+    app = MonkeyEyeApp(None, headless=True, clock=SimulatedClock(), **MODES[mode])
+    app._initialize_pygame_and_eyes()
+    try:
+        app._run_frame()
+        if start is not None:
+            start(app)
+        settle = SETTLE_FRAMES
+        for index in range(max_frames):
+            if start is not None and app.animation.current_state == "idle" \
+                    and not app.animation.is_gaze_moving():
+                settle -= 1
+                if settle < 0:
+                    break
+            if not app._run_frame():
+                break
+            if on_frame(index, app.screen) is False:
+                break
+    finally:
+        pygame.quit()
+
+
+def render_hashes(modes, scenarios):
+    hashes = {}
+    for mode in modes:
+        for scenario in scenarios:
+            frames = []
+            render_scenario(mode, scenario, lambda index, surface: frames.append(hash_frame(surface)))
+            hashes[f"{mode}/{scenario}"] = frames
+    return hashes
+
+
+def get_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=SCRIPT_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def dump_frame(mode, scenario, frame, path):
+    """Saves frame `frame` of a scenario as an image (used for the golden side of a diff)."""
+    def on_frame(index, surface):
+        if index == frame:
+            pygame.image.save(surface, path)
+            return False
+        return True
+    render_scenario(mode, scenario, on_frame)
+
+
+def render_reference_frame(reference_dir, mode, scenario, frame, path):
+    """Renders a golden frame with the library in `reference_dir` in a separate interpreter."""
+    command = [sys.executable, os.path.abspath(__file__), "--lib", reference_dir,
+               "--dump", mode, scenario, str(frame), path]
+    return subprocess.run(command, capture_output=True).returncode == 0 and os.path.exists(path)
+
+
+def write_diff_image(golden_path, mode, scenario, frame, output_path):
+    """Writes golden | current | changed pixels (red) side by side."""
+    current = {}
+
+    def on_frame(index, surface):
+        if index == frame:
+            current["pixels"] = pygame.surfarray.array3d(surface)
+            return False
+        return True
+    render_scenario(mode, scenario, on_frame)
+    pygame.init()
+    golden = pygame.surfarray.array3d(pygame.image.load(golden_path))
+    pixels = current["pixels"]
+    changed = np.zeros_like(pixels)
+    changed[(golden != pixels).any(axis=2)] = (255, 0, 0)
+    pygame.image.save(pygame.surfarray.make_surface(np.concatenate((golden, pixels, changed))), output_path)
+    pygame.quit()
+
+
+def get_reference_dir(args, revision, temp_dir):
+    """Returns a directory with the golden revision of the library, or None."""
+    if args.reference:
+        return args.reference
+    if revision is None:
+        return None
+    result = subprocess.run(["git", "show", f"{revision}:./monkey_eyes_lib.py"], cwd=SCRIPT_DIR, capture_output=True)
+    if result.returncode != 0:
+        return None
+    with open(os.path.join(temp_dir, "monkey_eyes_lib.py"), "wb") as f:
+        f.write(result.stdout)
+    return temp_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare rendered frames against stored golden hashes.")
+    parser.add_argument("--update", action="store_true", help="Store the rendered hashes as the new goldens")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Only check this scenario")
+    parser.add_argument("--mode", action="append", choices=sorted(MODES), help="Only check this mode")
+    parser.add_argument("--diff-dir", default="golden_diff", help="Directory for diff images (default: golden_diff)")
+    parser.add_argument("--reference", metavar="DIR",
+                        help="Directory with the golden monkey_eyes_lib.py (default: the golden git revision)")
+    parser.add_argument("--lib", help=argparse.SUPPRESS)
+    parser.add_argument("--dump", nargs=4, metavar=("MODE", "SCENARIO", "FRAME", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    import_library(args.lib)
+    if args.dump:
+        mode, scenario, frame, path = args.dump
+        dump_frame(mode, scenario, int(frame), path)
+        return
+
+    modes = args.mode or list(MODES)
+    scenarios = args.scenario or list(SCENARIOS)
+    start = time.perf_counter()
+    hashes = render_hashes(modes, scenarios)
+    elapsed = time.perf_counter() - start
+    frame_count = sum(len(frames) for frames in hashes.values())
+
+    if args.update:
+        golden = {"revision": None, "scenarios": {}}
+        if os.path.exists(GOLDEN_FILE):
+            with open(GOLDEN_FILE) as f:
+                golden = json.load(f)
+        golden["revision"] = get_revision()
+        if subprocess.run(["git", "diff", "--quiet", "HEAD", "--", "monkey_eyes_lib.py"], cwd=SCRIPT_DIR).returncode:
+            print("Warning: monkey_eyes_lib.py has uncommitted changes, diff images will be rendered with "
+                  f"revision {golden['revision']}")
+        golden["scenarios"].update(hashes)
+        with open(GOLDEN_FILE, "w") as f:
+            json.dump(golden, f, indent=1, sort_keys=True)
+            f.write("\n")
+        print(f"Stored {frame_count} golden frame hashes of revision {golden['revision']} ({elapsed:.1f} s)")
+        return
+
+    if not os.path.exists(GOLDEN_FILE):
+        sys.exit(f"No goldens in {GOLDEN_FILE}, run with --update first")
+    with open(GOLDEN_FILE) as f:
+        golden = json.load(f)
+
+    mismatches = []
+    for key, frames in hashes.items():
+        expected = golden["scenarios"].get(key)
+        if expected is None:
+            print(f"{key}: no golden hashes, skipped")
+            continue
+        if frames == expected:
+            continue
+        first = next((i for i, (a, b) in enumerate(zip(frames, expected)) if a != b), min(len(frames), len(expected)))
+        print(f"{key}: frame {first} differs ({len(frames)} frames rendered, {len(expected)} golden)")
+        mismatches.append((key, first))
+    print(f"Checked {frame_count} frames in {elapsed:.1f} s, {len(mismatches)} mismatching scenario(s)")
+    if not mismatches:
+        return
+
+    os.makedirs(args.diff_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        reference_dir = get_reference_dir(args, golden.get("revision"), temp_dir)
+        for key, first in mismatches:
+            mode, scenario = key.split("/")
+            golden_path = os.path.join(temp_dir, f"golden_{mode}_{scenario}.png")
+            if reference_dir is None or not render_reference_frame(reference_dir, mode, scenario, first, golden_path):
+                print(f"{key}: golden frame could not be rendered, no diff image written")
+                continue
+            output_path = os.path.join(args.diff_dir, f"{mode}_{scenario}_{first}.png")
+            write_diff_image(golden_path, mode, scenario, first, output_path)
+            print(f"{key}: diff image written to {output_path}")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
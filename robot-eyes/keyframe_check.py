@@ -0,0 +1,114 @@
+import argparse
+import os
+import sys
+
+# Keep pygame's import banner out of the output
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from monkey_eyes_lib import AnimationManager, AnimationState, MonkeyEyeApp, SimulatedClock, bake_keyframe_tracks
+
+"""
+Check that baked keyframe tracks match live stepping.
+
+With `frame_based_animation`, a baked track is played back one frame per
+update, so it has to hold exactly the frames stepping the animation live
+produces. For every expression the eye process bakes, this steps a fresh
+AnimationManager on a SimulatedClock, starting at several clock phases, and
+compares every frame with the baked track.
+
+Usage:
+    python keyframe_check.py                # Exit with 1 if a track differs
+    python keyframe_check.py --phases 10
+"""
+
+# How each track is started on a live manager, set up like the bake does
+TRACKS = {
+    ("blink", 1): lambda animation: start_blink(animation, 1),
+    ("blink", 2): lambda animation: start_blink(animation, 2),
+    ("look", 1): lambda animation: start_look(animation, 1),
+    ("look", -1): lambda animation: start_look(animation, -1),
+    ("concentrate", None): lambda animation: animation.trigger_concentrate(duration=0),
+    ("laugh", None): lambda animation: animation.trigger_laugh(),
+    ("star", 1000): lambda animation: animation.trigger_star(duration=1000),
+    ("star", 3000): lambda animation: animation.trigger_star(duration=3000),
+}
+
+
+def start_blink(animation, count):
+    animation.trigger_blinking()
+    animation.target_blink_count = count
+
+
+def start_look(animation, direction):
+    animation.trigger_look()
+    animation.looking_direction = direction
+
+
+def get_baked_frames(animation, kind, param):
+    """Returns the per-frame rects and values of the baked track(s), in playback order."""
+    tracks = bake_keyframe_tracks(animation, kind, param)
+    names = ("concentrate_in", "concentrate_out") if kind == "concentrate" else (kind,)
+    rects, values = [], []
+    for name in names:
+        track = tracks[name]
+        if track.rect_frames is not None:
+            rects += [[tuple(left), tuple(right)] for left, right in track.rect_frames]
+        if track.value_frames is not None:
+            values += [float(value) for value in track.value_frames]
+    return rects, values
+
+
+def step_live(eye_pair, kind, param, phase):
+    """Steps a track live from clock frame `phase` and returns its per-frame rects and values."""
+    eye_pair.reset()
+    animation = AnimationManager(eye_pair, frame_based=True)
+    animation.blink_interval = float("inf")
+    clock = SimulatedClock(AnimationManager.FRAME_DURATION_MS)
+    for _ in range(phase):
+        clock.tick()
+    animation.update(clock.get_ticks())
+    TRACKS[(kind, param)](animation)
+    rects, values = [], []
+    while animation.current_state != AnimationState.IDLE:
+        clock.tick()
+        animation.update(clock.get_ticks())
+        rects.append([tuple(eye_pair.left_eye.rect), tuple(eye_pair.right_eye.rect)])
+        values.append(animation.laugh_offset if kind == "laugh" else animation.star_scale)
+    return rects, values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that baked keyframe tracks match live stepping.")
+    parser.add_argument("--phases", type=int, default=4,
+                        help="Clock frames the live run is started at, from 0 (default: 4)")
+    args = parser.parse_args()
+
+    app = MonkeyEyeApp(None, headless=True, clock=SimulatedClock(), frame_based_animation=True)
+    app._initialize_pygame_and_eyes()
+    eye_pair = app.animation.eye_pair
+    failures = 0
+    for kind, param in TRACKS:
+        baked_rects, baked_values = get_baked_frames(app.animation, kind, param)
+        baked_frames = len(baked_rects or baked_values)
+        for phase in range(args.phases):
+            rects, values = step_live(eye_pair, kind, param, phase)
+            # Only the output the track stores is compared
+            if baked_rects:
+                values = []
+            else:
+                rects = []
+            if rects == baked_rects and values == baked_values:
+                continue
+            live = rects or values
+            baked = baked_rects or baked_values
+            first = next((i for i, (a, b) in enumerate(zip(live, baked)) if a != b), min(len(live), len(baked)))
+            print(f"{kind}/{param} from frame {phase}: frame {first} differs "
+                  f"({len(live)} frames stepped, {baked_frames} baked)")
+            failures += 1
+    print(f"Checked {len(TRACKS)} tracks at {args.phases} clock phase(s), {failures} mismatch(es)")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
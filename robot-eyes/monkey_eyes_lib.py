@@ -1,22 +1,284 @@
+import asyncio
+import base64
+import collections
+import hashlib
+import heapq
+import importlib
+import json
 import math
 import multiprocessing
-import queue
+import multiprocessing.connection
+import os
 import random
+import select
+import struct
+import threading
+import time
 
-import pygame
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for baked keyframe tracks and frame export
+    np = None
 
 """
 Monkey Eyes Animation System - Library Version
 
 Classes:
+- SpriteCache: LRU cache of pre-rendered expression sprites.
+- TextureCanvas: pygame._sdl2 Renderer/Texture render target of the texture backend.
 - Eye: Represents a single eye with drawing and transformation methods.
 - EyePair: Manages and draws a pair of eyes.
+- EyeArray / EyeRect / EyeCrowd: NumPy struct-of-arrays storage and vectorized animation of many eyes.
 - AnimationState: Enumeration of possible animation states.
 - AnimationManager: Controls different animation states and transitions.
+- KeyframeTrack / KeyframeTrackCache: Animations baked into NumPy arrays for playback.
+- PygameClock / SimulatedClock: Real and deterministic clocks driving the render loop.
+- FrameExporter / FrameReader: Shared-memory export of the rendered frames.
+- GazeChannel: Lock-free latest-value shared-memory slots for continuous gaze targets.
+- Heartbeat: Shared-memory frame counter and timestamps watched by the controller's watchdog.
+- SessionRecorder / SessionPlayer: Binary command log of a session and its headless replay.
+- CommandServer: Socket/WebSocket JSON command server running inside the eye process.
+- CommandOp: Opcodes of the binary command channel (see encode_command/decode_command).
+- Expression / ExpressionRegistry: Table of the expressions with their trigger, update and draw functions.
+- LatencyStats: Command-to-first-rendered-frame latency statistics.
+- FrameTimingStats: Rolling per-phase frame timings of the render loop.
+- SamplingProfiler: On-demand sampling profiler of the render thread, split by animation state.
+- CommandScheduler: Bounded, prioritized and coalesced per-frame command intake.
+- EyeHead: One pair of eyes with its animation, drawn into a screen region.
 - MonkeyEyeApp: Main application class (runs in a separate process).
+- EmbeddedEyes: In-process eyes stepped and rendered by a host pygame application.
 - EyesController: Interface for controlling the MonkeyEyeApp externally.
+- AsyncEyesController: asyncio controller whose expressions resolve on completion.
 """
 
+
+class _LazyModule:
+    """Module proxy that imports the module on first attribute access."""
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attribute)
+
+
+# pygame is only imported once something is drawn, so the controller side
+# (and forked eye processes, until they initialize) never loads it.
+pygame = _LazyModule("pygame")
+
+
+def _star_points(cx, cy, radius):
+    """Returns the 10 corner points of a star centered on (cx, cy)."""
+    inner_radius = radius * 0.4
+    points = []
+    for i in range(10):
+        angle = math.pi * 2 * i / 10 - math.pi / 2
+        current_radius = radius if i % 2 == 0 else inner_radius
+        x = cx + current_radius * math.cos(angle)
+        y = cy + current_radius * math.sin(angle)
+        points.append((x, y))
+    return points
+
+
+class SpriteCache:
+    """
+    LRU cache of pre-rendered expression sprites.
+
+    Each sprite is rendered once to a per-pixel-alpha Surface and blitted
+    afterwards. When the cached surfaces exceed the memory cap, the least
+    recently used ones are evicted.
+
+    Args:
+        max_bytes (int): Memory cap for all cached surfaces in bytes.
+        scale_steps (int): Number of quantization steps per 1.0 of scale
+            (e.g. 100 means the star scale is cached in steps of 0.01).
+    """
+    def __init__(self, max_bytes=4 * 1024 * 1024, scale_steps=100):
+        self.max_bytes = max_bytes
+        self.scale_steps = scale_steps
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._sprites = collections.OrderedDict()
+
+    def quantize(self, value):
+        """Returns the cache step closest to the given scale or offset."""
+        return int(round(value * self.scale_steps))
+
+    def get(self, key, render):
+        """
+        Returns the (surface, anchor) sprite for the key, calling `render()`
+        to create it on a miss. The anchor is the position within the
+        surface that corresponds to the shape's center.
+        """
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        sprite = render()
+        if pygame.display.get_surface() is not None:
+            sprite = (sprite[0].convert_alpha(), sprite[1])
+        surface = sprite[0]
+        size = surface.get_width() * surface.get_height() * surface.get_bytesize()
+        if size > self.max_bytes:
+            return sprite
+        self._sprites[key] = sprite
+        self.size_bytes += size
+        while self.size_bytes > self.max_bytes:
+            _, (evicted, _) = self._sprites.popitem(last=False)
+            self.size_bytes -= evicted.get_width() * evicted.get_height() * evicted.get_bytesize()
+            self.evictions += 1
+        return sprite
+
+    def clear(self):
+        """Drops all cached sprites (the counters are kept)."""
+        self._sprites.clear()
+        self.size_bytes = 0
+
+    def get_stats(self):
+        """Returns the cache counters and memory usage as a dict."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "sprites": len(self._sprites),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def _rgba(color):
+    """Returns an RGB(A) color as the RGBA tuple `Renderer.draw_color` takes."""
+    return color if len(color) == 4 else (*color, 255)
+
+
+class TextureCanvas:
+    """
+    Render target of the texture backend: draws the eyes with a
+    `pygame._sdl2.video.Renderer` from textures uploaded once, instead of
+    rasterizing every shape into a Surface each frame.
+
+    A rounded eye is drawn as a nine-slice: the four corners are copied from
+    one texture of a rounded square per radius (drawn by `pygame.draw.rect`,
+    so they match the Surface backend), and the rest is filled with solid
+    rectangles. Blinks and squints therefore only change where the slices
+    go. The laughing/smiling circles and the star are textures of the
+    sprite shapes, the star copied scaled. Provides the part of the
+    Surface interface the app uses (`get_rect`, `get_size`, `subsurface`,
+    `fill`); a subsurface is a viewport of the renderer, which clips and
+    offsets like a Surface subsurface.
+
+    Args:
+        renderer (pygame._sdl2.video.Renderer): Renderer of the eye window.
+        rect (pygame.Rect, optional): Area of the renderer drawn into.
+            Defaults to the whole output.
+        root (TextureCanvas, optional): Canvas this one is a subsurface of,
+            whose texture cache it shares.
+    """
+    def __init__(self, renderer, rect=None, root=None):
+        self.renderer = renderer
+        self.rect = pygame.Rect(rect if rect is not None else (0, 0, *renderer.get_viewport().size))
+        self.root = root or self
+        if root is None:
+            self.textures = {}
+            # Canvas whose viewport is set on the renderer
+            self.viewport = self
+        else:
+            self.textures = root.textures
+
+    def get_rect(self):
+        return pygame.Rect(0, 0, self.rect.width, self.rect.height)
+
+    def get_size(self):
+        return self.rect.size
+
+    def subsurface(self, rect):
+        return TextureCanvas(self.renderer, pygame.Rect(rect).move(self.rect.topleft), self.root)
+
+    def _activate(self):
+        root = self.root
+        if root.viewport is not self:
+            self.renderer.set_viewport(None if self is root else self.rect)
+            root.viewport = self
+
+    def fill(self, color, rect=None):
+        self._activate()
+        self.renderer.draw_color = _rgba(color)
+        if rect is None and self is self.root:
+            self.renderer.clear()
+        else:
+            self.renderer.fill_rect(rect if rect is not None else self.get_rect())
+
+    def _get_texture(self, key, render):
+        """Returns the (texture, anchor) for the key, uploading `render()`'s (surface, anchor) on a miss."""
+        entry = self.textures.get(key)
+        if entry is None:
+            from pygame._sdl2.video import Texture
+
+            surface, anchor = render()
+            entry = self.textures[key] = (Texture.from_surface(self.renderer, surface), anchor)
+        return entry
+
+    def draw_rounded_rect(self, color, rect, radius):
+        """Draws a rounded rectangle like `pygame.draw.rect` and returns its bounds."""
+        x, y, width, height = rect
+        bounds = pygame.Rect(x, y, max(width, 0), max(height, 0))
+        if width <= 0 or height <= 0:
+            return bounds
+        self._activate()
+        radius = min(radius, width // 2, height // 2)
+        renderer = self.renderer
+        renderer.draw_color = _rgba(color)
+        if radius <= 0:
+            renderer.fill_rect(bounds)
+            return bounds
+        corners, _ = self._get_texture(("corners", radius, color), lambda: self._render_corners(radius, color))
+        right, bottom = x + width - radius, y + height - radius
+        for src_x, src_y, dst_x, dst_y in ((0, 0, x, y), (radius, 0, right, y),
+                                           (0, radius, x, bottom), (radius, radius, right, bottom)):
+            corners.draw((src_x, src_y, radius, radius), (dst_x, dst_y, radius, radius))
+        renderer.fill_rect((x + radius, y, width - 2 * radius, height))
+        if height > 2 * radius:
+            renderer.fill_rect((x, y + radius, radius, height - 2 * radius))
+            renderer.fill_rect((right, y + radius, radius, height - 2 * radius))
+        return bounds
+
+    @staticmethod
+    def _render_corners(radius, color):
+        corners = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.rect(corners, color, corners.get_rect(), border_radius=radius)
+        return corners, (0, 0)
+
+    def draw_sprite(self, key, render, center, scale=1.0):
+        """
+        Copies the texture of a sprite, created from `render()` on first use,
+        centered on its anchor at `center` and scaled by `scale`. Returns the bounds.
+        """
+        self._activate()
+        texture, (anchor_x, anchor_y) = self._get_texture(key, render)
+        if scale == 1:
+            bounds = pygame.Rect(center[0] - anchor_x, center[1] - anchor_y, texture.width, texture.height)
+        else:
+            bounds = pygame.Rect(round(center[0] - anchor_x * scale), round(center[1] - anchor_y * scale),
+                                 round(texture.width * scale), round(texture.height * scale))
+        texture.draw(None, bounds)
+        return bounds
+
+    def present(self):
+        self.renderer.present()
+
+    def to_surface(self):
+        """Reads the rendered frame back into a Surface (slow, for export and tests)."""
+        self.root._activate()
+        return self.renderer.to_surface()
+
+
 class Eye:
     """
     Represents a single eye with position, size, and rendering logic.
@@ -28,16 +290,51 @@ class Eye:
         height (int): Height of the eye.
         radius (int): Border radius for rounded corners.
         color (tuple): RGB color of the eye.
+        sprite_cache (SpriteCache, optional): Cache for the circular and star
+            sprites. If None, the shapes are drawn directly every frame.
+        eye_array (EyeArray, optional): If given, the eye's geometry is stored
+            in a new row of the array and `rect`/`original_rect` are views
+            into it.
     """
-    def __init__(self, x, y, width, height, radius=30, color=(0, 0, 0)):
-        self.rect = pygame.Rect(x, y, width, height)
-        self.original_rect = pygame.Rect(x, y, width, height)
+    def __init__(self, x, y, width, height, radius=30, color=(0, 0, 0), sprite_cache=None, eye_array=None):
+        if eye_array is not None:
+            index = eye_array.add(x, y, width, height)
+            self.rect = EyeRect(eye_array, index, "rects")
+            self.original_rect = EyeRect(eye_array, index, "original_rects")
+        else:
+            self.rect = pygame.Rect(x, y, width, height)
+            self.original_rect = pygame.Rect(x, y, width, height)
         self.radius = radius
         self.color = color
+        self.sprite_cache = sprite_cache
+        # Screen area painted by the last draw call and the area cleared
+        # before it, used for dirty-rectangle updates.
+        self.drawn_rect = None
+        self.cleared_rect = None
 
     def draw(self, screen):
         """Draws the eye as a rounded rectangle."""
-        pygame.draw.rect(screen, self.color, self.rect, border_radius=self.radius)
+        if isinstance(screen, TextureCanvas):
+            self.drawn_rect = screen.draw_rounded_rect(self.color, self.rect, self.radius)
+            return
+        self.drawn_rect = pygame.draw.rect(screen, self.color, self.rect, border_radius=self.radius)
+
+    def clear(self, screen, background_color):
+        """Fills the area painted by the last draw call with the background color."""
+        if self.drawn_rect is not None:
+            screen.fill(background_color, self.drawn_rect)
+        self.cleared_rect = self.drawn_rect
+
+    def get_dirty_rect(self):
+        """
+        Returns the union of the previously cleared and the currently drawn
+        bounds, i.e. the screen area that has to be pushed to the display.
+        """
+        if self.cleared_rect is None:
+            return self.drawn_rect
+        if self.drawn_rect is None:
+            return self.cleared_rect
+        return self.cleared_rect.union(self.drawn_rect)
 
     def grow(self, width, height):
         """Inflates (or shrinks) the eye by width and height."""
@@ -66,44 +363,85 @@ class Eye:
         """Returns the (x, y) center of the eye."""
         return (self.rect.x + self.rect.width // 2, self.rect.y + self.rect.height // 2)
 
-    def draw_circular(self, screen, background_color, vertical_offset=0, overlay_circle_offset=150):
+    def draw_circular(self, screen, background_color, vertical_offset=0, overlay_circle_offset=150, overlay_radius_margin=60):
         """
         Draws the eye as a circular laughing/smiling representation.
         """
         center_x, center_y = self.get_center()
         center_y += vertical_offset
         radius = self.rect.height // 2
-        
-        pygame.draw.circle(screen, self.color, (center_x, center_y), radius)
-        pygame.draw.circle(screen, background_color, (center_x, center_y + overlay_circle_offset), radius + 60)
+
+        if isinstance(screen, TextureCanvas):
+            key = ("circular", radius, self.color, overlay_circle_offset, overlay_radius_margin)
+            self.drawn_rect = screen.draw_sprite(
+                key, lambda: self._render_circular_sprite(radius, overlay_circle_offset, overlay_radius_margin),
+                (center_x, center_y))
+            return
+
+        if self.sprite_cache is not None:
+            key = ("circular", radius, self.color, overlay_circle_offset, overlay_radius_margin)
+            sprite, (anchor_x, anchor_y) = self.sprite_cache.get(
+                key, lambda: self._render_circular_sprite(radius, overlay_circle_offset, overlay_radius_margin))
+            self.drawn_rect = screen.blit(sprite, (center_x - anchor_x, center_y - anchor_y))
+            return
+
+        eye_bounds = pygame.draw.circle(screen, self.color, (center_x, center_y), radius)
+        overlay_bounds = pygame.draw.circle(screen, background_color, (center_x, center_y + overlay_circle_offset), radius + overlay_radius_margin)
+        self.drawn_rect = eye_bounds.union(overlay_bounds)
+
+    def _render_circular_sprite(self, radius, overlay_circle_offset, overlay_radius_margin):
+        # The overlay circle is cut out as transparent pixels instead of
+        # being painted in the background color.
+        sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, self.color, (radius, radius), radius)
+        pygame.draw.circle(sprite, (0, 0, 0, 0), (radius, radius + overlay_circle_offset), radius + overlay_radius_margin)
+        return sprite, (radius, radius)
 
     def draw_star(self, screen, color=(255, 255, 0), scale=1.0):
         """
         Draws a star shape within the eye area.
         """
         cx, cy = self.get_center()
-        radius = min(self.rect.width, self.rect.height) // 2 * scale
-        inner_radius = radius * 0.4
-        
-        points = []
-        for i in range(10):
-            angle = math.pi * 2 * i / 10 - math.pi / 2
-            current_radius = radius if i % 2 == 0 else inner_radius
-            x = cx + current_radius * math.cos(angle)
-            y = cy + current_radius * math.sin(angle)
-            points.append((x, y))
-        
-        if len(points) > 2:
-            pygame.draw.polygon(screen, color, points)
+        size = min(self.rect.width, self.rect.height) // 2
+
+        if isinstance(screen, TextureCanvas):
+            # One texture of the full-size star, copied scaled
+            self.drawn_rect = screen.draw_sprite(("star", size, color), lambda: self._render_star_sprite(size, color),
+                                                 (cx, cy), scale)
+            return
+
+        if self.sprite_cache is not None:
+            steps = self.sprite_cache.quantize(scale)
+            key = ("star", size, color, steps)
+            sprite, (anchor_x, anchor_y) = self.sprite_cache.get(
+                key, lambda: self._render_star_sprite(size * steps / self.sprite_cache.scale_steps, color))
+            self.drawn_rect = screen.blit(sprite, (cx - anchor_x, cy - anchor_y))
+            return
+
+        self.drawn_rect = pygame.draw.polygon(screen, color, _star_points(cx, cy, size * scale))
+
+    def _render_star_sprite(self, radius, color):
+        anchor = math.ceil(radius) + 1
+        sprite = pygame.Surface((anchor * 2, anchor * 2), pygame.SRCALPHA)
+        pygame.draw.polygon(sprite, color, _star_points(anchor, anchor, radius))
+        return sprite, (anchor, anchor)
 
 
 class EyePair:
     """
     Manages a pair of eyes and their expressions.
+
+    `scale` scales the fixed pixel offsets of the laughing/smiling shapes
+    for eyes drawn smaller or larger than the default size. With an
+    `eye_array`, both eyes are views into consecutive rows of it.
     """
-    def __init__(self, left_x, right_x, y, width, height, distance, radius=30, color=(0, 0, 0), background_color=(255,255, 255), star_color=(255, 255, 0)):
-        self.left_eye = Eye(left_x, y, width, height, radius, color)
-        self.right_eye = Eye(right_x, y, width, height, radius, color)
+    def __init__(self, left_x, right_x, y, width, height, distance, radius=30, color=(0, 0, 0), background_color=(255,255, 255), star_color=(255, 255, 0), sprite_cache=None, scale=1.0, eye_array=None):
+        self.left_eye = Eye(left_x, y, width, height, radius, color, sprite_cache, eye_array)
+        self.right_eye = Eye(right_x, y, width, height, radius, color, sprite_cache, eye_array)
+        self.sprite_cache = sprite_cache
+        self.smile_offset = round(10 * scale)
+        self.overlay_circle_offset = round(150 * scale)
+        self.overlay_radius_margin = round(60 * scale)
         self.distance = distance
         self.background_color = background_color
         self.star_color = star_color
@@ -113,12 +451,12 @@ class EyePair:
         self.right_eye.draw(screen)
 
     def draw_laughing(self, screen, vertical_offset=0):
-        self.left_eye.draw_circular(screen, self.background_color, vertical_offset)
-        self.right_eye.draw_circular(screen, self.background_color, vertical_offset)
+        self.left_eye.draw_circular(screen, self.background_color, vertical_offset, self.overlay_circle_offset, self.overlay_radius_margin)
+        self.right_eye.draw_circular(screen, self.background_color, vertical_offset, self.overlay_circle_offset, self.overlay_radius_margin)
     
     def draw_smiling(self, screen):
-        self.left_eye.draw_circular(screen, self.background_color, 10) 
-        self.right_eye.draw_circular(screen, self.background_color, 10)
+        self.left_eye.draw_circular(screen, self.background_color, self.smile_offset, self.overlay_circle_offset, self.overlay_radius_margin) 
+        self.right_eye.draw_circular(screen, self.background_color, self.smile_offset, self.overlay_circle_offset, self.overlay_radius_margin)
 
     def draw_stars(self, screen, scale=1.0):
         self.left_eye.draw_star(screen, self.star_color, scale)
@@ -128,6 +466,321 @@ class EyePair:
         self.left_eye.reset()
         self.right_eye.reset()
 
+    def clear(self, screen):
+        """Clears the areas painted by the last draw call of both eyes."""
+        self.left_eye.clear(screen, self.background_color)
+        self.right_eye.clear(screen, self.background_color)
+
+    def get_dirty_rects(self):
+        """Returns the screen areas changed since the last clear of both eyes."""
+        return [rect for rect in (self.left_eye.get_dirty_rect(), self.right_eye.get_dirty_rect()) if rect is not None]
+
+
+def _half_toward_zero(values):
+    """Halves integers rounding toward zero, like the C division in `pygame.Rect.inflate`."""
+    return np.sign(values) * (np.abs(values) // 2)
+
+
+class EyeRect:
+    """
+    Rectangle view into one row of an `EyeArray`, with the parts of the
+    `pygame.Rect` interface that `Eye` and `AnimationManager` use. Writes go
+    straight to the array.
+    """
+    __slots__ = ("_array", "_index", "_field")
+
+    def __init__(self, eye_array, index, field="rects"):
+        self._array = eye_array
+        self._index = index
+        self._field = field
+
+    def _row(self):
+        return getattr(self._array, self._field)[self._index]
+
+    def _column(i):
+        return property(lambda self: int(self._row()[i]),
+                        lambda self, value: self._row().__setitem__(i, value))
+
+    x = left = _column(0)
+    y = top = _column(1)
+    width = w = _column(2)
+    height = h = _column(3)
+    del _column
+
+    def __len__(self):
+        return 4
+
+    def __getitem__(self, i):
+        return int(self._row()[i])
+
+    def __iter__(self):
+        return iter(self._row().tolist())
+
+    def __repr__(self):
+        return f"EyeRect({', '.join(map(str, self))})"
+
+    def update(self, *args):
+        """Sets x, y, width and height, given as one sequence or four values."""
+        self._row()[:] = args[0] if len(args) == 1 else args
+
+    def move_ip(self, x, y):
+        row = self._row()
+        row[0] += x
+        row[1] += y
+
+    def inflate_ip(self, x, y):
+        row = self._row()
+        row[0] -= int(_half_toward_zero(x))
+        row[1] -= int(_half_toward_zero(y))
+        row[2] += x
+        row[3] += y
+
+
+class EyeArray:
+    """
+    Struct-of-arrays storage of many eyes: the current and original
+    (x, y, width, height) of every eye are rows of two int32 NumPy arrays,
+    so geometry updates can be applied to all eyes at once. Eyes created
+    with `Eye(..., eye_array=array)` are views into a row. Requires NumPy.
+
+    Args:
+        capacity (int): Initial number of rows; the arrays grow as needed.
+    """
+    def __init__(self, capacity=64):
+        if np is None:
+            raise ImportError("EyeArray requires NumPy")
+        self.rects = np.zeros((capacity, 4), np.int32)
+        self.original_rects = np.zeros((capacity, 4), np.int32)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, x, y, width, height):
+        """Adds an eye and returns its index."""
+        if self.count == len(self.rects):
+            self.rects = np.concatenate([self.rects, np.zeros_like(self.rects)])
+            self.original_rects = np.concatenate([self.original_rects, np.zeros_like(self.original_rects)])
+        index = self.count
+        self.rects[index] = self.original_rects[index] = (x, y, width, height)
+        self.count += 1
+        return index
+
+    def inflate(self, width, height, mask=slice(None)):
+        """Inflates (or shrinks) the selected eyes around their centers, like `Rect.inflate_ip`."""
+        rects = self.rects[:self.count][mask]
+        width = np.asarray(width)
+        height = np.asarray(height)
+        rects[:, 0] -= _half_toward_zero(width)
+        rects[:, 1] -= _half_toward_zero(height)
+        rects[:, 2] += width
+        rects[:, 3] += height
+        self.rects[:self.count][mask] = rects
+
+    def move(self, x, y, mask=slice(None)):
+        """Moves the selected eyes by the given offsets."""
+        rects = self.rects[:self.count][mask]
+        rects[:, 0] += x
+        rects[:, 1] += y
+        self.rects[:self.count][mask] = rects
+
+    def reset(self, mask=slice(None)):
+        """Resets position and size of the selected eyes."""
+        self.rects[:self.count][mask] = self.original_rects[:self.count][mask]
+
+    def draw(self, screen, color, radius, sprite_cache=None):
+        """
+        Draws all eyes as rounded rectangles. With a sprite cache, every
+        distinct eye size is rendered once and all eyes are blitted in one
+        `Surface.blits` call.
+        """
+        rects = self.rects[:self.count]
+        if sprite_cache is None:
+            for rect in rects.tolist():
+                pygame.draw.rect(screen, color, rect, border_radius=radius)
+            return
+        sizes, inverse = np.unique(rects[:, 2:4], axis=0, return_inverse=True)
+        sprites = []
+        for width, height in sizes.tolist():
+            sprite, _ = sprite_cache.get(("rect", width, height, radius, color),
+                                         lambda: self._render_rect_sprite(width, height, radius, color))
+            sprites.append(sprite)
+        positions = rects[:, :2].tolist()
+        screen.blits([(sprites[i], position) for i, position in zip(inverse.ravel().tolist(), positions)],
+                     doreturn=False)
+
+    @staticmethod
+    def _render_rect_sprite(width, height, radius, color):
+        sprite = pygame.Surface((max(width, 0), max(height, 0)), pygame.SRCALPHA)
+        pygame.draw.rect(sprite, color, sprite.get_rect(), border_radius=radius)
+        return sprite, (0, 0)
+
+
+class EyeCrowd:
+    """
+    A wall of eye pairs stored in one `EyeArray`, with blinking, squinting
+    and sideways looks updated for all pairs at once by vectorized NumPy
+    operations, and drawn in batches.
+
+    `pairs` holds a regular `EyePair` per pair, backed by the shared array,
+    so single pairs can still be drawn or manipulated through the usual API.
+    Eyes `2 * i` and `2 * i + 1` are the left and right eye of pair `i`.
+
+    Args:
+        columns (int): Pairs per row.
+        rows (int): Number of rows.
+        screen_size (tuple): (width, height) of the area the crowd fills.
+        color (tuple): RGB color of the eyes.
+        background_color (tuple): RGB background color.
+        sprite_cache (SpriteCache, optional): Enables batched sprite drawing.
+        seed (int, optional): Seed of the blink and look randomness.
+    """
+    IDLE = 0
+    BLINKING = 1
+    SQUINTING = 2
+    LOOKING = 3
+
+    # Phases within a state
+    CLOSING = 0
+    HOLDING = 1
+    OPENING = 2
+
+    def __init__(self, columns, rows, screen_size=(1280, 720), color=(133, 242, 239), background_color=(0, 0, 0),
+                 sprite_cache=None, seed=None):
+        self.eye_array = EyeArray(capacity=columns * rows * 2)
+        self.color = color
+        self.background_color = background_color
+        self.sprite_cache = sprite_cache
+        self.rng = np.random.default_rng(seed)
+
+        cell_width = screen_size[0] // columns
+        cell_height = screen_size[1] // rows
+        scale = min(cell_width / 1280, cell_height / 720)
+        eye_size = max(1, round(300 * scale))
+        distance = round(300 * scale)
+        self.radius = max(1, round(30 * scale))
+        self.pairs = []
+        for i in range(columns * rows):
+            center_x = (i % columns) * cell_width + cell_width // 2
+            eye_y = (i // columns) * cell_height + cell_height // 2 - eye_size // 2 - round(150 * scale)
+            self.pairs.append(EyePair(center_x - eye_size - distance // 2, center_x + distance // 2, eye_y,
+                                      eye_size, eye_size, distance, self.radius, color, background_color,
+                                      sprite_cache=sprite_cache, scale=scale, eye_array=self.eye_array))
+
+        # Speeds and distances of AnimationManager, scaled to the eye size
+        self.blink_speed = max(1, round(20 * scale))
+        self.blink_closed_height = max(1, round(10 * scale))
+        self.squint_height = max(1, round(60 * scale))
+        self.move_speed = max(1, round(10 * scale))
+        self.max_move_distance = round(200 * scale)
+        self.look_pause_duration = 500
+
+        pair_count = len(self.pairs)
+        self.states = np.zeros(pair_count, np.int8)
+        self.phases = np.zeros(pair_count, np.int8)
+        self.hold_until = np.zeros(pair_count)
+        self.directions = np.ones(pair_count, np.int32)
+        self.next_blink_times = self.rng.uniform(0, 8000, pair_count)
+        self.current_time = 0
+        self.last_update_time = None
+
+    def _eye_mask(self, pair_mask):
+        """Expands a per-pair mask to the left and right eye of every pair."""
+        return np.repeat(pair_mask, 2)
+
+    def _pair_values(self, eye_values):
+        """Returns the values of the left eyes, one per pair."""
+        return eye_values[0::2]
+
+    def trigger_squint(self, pairs=slice(None), duration=2000):
+        """Makes the selected pairs (indices, slice or mask) squint for `duration` ms."""
+        mask = np.zeros(len(self.pairs), bool)
+        mask[pairs] = True
+        self._start(mask, self.SQUINTING)
+        self.hold_until[mask] = self.current_time + duration
+
+    def trigger_look(self, pairs=slice(None), direction=None):
+        """Makes the selected pairs look sideways, in a random direction if none is given."""
+        mask = np.zeros(len(self.pairs), bool)
+        mask[pairs] = True
+        self._start(mask, self.LOOKING)
+        if direction is None:
+            self.directions[mask] = self.rng.choice((-1, 1), int(mask.sum()))
+        else:
+            self.directions[mask] = direction
+
+    def _start(self, mask, state):
+        self.eye_array.reset(self._eye_mask(mask))
+        self.states[mask] = state
+        self.phases[mask] = self.CLOSING
+
+    def update(self, current_time):
+        """Advances the animations of all pairs to `current_time` (ms)."""
+        if self.last_update_time is None:
+            frame_scale = 1.0
+        else:
+            frame_scale = min(max(current_time - self.last_update_time, 0), 100) / (1000 / 60)
+        self.current_time = current_time
+        self.last_update_time = current_time
+        eyes = self.eye_array
+        rects = eyes.rects[:eyes.count]
+        originals = eyes.original_rects[:eyes.count]
+        states, phases = self.states, self.phases
+
+        idle = states == self.IDLE
+        blinking = idle & (self.next_blink_times <= current_time)
+        states[blinking] = self.BLINKING
+        phases[blinking] = self.CLOSING
+
+        # A copy, as the inflates below write into `rects`
+        heights = self._pair_values(rects[:, 3]).copy()
+        original_heights = self._pair_values(originals[:, 3])
+        # Blinking and squinting close the eyes down to a height, squinting
+        # also holds them there until its end time.
+        for state, closed_height, speed in ((self.BLINKING, self.blink_closed_height, self.blink_speed),
+                                            (self.SQUINTING, self.squint_height, self.blink_speed)):
+            step = max(1, round(speed * frame_scale))
+            closing = (states == state) & (phases == self.CLOSING)
+            opening = (states == state) & (phases == self.OPENING)
+            shrink = np.minimum(step, np.maximum(heights - closed_height, 0))
+            grow = np.minimum(step, np.maximum(original_heights - heights, 0))
+            eyes.inflate(0, -np.repeat(shrink[closing], 2), self._eye_mask(closing))
+            eyes.inflate(0, np.repeat(grow[opening], 2), self._eye_mask(opening))
+            phases[closing & (heights - shrink <= closed_height)] = self.HOLDING if state == self.SQUINTING else self.OPENING
+            self._finish(opening & (heights + grow >= original_heights), current_time)
+
+        squint_over = (states == self.SQUINTING) & (phases == self.HOLDING) & (self.hold_until <= current_time)
+        phases[squint_over] = self.OPENING
+
+        # Looks move both eyes away, hold and come back
+        step = max(1, round(self.move_speed * frame_scale))
+        offsets = self._pair_values(rects[:, 0] - originals[:, 0])
+        away = (states == self.LOOKING) & (phases == self.CLOSING)
+        move = np.minimum(step, np.maximum(self.max_move_distance - np.abs(offsets), 0)) * self.directions
+        eyes.move(np.repeat(move[away], 2), 0, self._eye_mask(away))
+        reached = away & (np.abs(offsets + move) >= self.max_move_distance)
+        phases[reached] = self.HOLDING
+        self.hold_until[reached] = current_time + self.look_pause_duration
+
+        look_over = (states == self.LOOKING) & (phases == self.HOLDING) & (self.hold_until <= current_time)
+        phases[look_over] = self.OPENING
+        back = (states == self.LOOKING) & (phases == self.OPENING)
+        move = -np.sign(offsets) * np.minimum(step, np.abs(offsets))
+        eyes.move(np.repeat(move[back], 2), 0, self._eye_mask(back))
+        self._finish(back & (np.abs(offsets) <= step), current_time)
+
+    def _finish(self, mask, current_time):
+        """Returns the pairs in `mask` to IDLE and schedules their next blink."""
+        if not mask.any():
+            return
+        self.eye_array.reset(self._eye_mask(mask))
+        self.states[mask] = self.IDLE
+        self.next_blink_times[mask] = current_time + self.rng.uniform(3000, 8000, int(mask.sum()))
+
+    def draw(self, screen):
+        """Draws all eyes in one batch."""
+        self.eye_array.draw(screen, self.color, self.radius, self.sprite_cache)
+
 
 class AnimationState:
     IDLE = "idle"
@@ -140,36 +793,95 @@ class AnimationState:
 
 
 class AnimationManager:
-    def __init__(self, eye_pair):
+    """
+    Controls the animation states of an EyePair and steps them every frame.
+
+    The speeds (`blink_speed`, `laugh_speed`, `star_speed`, `move_speed`, ...)
+    are amounts per reference frame of `FRAME_DURATION_MS` (60 fps). By default
+    every `update()` scales them by the milliseconds elapsed since the previous
+    call, so an animation takes the same wall-clock time at any frame rate.
+
+    Args:
+        eye_pair (EyePair): The eyes to animate.
+        frame_based (bool, optional): If True, every `update()` call advances
+            the animations by exactly one step regardless of the elapsed time
+            (the original behaviour). Defaults to False.
+        max_frame_delta_ms (float, optional): Upper bound for the elapsed time
+            of a single update, so a stall does not make animations jump.
+            Defaults to 100.
+        keyframe_tracks (KeyframeTrackCache, optional): If given, blinking,
+            concentrating, looking, laughing and star eyes are played back from
+            baked per-frame arrays instead of being stepped frame by frame.
+        rng (random.Random, optional): Generator of the blink and look timing.
+            Defaults to the module-level functions of `random`.
+    """
+    FRAME_DURATION_MS = 1000 / 60
+
+    # Pixel speeds and distances that scale with the size of the eyes
+    SCALED_ATTRIBUTES = (
+        "blink_speed", "blink_closed_height", "laugh_speed", "max_laugh_offset", "move_speed",
+        "max_move_distance", "squinting_degree", "squint_distance", "max_squint",
+        "look_grow_step", "look_shrink_step", "concentrate_height", "max_gaze_y",
+    )
+    # Everything besides the geometry that baked keyframe tracks depend on
+    BAKED_ATTRIBUTES = SCALED_ATTRIBUTES + ("blink_pause_duration", "star_speed")
+
+    # A laugh bounces the eyes up and down LAUGH_CYCLES times. Speed and
+    # offset scale together, so it lasts LAUGH_DURATION_MS at any eye size
+    LAUGH_SPEED = 2
+    MAX_LAUGH_OFFSET = 20
+    LAUGH_CYCLES = 4
+    LAUGH_DURATION_MS = LAUGH_CYCLES * 2 * MAX_LAUGH_OFFSET / LAUGH_SPEED * FRAME_DURATION_MS
+
+    def __init__(self, eye_pair, frame_based=False, max_frame_delta_ms=100, keyframe_tracks=None, rng=None):
         self.eye_pair = eye_pair
+        self.rng = rng if rng is not None else random
         self.current_state = AnimationState.IDLE
         self.previous_state = AnimationState.IDLE
         
         self.current_time = 0 
         self.animation_start_time = 0
+
+        # Frame timing
+        self.frame_based = frame_based
+        self.max_frame_delta_ms = max_frame_delta_ms
+        self.last_update_time = None
+        self.frame_scale = 1.0
+        self._step_remainders = {}
+
+        # Baked keyframe playback
+        self.keyframe_tracks = keyframe_tracks
+        self.track = None
+        self.track_key = None
+        self.track_position = 0.0
         
         # Blinking 
         self.shrinking = True
         self.blink_speed = 20
         self.last_blink_time = 0 
-        self.blink_interval = random.uniform(2000, 4000)
+        self.blink_interval = self.rng.uniform(2000, 4000)
         self.blink_type = "single"  # "single" or "double", single as default
         self.current_blink_count = 0
         self.target_blink_count = 1
         self.blink_pause_start_time = 0
         self.blink_paused = False
         self.blink_pause_duration = 150  
+        self.blink_closed_height = 10
         
         # Laughing 
         self.laugh_up = True
-        self.laugh_speed = 2
+        self.laugh_speed = self.LAUGH_SPEED
         self.laugh_offset = 0
-        self.max_laugh_offset = 20
+        self.max_laugh_offset = self.MAX_LAUGH_OFFSET
         self.laugh_cycle_count = 0
         
         # Smiling 
         self.smile_start_time = 0
         self.smile_duration = 2000 
+
+        # Timed expressions registered through the ExpressionRegistry
+        self.expression_start_time = 0
+        self.expression_duration = 2000
         
         # Star 
         self.star_start_time = 0
@@ -182,8 +894,12 @@ class AnimationManager:
         self.move_speed = 10
         self.max_move_distance = 200
         self.squinting_degree = 5
+        self.squint_distance = 100  # Distance from the center up to which the eyes squint
+        self.max_squint = 40
+        self.look_grow_step = 4
+        self.look_shrink_step = 2
         self.last_look_time = 0 
-        self.look_interval = random.uniform(10000, 20000)
+        self.look_interval = self.rng.uniform(10000, 20000)
         self.looking_direction = 1
         self.moving_away = True
         self.look_paused = False
@@ -193,9 +909,24 @@ class AnimationManager:
         self.concentrate_duration = 2000 
         self.concentrate_start_time = 0
         self.concentrate_indefinite = False
+        self.concentrate_height = 60
+
+        # Gaze following (set_gaze_target). The gaze is (x, y) in -1..1 and
+        # moves the eyes by up to max_move_distance / max_gaze_y pixels.
+        self.gaze_target = None
+        self.gaze = [0.0, 0.0]
+        self.gaze_velocity = [0.0, 0.0]
+        self.gaze_smoothing_ms = 120  # Time the smoothed gaze needs to cover ~90% of a jump
+        self.max_gaze_y = 80
 
     def update(self, current_time_ticks):
         self.current_time = current_time_ticks
+        if self.frame_based or self.last_update_time is None:
+            self.frame_scale = 1.0
+        else:
+            elapsed = min(max(current_time_ticks - self.last_update_time, 0), self.max_frame_delta_ms)
+            self.frame_scale = elapsed / self.FRAME_DURATION_MS
+        self.last_update_time = current_time_ticks
         
         if self.current_state == AnimationState.IDLE:
             if self.current_time - self.last_blink_time > self.blink_interval:
@@ -203,22 +934,85 @@ class AnimationManager:
             # elif self.current_time - self.last_look_time > self.look_interval:
                 # self.trigger_look()
         
-        if self.current_state == AnimationState.LAUGHING:
-            self._animate_laugh()
-        elif self.current_state == AnimationState.SMILING:
-            if self._check_timed_animation_completed(self.smile_start_time, self.smile_duration):
-                self.set_state(AnimationState.IDLE)
-        elif self.current_state == AnimationState.STAR:
-            self._animate_star()
-        elif self.current_state == AnimationState.MOVING:
-            self._animate_sideways_look(self.looking_direction)
-        elif self.current_state == AnimationState.CONCENTRATING:
-            self._animate_concentrate()
-        elif self.current_state == AnimationState.BLINKING:
-            self._animate_blink()
+        animate = EXPRESSIONS.updates.get(self.current_state)
+        if animate is not None:
+            animate(self)
+        if self.gaze_target is not None or self.gaze != [0.0, 0.0]:
+            self._update_gaze()
     
+    def sync_clock(self, current_time_ticks):
+        """
+        Moves the animation time to the given ticks without stepping any
+        animation, e.g. after the render loop slept, so commands use the
+        right start time and the next update does not count the pause.
+        """
+        self.current_time = current_time_ticks
+        self.last_update_time = current_time_ticks
+
+    def get_next_idle_deadline(self):
+        """Returns the ticks at which the IDLE state will start its next animation (the next blink)."""
+        return self.last_blink_time + self.blink_interval
+
+    def _scaled(self, amount):
+        """Scales a per-frame amount to the time elapsed in the current update."""
+        if self.frame_based:
+            return amount
+        return amount * self.frame_scale
+
+    def _scaled_pixels(self, channel, amount):
+        """
+        Scales a per-frame pixel amount to the current update and rounds it to
+        whole pixels, carrying the remainder of each channel to the next update.
+        """
+        if self.frame_based:
+            return amount
+        scaled = amount * self.frame_scale + self._step_remainders.get(channel, 0.0)
+        pixels = int(scaled)
+        self._step_remainders[channel] = scaled - pixels
+        return pixels
+
+    def scale_geometry(self, scale):
+        """Scales all pixel speeds and distances for eyes drawn at `scale` times the default size."""
+        for name in self.SCALED_ATTRIBUTES:
+            setattr(self, name, max(1, round(getattr(self, name) * scale)))
+
+    def get_bake_signature(self):
+        """
+        Returns everything besides the animation parameters that a baked
+        track depends on: the eye geometry and the animation speeds.
+        """
+        return (
+            tuple(self.eye_pair.left_eye.original_rect), tuple(self.eye_pair.right_eye.original_rect),
+        ) + tuple(getattr(self, name) for name in self.BAKED_ATTRIBUTES)
+
+    def _play_track(self, kind, param=None):
+        """
+        Applies the current frame of a baked track, starting the track on the
+        first call. Returns True once the last frame has been applied.
+        """
+        key = (kind, param)
+        if self.track is None or self.track_key != key:
+            self.track = self.keyframe_tracks.get(self, kind, param)
+            self.track_key = key
+            self.track_position = 0.0
+        else:
+            self.track_position += self._scaled(1)
+
+        last_index = len(self.track) - 1
+        index = min(int(self.track_position + 1e-6), last_index)
+        if self.track.rect_frames is not None:
+            left, right = self.track.rect_frames[index]
+            self.eye_pair.left_eye.rect.update(left)
+            self.eye_pair.right_eye.rect.update(right)
+        if self.track.value_frames is not None:
+            value = self.track.value_frames[index]
+            if kind == "laugh": self.laugh_offset = value
+            elif kind == "star": self.star_scale = value
+        return index == last_index
+
     def set_state(self, new_state):
         if new_state != self.current_state:
+            self.track = None
             self.previous_state = self.current_state
             self.current_state = new_state
             self.animation_start_time = self.current_time
@@ -248,6 +1042,12 @@ class AnimationManager:
         self.smile_start_time = self.current_time
         self.smile_duration = duration if duration is not None else 2000
 
+    def trigger_timed(self, state, duration):
+        """Enters `state` and returns to IDLE after `duration` ms (see `_animate_timed`)."""
+        self.set_state(state)
+        self.expression_start_time = self.current_time
+        self.expression_duration = duration
+
     def trigger_concentrate(self, duration=None, indefinite=False):
         self.set_state(AnimationState.CONCENTRATING)
         self.concentrate_start_time = self.current_time
@@ -276,9 +1076,9 @@ class AnimationManager:
             self.set_state(AnimationState.BLINKING)
             self.shrinking = True
             self.last_blink_time = self.current_time 
-            self.blink_interval = random.uniform(3000, 8000)
+            self.blink_interval = self.rng.uniform(3000, 8000)
             
-            self.blink_type = random.choices(["single", "double"], weights=[3, 1])[0]
+            self.blink_type = self.rng.choices(["single", "double"], weights=[3, 1])[0]
             self.target_blink_count = 1 if self.blink_type == "single" else 2
             self.current_blink_count = 0
             self.blink_paused = False
@@ -287,26 +1087,34 @@ class AnimationManager:
         if self.current_state == AnimationState.IDLE:
             self.set_state(AnimationState.MOVING)
             self.moving_away = True
-            self.looking_direction = random.choice([1, -1])
+            self.looking_direction = self.rng.choice([1, -1])
             self.look_paused = False
             self.last_look_time = self.current_time 
-            self.look_interval = random.uniform(10000, 20000)
+            self.look_interval = self.rng.uniform(10000, 20000)
 
     def _animate_blink(self):
+        if self.keyframe_tracks is not None:
+            if self._play_track("blink", self.target_blink_count):
+                self.eye_pair.reset()
+                self.set_state(AnimationState.IDLE)
+            return
+
         if self.blink_paused:
             if self.current_time - self.blink_pause_start_time > self.blink_pause_duration:
                 self.blink_paused = False
                 self.shrinking = True 
             return
         
+        step = self._scaled_pixels("blink", self.blink_speed)
         if self.shrinking:
-            self.eye_pair.left_eye.grow(0, -self.blink_speed)
-            self.eye_pair.right_eye.grow(0, -self.blink_speed)
-            if self.eye_pair.left_eye.rect.height <= 10:
+            step = min(step, self.eye_pair.left_eye.rect.height)
+            self.eye_pair.left_eye.grow(0, -step)
+            self.eye_pair.right_eye.grow(0, -step)
+            if self.eye_pair.left_eye.rect.height <= self.blink_closed_height:
                 self.shrinking = False
         else:
-            self.eye_pair.left_eye.grow(0, self.blink_speed)
-            self.eye_pair.right_eye.grow(0, self.blink_speed)
+            self.eye_pair.left_eye.grow(0, step)
+            self.eye_pair.right_eye.grow(0, step)
             if self.eye_pair.left_eye.rect.height >= self.eye_pair.left_eye.original_rect.height:
                 self.current_blink_count += 1
                 
@@ -318,19 +1126,95 @@ class AnimationManager:
                     self.eye_pair.reset() 
                     self.set_state(AnimationState.IDLE)
     
+    def set_gaze_target(self, x, y):
+        """
+        Makes the eyes follow a gaze target, with x and y from -1 (left/up)
+        to 1 (right/down). None stops following and the eyes return to the
+        center. The eyes move toward the target with critically damped
+        smoothing, so jittery tracker input does not make them jump.
+        """
+        if x is None or y is None:
+            self.gaze_target = None
+        else:
+            self.gaze_target = (min(max(x, -1.0), 1.0), min(max(y, -1.0), 1.0))
+
+    def is_gaze_moving(self):
+        """Returns True while the smoothed gaze has not reached its target (or the center) yet."""
+        return self.gaze != list(self.gaze_target or (0.0, 0.0)) or self.gaze_velocity != [0.0, 0.0]
+
+    def _update_gaze(self):
+        """
+        Steps the gaze toward its target as a critically damped spring (the
+        exact solution over the elapsed time, so it is stable at any frame
+        rate) and moves the eyes there while IDLE or BLINKING.
+        """
+        target = self.gaze_target or (0.0, 0.0)
+        dt = self._scaled(self.FRAME_DURATION_MS) / 1000
+        omega = 4000 / self.gaze_smoothing_ms
+        decay = math.exp(-omega * dt)
+        for axis in (0, 1):
+            delta = self.gaze[axis] - target[axis]
+            impulse = (self.gaze_velocity[axis] + omega * delta) * dt
+            self.gaze_velocity[axis] = (self.gaze_velocity[axis] - omega * impulse) * decay
+            self.gaze[axis] = target[axis] + (delta + impulse) * decay
+
+        settled = max(abs(self.gaze[0] - target[0]), abs(self.gaze[1] - target[1]),
+                      abs(self.gaze_velocity[0]), abs(self.gaze_velocity[1])) < 1e-3
+        if settled:
+            self.gaze = list(target)
+            self.gaze_velocity = [0.0, 0.0]
+            if self.gaze_target is None:
+                if self.current_state == AnimationState.IDLE:
+                    self.eye_pair.reset()
+                return
+        if self.current_state not in (AnimationState.IDLE, AnimationState.BLINKING):
+            return
+
+        offset_x = round(self.gaze[0] * self.max_move_distance)
+        offset_y = round(self.gaze[1] * self.max_gaze_y)
+        # The eyes narrow the further they look sideways, like the canned look
+        squint = round(min(abs(self.gaze[0]), 1.0) * self.max_squint)
+        for eye in (self.eye_pair.left_eye, self.eye_pair.right_eye):
+            original = eye.original_rect
+            if self.current_state == AnimationState.IDLE:
+                eye.rect.width = original.width
+                eye.rect.height = original.height - squint
+            eye.rect.x = original.x + offset_x + (original.width - eye.rect.width) // 2
+            eye.rect.y = original.y + offset_y + (original.height - eye.rect.height) // 2
+
+    def _animate_smile(self):
+        if self._check_timed_animation_completed(self.smile_start_time, self.smile_duration):
+            self.set_state(AnimationState.IDLE)
+
+    def _animate_timed(self):
+        if self._check_timed_animation_completed(self.expression_start_time, self.expression_duration):
+            self.set_state(AnimationState.IDLE)
+
     def _animate_concentrate(self):
+        if self.keyframe_tracks is not None:
+            if self.shrinking:
+                if self._play_track("concentrate_in"):
+                    self.shrinking = False
+            elif not self.concentrate_indefinite and self._check_timed_animation_completed(self.concentrate_start_time, self.concentrate_duration):
+                if self._play_track("concentrate_out"):
+                    self.eye_pair.reset()
+                    self.set_state(AnimationState.IDLE)
+            return
+
+        step = self._scaled_pixels("blink", self.blink_speed)
         if self.shrinking:
-            self.eye_pair.left_eye.grow(0, -self.blink_speed) 
-            self.eye_pair.right_eye.grow(0, -self.blink_speed)
-            if self.eye_pair.left_eye.rect.height <= 60: 
+            step = min(step, max(self.eye_pair.left_eye.rect.height - self.concentrate_height, 0))
+            self.eye_pair.left_eye.grow(0, -step) 
+            self.eye_pair.right_eye.grow(0, -step)
+            if self.eye_pair.left_eye.rect.height <= self.concentrate_height: 
                 self.shrinking = False 
         else: # Not shrinking: either holding or expanding
             is_timed_out = self._check_timed_animation_completed(self.concentrate_start_time, self.concentrate_duration)
             
             if not self.concentrate_indefinite and is_timed_out:
                 # Time to expand and finish
-                self.eye_pair.left_eye.grow(0, self.blink_speed)
-                self.eye_pair.right_eye.grow(0, self.blink_speed)
+                self.eye_pair.left_eye.grow(0, step)
+                self.eye_pair.right_eye.grow(0, step)
                 if self.eye_pair.left_eye.rect.height >= self.eye_pair.left_eye.original_rect.height:
                     self.eye_pair.reset()
                     self.set_state(AnimationState.IDLE)
@@ -340,35 +1224,54 @@ class AnimationManager:
             # Else, it's timed but not yet timed out, so still holding.
 
     def _animate_laugh(self):
+        if self.keyframe_tracks is not None:
+            if self._play_track("laugh"):
+                self.set_state(AnimationState.IDLE)
+            return
+
         if self.laugh_up:
-            self.laugh_offset += self.laugh_speed
+            self.laugh_offset += self._scaled(self.laugh_speed)
             if self.laugh_offset >= self.max_laugh_offset:
+                # Bounce back by the overshoot so a cycle keeps its duration
+                self.laugh_offset = 2 * self.max_laugh_offset - self.laugh_offset
                 self.laugh_up = False
         else:
-            self.laugh_offset -= self.laugh_speed
+            self.laugh_offset -= self._scaled(self.laugh_speed)
             if self.laugh_offset <= 0:
+                self.laugh_offset = -self.laugh_offset
                 self.laugh_up = True
                 self.laugh_cycle_count += 1
-                if self.laugh_cycle_count >= 4: 
+                if self.laugh_cycle_count >= self.LAUGH_CYCLES:
                     self.set_state(AnimationState.IDLE)
     
     def _animate_star(self):
+        if self.keyframe_tracks is not None:
+            if self._play_track("star", self.star_duration):
+                self.set_state(AnimationState.IDLE)
+            return
+
         time_elapsed = self.current_time - self.star_start_time
         
         if self.star_growing and time_elapsed > self.star_duration / 2.0 :
             self.star_growing = False 
 
         if self.star_growing:
-            self.star_scale += self.star_speed
+            self.star_scale += self._scaled(self.star_speed)
             if self.star_scale >= 1.0:
                 self.star_scale = 1.0
         else: 
-            self.star_scale -= self.star_speed
+            self.star_scale -= self._scaled(self.star_speed)
             if self.star_scale <= 0.0:
                 self.star_scale = 0.0
                 self.set_state(AnimationState.IDLE) 
     
     def _animate_sideways_look(self, direction):
+        if self.keyframe_tracks is not None:
+            if self._play_track("look", direction):
+                self.eye_pair.reset()
+                self.set_state(AnimationState.IDLE)
+            return
+
         left_eye = self.eye_pair.left_eye
         right_eye = self.eye_pair.right_eye
         original_left_x = left_eye.original_rect.x
@@ -379,21 +1282,25 @@ class AnimationManager:
                 self.look_paused = False
             return 
 
+        move_step = self._scaled_pixels("move", self.move_speed)
+        squint_step = self._scaled_pixels("squint", self.squinting_degree)
+
         if self.moving_away:
-            left_eye.move(self.move_speed * direction, 0)
-            right_eye.move(self.move_speed * direction, 0)
+            left_eye.move(move_step * direction, 0)
+            right_eye.move(move_step * direction, 0)
             
             current_distance = abs(left_eye.rect.x - original_left_x)
-            if current_distance < 100:
-                if left_eye.rect.height > original_height - 40:
-                    left_eye.grow(0, -self.squinting_degree)
-                    right_eye.grow(0, -self.squinting_degree)
+            if current_distance < self.squint_distance:
+                if left_eye.rect.height > original_height - self.max_squint:
+                    left_eye.grow(0, -squint_step)
+                    right_eye.grow(0, -squint_step)
             else:
                 if left_eye.rect.height < original_height:
-                    left_eye.grow(0, self.squinting_degree)
-                    right_eye.grow(0, self.squinting_degree)
-                if direction > 0: right_eye.grow(4, 4)
-                else: left_eye.grow(4, 4)
+                    left_eye.grow(0, squint_step)
+                    right_eye.grow(0, squint_step)
+                grow_step = self._scaled_pixels("look_grow", self.look_grow_step)
+                if direction > 0: right_eye.grow(grow_step, grow_step)
+                else: left_eye.grow(grow_step, grow_step)
             
             if current_distance >= self.max_move_distance: 
                 self.moving_away = False
@@ -403,165 +1310,2889 @@ class AnimationManager:
             move_back_direction = -1 if left_eye.rect.x > original_left_x else 1
             
             dist_to_origin = abs(left_eye.rect.x - original_left_x)
-            if dist_to_origin < self.move_speed:
+            if dist_to_origin < move_step:
                  left_eye.rect.x = original_left_x
                  right_eye.rect.x = right_eye.original_rect.x 
             else:
-                left_eye.move(self.move_speed * move_back_direction, 0)
-                right_eye.move(self.move_speed * move_back_direction, 0)
+                left_eye.move(move_step * move_back_direction, 0)
+                right_eye.move(move_step * move_back_direction, 0)
             
-            if left_eye.rect.height < original_height: left_eye.grow(0, self.squinting_degree)
-            if right_eye.rect.height < original_height: right_eye.grow(0, self.squinting_degree)
+            if left_eye.rect.height < original_height: left_eye.grow(0, squint_step)
+            if right_eye.rect.height < original_height: right_eye.grow(0, squint_step)
             
-            if direction > 0 and right_eye.rect.width > right_eye.original_rect.width: right_eye.grow(-2, -2)
-            elif direction < 0 and left_eye.rect.width > left_eye.original_rect.width: left_eye.grow(-2, -2)
+            shrink_step = self._scaled_pixels("look_shrink", self.look_shrink_step)
+            if direction > 0 and right_eye.rect.width > right_eye.original_rect.width: right_eye.grow(-shrink_step, -shrink_step)
+            elif direction < 0 and left_eye.rect.width > left_eye.original_rect.width: left_eye.grow(-shrink_step, -shrink_step)
             
             if abs(left_eye.rect.x - original_left_x) < self.move_speed : 
                 self.eye_pair.reset()
                 self.set_state(AnimationState.IDLE)
 
 
-class MonkeyEyeApp:
-    def __init__(self, command_queue):
-        self.command_queue = command_queue
-        self.screen = None
-        self.clock = None
-        self.background_color = (0, 0, 0)
-        self.eyes = None
-        self.animation = None
-        
-        self.screen_width = 1280
-        self.screen_height = 720
-        self.eye_width = 300
-        self.eye_height = 300
-        self.eye_distance = 300
-        self.eye_radius = 30
-        self.eye_color = (133, 242, 239)
-        self.star_color = self.eye_color
+class CommandOp:
+    """
+    Opcodes of the binary command channel between EyesController and MonkeyEyeApp.
+    """
+    QUIT = 0
+    LAUGH = 1
+    SMILE = 2
+    STAR = 3
+    CONCENTRATE = 4
+    STOP_CONCENTRATE = 5
+    GET_LATENCY = 6
+    SEQUENCE = 7
+    CANCEL_SEQUENCE = 8
+    GET_STATS = 9
+    STOP_EXPRESSION = 10
+    START = 11
+    # Only found in session logs: a gaze target read from the GazeChannel
+    GAZE = 12
+    PROFILE = 13
 
-        self.eye_y_offset = 150
 
-    def _initialize_pygame_and_eyes(self):
-        pygame.init()
-        self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
-        pygame.display.set_caption("Monkey Eyes Animation")
-        self.clock = pygame.time.Clock()
-        
-        center_x = self.screen_width // 2
-        eye_y = self.screen_height // 2 - self.eye_height // 2 - self.eye_y_offset
-        eye_left_x = center_x - self.eye_width - (self.eye_distance // 2)
-        eye_right_x = center_x + (self.eye_distance // 2)
-        
-        self.eyes = EyePair(
-            eye_left_x, eye_right_x, eye_y, 
-            self.eye_width, self.eye_height, self.eye_distance, 
-            self.eye_radius, self.eye_color, self.background_color, self.star_color
-        )
-        self.animation = AnimationManager(self.eyes)
-        
-        current_ticks = pygame.time.get_ticks()
-        self.animation.last_blink_time = current_ticks
-        self.animation.last_look_time = current_ticks
-
-    def _process_command(self, command_str):
-        parts = command_str.split(':')
-        cmd = parts[0]
-        args = parts[1:]
-
-        if cmd == "laugh": self.animation.trigger_laugh()
-        elif cmd == "smile":
-            duration = int(args[0]) if args and args[0].isdigit() else None
-            self.animation.trigger_smile(duration=duration)
-        elif cmd == "star":
-            duration = int(args[0]) if args and args[0].isdigit() else None
-            self.animation.trigger_star(duration=duration)
-        elif cmd == "concentrate":
-            if args and args[0] == "indefinite":
-                self.animation.trigger_concentrate(indefinite=True)
-            else:
-                duration = int(args[0]) if args and args[0].isdigit() else None
-                self.animation.trigger_concentrate(duration=duration, indefinite=False)
-        elif cmd == "stop_concentrate": self.animation.stop_concentrate()
-        else: print(f"EyeApp: Unknown command: {command_str}")
+COMMAND_FLAG_HAS_ARG = 0x01
+COMMAND_FLAG_INDEFINITE = 0x02
+COMMAND_FLAG_REPLACE = 0x04
+# Reply with a "completed" message once the expression is over
+COMMAND_FLAG_NOTIFY = 0x08
 
-    def run_app_loop(self):
-        self._initialize_pygame_and_eyes()
-        running = True
-        while running:
-            current_ticks = pygame.time.get_ticks()
-            try:
-                while not self.command_queue.empty():
-                    command_str = self.command_queue.get_nowait()
-                    if command_str == "quit": running = False; break
-                    self._process_command(command_str)
-            except queue.Empty: pass
-            if not running: break
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT: running = False
-                elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE: running = False
-            if not running: break
-
-            self.animation.update(current_ticks)
-            
-            self.screen.fill(self.background_color)
-            current_state = self.animation.current_state
-            if current_state == AnimationState.LAUGHING:
-                self.eyes.draw_laughing(self.screen, self.animation.laugh_offset)
-            elif current_state == AnimationState.SMILING:
-                self.eyes.draw_smiling(self.screen)
-            elif current_state == AnimationState.STAR:
-                self.eyes.draw_stars(self.screen, self.animation.star_scale)
-            else: 
-                self.eyes.draw_normal(self.screen)
-            
-            pygame.display.flip()
-            self.clock.tick(60)
-        pygame.quit()
+# Head id addressing every head of an eye process at once
+ALL_HEADS = 0xFF
+# Head ids are one byte and must stay below ALL_HEADS
+MAX_HEADS = ALL_HEADS
 
-class EyesController:
-    """
-    Manages and controls the Monkey Eyes animation program, which runs in a
-    separate process.
 
-    This controller provides a simple interface to start, stop, and trigger
-    various emotional animations (like laughing, smiling, concentrating, etc.)
-    for a pair of "monkey eyes" displayed in a dedicated Pygame window.
+class Expression:
+    """
+    Registry entry of an expression: how a command starts it, how it is
+    stepped every frame and how the eyes are drawn while it runs.
 
-    Example:
-        >>> controller = EyesController()
-        >>> controller.start_eyes()
-        >>> # Eyes window appears
-        >>> controller.trigger_smile(duration_ms=3000)
-        >>> # Eyes smile for 3 seconds
-        >>> controller.stop_eyes()
-        >>> # Eyes window closes
+    Args:
+        name (str): Name used by the controller and in sequences.
+        state (str, optional): Animation state the expression runs in.
+            Defaults to `name`.
+        op (int, optional): Command opcode. None for states that are only
+            entered internally, like blinking.
+        trigger (callable, optional): `trigger(animation, arg, flags)`, parses
+            the command argument and flags and starts the expression. Defaults
+            to a timed expression lasting `arg` or `default_duration` ms.
+        update (callable, optional): `update(animation)`, steps the state once
+            per frame and sets it back to IDLE when it is over.
+        draw (callable, optional): `draw(eye_pair, surface, animation)`.
+            Defaults to the normal eyes.
+        default_duration (int, optional): Duration in ms of a timed expression
+            triggered without an argument, or the length of one that ends by
+            itself. Defaults to 2000.
+        priority (int, optional): Default command priority, see
+            `CommandScheduler`. Defaults to 1.
     """
-    def __init__(self):
-        self.command_queue = None
-        self.eye_process = None
+    def __init__(self, name, state=None, op=None, trigger=None, update=None, draw=None, default_duration=2000,
+                 priority=1):
+        self.name = name
+        self.state = state or name
+        self.op = op
+        self.trigger = trigger
+        self.update = update
+        self.draw = draw
+        self.default_duration = default_duration
+        self.priority = priority
 
-    def start_eyes(self):
-        """
-        Starts the Monkey Eyes animation program in a separate process.
+    def start(self, animation, arg=None, flags=0):
+        if self.trigger is not None:
+            self.trigger(animation, arg, flags)
+        else:
+            animation.trigger_timed(self.state, arg if arg is not None else self.default_duration)
 
-        A new window will be created to display the eye animations. If the
+
+def _draw_normal(eye_pair, surface, animation):
+    eye_pair.draw_normal(surface)
+
+
+def _trigger_concentrate(animation, arg, flags):
+    if flags & COMMAND_FLAG_INDEFINITE:
+        animation.trigger_concentrate(indefinite=True)
+    else:
+        animation.trigger_concentrate(duration=arg, indefinite=False)
+
+
+# Update and draw functions a configured expression can name
+EXPRESSION_UPDATES = {
+    "timed": AnimationManager._animate_timed,
+    "none": None,
+}
+EXPRESSION_DRAWS = {
+    "normal": _draw_normal,
+    "laughing": lambda eye_pair, surface, animation: eye_pair.draw_laughing(surface, animation.laugh_offset),
+    "smiling": lambda eye_pair, surface, animation: eye_pair.draw_smiling(surface),
+    "stars": lambda eye_pair, surface, animation: eye_pair.draw_stars(surface, animation.star_scale),
+}
+
+
+class ExpressionRegistry:
+    """
+    Lookup tables of the expressions, replacing per-state if/elif chains:
+    AnimationManager steps the current state through `updates`, EyeHead
+    draws it through `draws` and MonkeyEyeApp starts a command through `by_op`.
+
+    Expressions registered without an opcode get the next free one from
+    `FIRST_CUSTOM_OP` up. Registering a name again replaces the entry but
+    keeps its opcode.
+    """
+    FIRST_CUSTOM_OP = 32
+
+    def __init__(self):
+        self.expressions = {}
+        # Name -> opcode of every expression that can be commanded
+        self.ops = {}
+        self.by_op = {}
+        # State -> update / draw function
+        self.updates = {}
+        self.draws = {}
+        self._next_op = self.FIRST_CUSTOM_OP
+
+    def register(self, expression, command=True):
+        """
+        Adds `expression` to the tables and returns it. If `command` is
+        False the expression is a state only, without an opcode.
+        """
+        previous = self.expressions.get(expression.name)
+        if command and expression.op is None:
+            if previous is not None and previous.op is not None:
+                expression.op = previous.op
+            else:
+                if self._next_op > 0xFF:
+                    raise ValueError(f"No free command opcode left for expression '{expression.name}'")
+                expression.op = self._next_op
+                self._next_op += 1
+        self.expressions[expression.name] = expression
+        if expression.op is not None:
+            self.ops[expression.name] = expression.op
+            self.by_op[expression.op] = expression
+        if expression.update is not None or expression.state not in self.updates:
+            self.updates[expression.state] = expression.update
+        if expression.draw is not None or expression.state not in self.draws:
+            self.draws[expression.state] = expression.draw or _draw_normal
+        return expression
+
+
+EXPRESSIONS = ExpressionRegistry()
+for _expression in (
+    Expression("laugh", AnimationState.LAUGHING, CommandOp.LAUGH,
+               trigger=lambda animation, arg, flags: animation.trigger_laugh(),
+               update=AnimationManager._animate_laugh, draw=EXPRESSION_DRAWS["laughing"],
+               default_duration=round(AnimationManager.LAUGH_DURATION_MS)),
+    Expression("smile", AnimationState.SMILING, CommandOp.SMILE,
+               trigger=lambda animation, arg, flags: animation.trigger_smile(duration=arg),
+               update=AnimationManager._animate_smile, draw=EXPRESSION_DRAWS["smiling"]),
+    Expression("star", AnimationState.STAR, CommandOp.STAR,
+               trigger=lambda animation, arg, flags: animation.trigger_star(duration=arg),
+               update=AnimationManager._animate_star, draw=EXPRESSION_DRAWS["stars"], default_duration=3000),
+    Expression("concentrate", AnimationState.CONCENTRATING, CommandOp.CONCENTRATE, trigger=_trigger_concentrate,
+               update=AnimationManager._animate_concentrate),
+    Expression("stop_concentrate", AnimationState.CONCENTRATING, CommandOp.STOP_CONCENTRATE,
+               trigger=lambda animation, arg, flags: animation.stop_concentrate()),
+    Expression("stop", AnimationState.IDLE, CommandOp.STOP_EXPRESSION,
+               trigger=lambda animation, arg, flags: animation.set_state(AnimationState.IDLE), priority=2),
+):
+    EXPRESSIONS.register(_expression)
+EXPRESSIONS.register(Expression("blinking", AnimationState.BLINKING, update=AnimationManager._animate_blink),
+                     command=False)
+EXPRESSIONS.register(Expression("moving", AnimationState.MOVING,
+                                update=lambda animation: animation._animate_sideways_look(animation.looking_direction)),
+                     command=False)
+
+# Expression names accepted by EyesController.play_sequence, kept up to date
+# by the registry
+EXPRESSION_OPS = EXPRESSIONS.ops
+
+
+def _resolve_expression_function(value, builtins, what):
+    """Returns a callable from a builtin name or a "module:function" path."""
+    if value is None or callable(value):
+        return value
+    if value in builtins:
+        return builtins[value]
+    module_name, _, attribute = value.partition(":")
+    if not attribute:
+        raise ValueError(f"Unknown {what} function '{value}', expected one of {sorted(builtins)} or 'module:function'")
+    function = importlib.import_module(module_name)
+    for name in attribute.split("."):
+        function = getattr(function, name)
+    return function
+
+
+def register_expression(name, update="timed", draw="normal", trigger=None, state=None, default_duration=2000,
+                        priority=1):
+    """
+    Registers a custom expression in EXPRESSIONS and returns its opcode.
+
+    Args:
+        name (str): Name to trigger the expression by, e.g. with
+            `EyesController.trigger_expression()` or in `play_sequence()`.
+        update (str or callable, optional): "timed" (back to IDLE after the
+            duration), "none", a "module:function" path or a callable taking
+            the AnimationManager. Defaults to "timed".
+        draw (str or callable, optional): "normal", "laughing", "smiling",
+            "stars", a "module:function" path or a callable taking
+            (eye_pair, surface, animation). Defaults to "normal".
+        trigger (str or callable, optional): "module:function" path or
+            callable taking (animation, arg, flags). Defaults to starting a
+            timed expression.
+        state (str, optional): Animation state name. Defaults to `name`.
+        default_duration (int, optional): Duration in ms without an argument.
+        priority (int, optional): Default command priority. Defaults to 1.
+    """
+    expression = Expression(
+        name, state,
+        trigger=_resolve_expression_function(trigger, {}, "trigger"),
+        update=_resolve_expression_function(update, EXPRESSION_UPDATES, "update"),
+        draw=_resolve_expression_function(draw, EXPRESSION_DRAWS, "draw"),
+        default_duration=default_duration,
+        priority=priority,
+    )
+    return EXPRESSIONS.register(expression).op
+
+
+def load_expression_config(path):
+    """
+    Registers the expressions of a JSON or TOML (".toml") config file, a
+    list of tables under "expressions" with the keys of `register_expression()`
+    ("duration" for `default_duration`). Loading a file again keeps the
+    opcodes, so the eye process and the controller agree on them as long as
+    both load the same files in the same order.
+
+    Returns:
+        list: Names of the registered expressions.
+    """
+    if path.endswith(".toml"):
+        import tomllib  # Python 3.11+
+        with open(path, "rb") as f:
+            config = tomllib.load(f)
+    else:
+        with open(path) as f:
+            config = json.load(f)
+    names = []
+    for entry in config.get("expressions", []):
+        options = dict(entry)
+        if "name" not in options:
+            raise ValueError(f"Expression without a name in {path}")
+        if "duration" in options:
+            options["default_duration"] = options.pop("duration")
+        register_expression(**options)
+        names.append(options["name"])
+    return names
+
+# Fixed-size command record: opcode (u8), flags (u8), head id (u8), padding,
+# sequence number (u16), argument (i32), send time in time.monotonic_ns() (i64).
+COMMAND_STRUCT = struct.Struct("<BBBxHiq")
+# Largest argument (a duration in ms) the signed 32-bit field holds
+MAX_COMMAND_ARG = 0x7FFFFFFF
+
+
+def _check_int(value, name, maximum):
+    """Returns `value` if it is an integer from 0 to `maximum`, otherwise raises ValueError."""
+    if isinstance(value, bool) or not isinstance(value, int) or not 0 <= value <= maximum:
+        raise ValueError(f"'{name}' must be an integer from 0 to {maximum}, not {value!r}")
+    return value
+
+
+def encode_command(op, arg=None, flags=0, seq=0, sent_ns=None, head=0):
+    """Packs a command into a fixed-size binary record."""
+    if arg is not None:
+        flags |= COMMAND_FLAG_HAS_ARG
+    else:
+        arg = 0
+    if sent_ns is None:
+        sent_ns = time.monotonic_ns()
+    return COMMAND_STRUCT.pack(op, flags, head, seq, arg, sent_ns)
+
+
+def decode_command(data, offset=0):
+    """
+    Unpacks the binary command record at `offset` into (op, arg, flags, seq, sent_ns, head).
+    `arg` is None if the command was sent without an argument.
+    """
+    op, flags, head, seq, arg, sent_ns = COMMAND_STRUCT.unpack_from(data, offset)
+    if not flags & COMMAND_FLAG_HAS_ARG:
+        arg = None
+    return op, arg, flags, seq, sent_ns, head
+
+
+def encode_sequence(steps, sequence_id, replace=False, head=0):
+    """
+    Packs a timeline into one message: a SEQUENCE header record followed by
+    one record per step, whose timestamp field holds the step's offset in ms.
+
+    Args:
+        steps: Iterable of (offset_ms, expression) or (offset_ms, expression, arg)
+            tuples. `expression` is a key of EXPRESSION_OPS, `arg` a duration
+            in ms or "indefinite" for "concentrate".
+        sequence_id (int): Id of the sequence, used to cancel it.
+        replace (bool): If True, the eye process first drops all pending steps
+            of the addressed head(s).
+        head (int): Local head id the steps apply to, or ALL_HEADS.
+    """
+    records = []
+    for step in steps:
+        offset_ms, expression = step[0], step[1]
+        arg = step[2] if len(step) > 2 else None
+        if expression not in EXPRESSION_OPS:
+            raise ValueError(f"Unknown expression '{expression}'")
+        if offset_ms < 0:
+            raise ValueError(f"Negative offset {offset_ms} for '{expression}'")
+        flags = 0
+        if arg == "indefinite":
+            flags, arg = COMMAND_FLAG_INDEFINITE, None
+        records.append(encode_command(EXPRESSION_OPS[expression], arg, flags, sequence_id, int(offset_ms), head))
+    header = encode_command(CommandOp.SEQUENCE, len(records), COMMAND_FLAG_REPLACE if replace else 0, sequence_id,
+                            head=head)
+    return header + b"".join(records)
+
+
+class LatencyStats:
+    """
+    Running statistics of the latency between sending a command and the
+    first rendered frame that includes its effect.
+
+    Args:
+        frame_budget_ms (float): Latency up to which a command counts as
+            having landed within one frame.
+    """
+    def __init__(self, frame_budget_ms):
+        self.frame_budget_ms = frame_budget_ms
+        self.count = 0
+        self.within_frame = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+        self.last_ms = None
+
+    def record(self, latency_ms):
+        self.count += 1
+        self.total_ms += latency_ms
+        self.last_ms = latency_ms
+        if self.min_ms is None or latency_ms < self.min_ms: self.min_ms = latency_ms
+        if self.max_ms is None or latency_ms > self.max_ms: self.max_ms = latency_ms
+        if latency_ms <= self.frame_budget_ms: self.within_frame += 1
+
+    def get_stats(self):
+        """Returns the statistics as a dict (times in milliseconds)."""
+        return {
+            "count": self.count,
+            "within_frame": self.within_frame,
+            "frame_budget_ms": self.frame_budget_ms,
+            "mean_ms": self.total_ms / self.count if self.count else None,
+            "min_ms": self.min_ms,
+            "max_ms": self.max_ms,
+            "last_ms": self.last_ms,
+        }
+
+
+def _percentile(sorted_values, fraction):
+    """Returns the nearest-rank percentile of an already sorted list."""
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def _summarize_times(values):
+    """Returns count, mean, p50/p95/p99 and max of a list of times in ms."""
+    if not values:
+        return {"count": 0, "mean_ms": None, "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered),
+        "p50_ms": _percentile(ordered, 0.50),
+        "p95_ms": _percentile(ordered, 0.95),
+        "p99_ms": _percentile(ordered, 0.99),
+        "max_ms": ordered[-1],
+    }
+
+
+class FrameTimingStats:
+    """
+    Rolling per-phase timings of the render loop over the last `window` frames.
+
+    Phase times are kept in fixed-size ring buffers and only sorted when a
+    snapshot is taken, so recording a frame is a few appends.
+
+    Args:
+        frame_budget_ms (float): Duration of one frame at the target frame rate.
+        window (int): Number of most recent frames the percentiles cover.
+    """
+    PHASES = ("commands", "events", "update", "draw", "present", "export", "sleep")
+
+    def __init__(self, frame_budget_ms, window=600):
+        self.frame_budget_ms = frame_budget_ms
+        self.window = window
+        self.frames = 0
+        self.dropped_frames = 0
+        self.phase_times = {phase: collections.deque(maxlen=window) for phase in self.PHASES}
+        self.frame_times = collections.deque(maxlen=window)
+        self.state_frame_times = {}
+        self.frame_end_times = collections.deque(maxlen=window)
+
+    def record(self, phase_ms, states, frame_end):
+        """
+        Records one frame.
+
+        Args:
+            phase_ms (tuple): Milliseconds spent in each of PHASES, in order.
+            states (iterable): Animation states shown in the frame.
+            frame_end (float): `time.perf_counter()` at the end of the frame.
+        """
+        for phase, duration in zip(self.PHASES, phase_ms):
+            self.phase_times[phase].append(duration)
+        frame_ms = sum(phase_ms)
+        self.frame_times.append(frame_ms)
+        for state in states:
+            times = self.state_frame_times.get(state)
+            if times is None:
+                times = self.state_frame_times[state] = collections.deque(maxlen=self.window)
+            times.append(frame_ms)
+        self.frame_end_times.append(frame_end)
+        self.frames += 1
+        # Work beyond the budget delays the frame by whole refresh periods
+        self.dropped_frames += int((frame_ms - phase_ms[-1]) // self.frame_budget_ms)
+
+    def get_fps(self):
+        """Returns the frame rate achieved over the window, or None before two frames."""
+        if len(self.frame_end_times) < 2:
+            return None
+        elapsed = self.frame_end_times[-1] - self.frame_end_times[0]
+        return (len(self.frame_end_times) - 1) / elapsed if elapsed > 0 else None
+
+    def get_stats(self):
+        """Returns a snapshot of the statistics as a dict (times in milliseconds)."""
+        return {
+            "frames": self.frames,
+            "dropped_frames": self.dropped_frames,
+            "fps": self.get_fps(),
+            "frame_budget_ms": self.frame_budget_ms,
+            "frame": _summarize_times(self.frame_times),
+            "phases": {phase: _summarize_times(times) for phase, times in self.phase_times.items()},
+            "states": {state: _summarize_times(times) for state, times in self.state_frame_times.items()},
+        }
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler of the render thread for a bounded window, started
+    on demand in a running eye process.
+
+    A daemon thread wakes every `interval_ms`, takes the render thread's
+    current stack from `sys._current_frames()` and counts it under the
+    animation state(s) shown at that moment. Nothing is hooked into the
+    render loop itself, so the frames being measured run at full speed
+    and there is no cost at all when no profile is running. The result is
+    written in the collapsed-stack format of flamegraph.pl / speedscope,
+    one "state;outer frame;...;inner frame count" line per stack, with the
+    state as the root frame so the flame graph splits by state.
+
+    Args:
+        thread_id (int): `threading.get_ident()` of the render thread.
+        get_state (callable): Returns the name of the state(s) active now.
+        duration_ms (float): Length of the sampling window.
+        interval_ms (float, optional): Time between two samples. Defaults to 5.
+        root_code (code, optional): Code object of the outermost frame kept,
+            which cuts off e.g. the multiprocessing bootstrap frames.
+    """
+    def __init__(self, thread_id, get_state, duration_ms, interval_ms=5, root_code=None):
+        self.thread_id = thread_id
+        self.root_code = root_code
+        self.get_state = get_state
+        self.duration_ms = duration_ms
+        self.interval_ms = interval_ms
+        # "state;frame;..." -> sample count
+        self.stacks = collections.Counter()
+        self.state_samples = collections.Counter()
+        self.samples = 0
+        # Set by the sampling thread once the window is over
+        self.finished = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        import sys
+
+        deadline = time.perf_counter() + self.duration_ms / 1000
+        # Cache of the label of every code object seen, the label formatting is most of the sampling cost
+        labels = {}
+        while time.perf_counter() < deadline:
+            time.sleep(self.interval_ms / 1000)
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break  # The render thread is gone
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                stack.append(label)
+                if code is self.root_code:
+                    break
+                frame = frame.f_back
+            del frame
+            state = self.get_state()
+            stack.append(state)
+            self.stacks[";".join(reversed(stack))] += 1
+            self.state_samples[state] += 1
+            self.samples += 1
+        self.finished.set()
+
+    def write(self, directory=None):
+        """Writes the collapsed stacks into `directory` (the temp dir by default) and returns the file path."""
+        import tempfile
+
+        directory = directory or tempfile.gettempdir()
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"monkey_eyes_profile_{os.getpid()}_{time.strftime('%Y%m%d_%H%M%S')}.folded")
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+class CommandScheduler:
+    """
+    Bounded intake of the expression commands received during one frame.
+
+    Commands are queued while the pipe is drained and resolved once per
+    frame: per head, the command with the highest priority wins and among
+    equal priorities the last one received (last writer wins). The others
+    are coalesced away, so a burst of commands resets the eyes only once.
+
+    Args:
+        priorities (dict, optional): Priority per expression name (keys of
+            EXPRESSION_OPS), overriding the `priority` of the registered
+            Expression. A running expression is only cut off by one of at
+            least its priority.
+        max_pending (int): Most commands queued within one frame.
+        drop_policy (str): "oldest" drops the oldest queued command when the
+            queue is full, "newest" drops the incoming one.
+    """
+    def __init__(self, priorities=None, max_pending=64, drop_policy="oldest"):
+        if drop_policy not in ("oldest", "newest"):
+            raise ValueError(f"Unknown drop policy '{drop_policy}'")
+        priorities = priorities or {}
+        for name in priorities:
+            if name not in EXPRESSION_OPS:
+                raise ValueError(f"Unknown expression '{name}'")
+        # Overridden priorities per opcode, the others come from EXPRESSIONS
+        self.priorities = {EXPRESSION_OPS[name]: priority for name, priority in priorities.items()}
+        self.max_pending = max_pending
+        self.drop_policy = drop_policy
+        # Queued (op, arg, flags, seq, sent_ns, head) records
+        self.pending = collections.deque()
+        self.received = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.rejected = 0
+
+    def get_priority(self, op):
+        priority = self.priorities.get(op)
+        if priority is None:
+            expression = EXPRESSIONS.by_op.get(op)
+            priority = expression.priority if expression is not None else 0
+        return priority
+
+    def push(self, command):
+        """Queues a command. Returns the command dropped to respect `max_pending`, or None."""
+        self.received += 1
+        if len(self.pending) < self.max_pending:
+            self.pending.append(command)
+            return None
+        self.dropped += 1
+        if self.drop_policy == "newest":
+            return command
+        dropped = self.pending.popleft()
+        self.pending.append(command)
+        return dropped
+
+    def pop_winners(self, head_count):
+        """
+        Empties the queue and returns (winners, losers): a dict of the winning
+        command per head index, and (command, lost_heads) for every command
+        that did not win all the heads it addressed.
+        """
+        winners = {}
+        for command in self.pending:
+            op, head = command[0], command[5]
+            heads = range(head_count) if head == ALL_HEADS else (head,)
+            for index in heads:
+                current = winners.get(index)
+                if current is None or self.get_priority(op) >= self.get_priority(current[0]):
+                    winners[index] = command
+
+        won_heads = collections.Counter(id(command) for command in winners.values())
+        losers = []
+        for command in self.pending:
+            addressed = head_count if command[5] == ALL_HEADS else 1
+            won = won_heads[id(command)]
+            if won == 0:
+                self.coalesced += 1
+            if won < addressed:
+                losers.append((command, addressed - won))
+        self.pending.clear()
+        return winners, losers
+
+    def get_stats(self):
+        """Returns the command counters as a dict."""
+        return {
+            "received": self.received,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+        }
+
+
+class KeyframeTrack:
+    """
+    An animation baked into per-frame arrays at the reference frame rate.
+
+    Attributes:
+        rects (numpy.ndarray or None): int16 array of shape (frames, 2, 4) with
+            the (x, y, width, height) of the left and right eye per frame.
+        values (numpy.ndarray or None): Per-frame laugh offsets or star scales.
+    """
+    def __init__(self, rects=None, values=None):
+        self.rects = rects
+        self.values = values
+        # Plain-list copies for playback, indexing them is cheaper than
+        # converting NumPy scalars every frame.
+        self.rect_frames = rects.tolist() if rects is not None else None
+        self.value_frames = values.tolist() if values is not None else None
+
+    def __len__(self):
+        return len(self.rects) if self.rects is not None else len(self.values)
+
+
+def bake_keyframe_tracks(animation, kind, param=None):
+    """
+    Bakes an animation by stepping a scratch copy of the given
+    AnimationManager frame by frame and recording the result of every frame.
+
+    Args:
+        animation (AnimationManager): Manager whose geometry and speeds are used.
+        kind (str): "blink" (param: blink count), "look" (param: direction),
+            "concentrate" (both phases), "laugh" or "star" (param: duration in ms).
+
+    Returns:
+        dict: KeyframeTrack per track name. "concentrate" yields the
+        "concentrate_in" and "concentrate_out" phases, the other kinds a
+        single track of the same name.
+    """
+    if np is None:
+        raise ImportError("Baking keyframe tracks requires NumPy")
+
+    # The scratch manager draws its idle intervals from the global random
+    # generator, which is restored so baking never changes what a seeded run plays
+    random_state = random.getstate()
+    try:
+        left, right = animation.eye_pair.left_eye.original_rect, animation.eye_pair.right_eye.original_rect
+        eye_pair = EyePair(left.x, right.x, left.y, left.width, left.height, animation.eye_pair.distance)
+        sim = AnimationManager(eye_pair, frame_based=True)
+        for name in AnimationManager.BAKED_ATTRIBUTES:
+            setattr(sim, name, getattr(animation, name))
+        # Never start a blink on its own while baking
+        sim.blink_interval = float("inf")
+
+        # Set the states up directly instead of through the trigger methods,
+        # whose random choices would not match the requested track.
+        if kind == "blink":
+            sim.set_state(AnimationState.BLINKING)
+            sim.shrinking = True
+            sim.target_blink_count = param
+        elif kind == "look":
+            sim.set_state(AnimationState.MOVING)
+            sim.moving_away = True
+            sim.looking_direction = param
+        elif kind == "concentrate":
+            sim.trigger_concentrate(duration=0)
+        elif kind == "laugh":
+            sim.trigger_laugh()
+        elif kind == "star":
+            sim.trigger_star(duration=param)
+        else:
+            raise ValueError(f"Unknown keyframe track '{kind}'")
+
+        rects, values = [], []
+        split = None
+        # Whole-millisecond ticks like the live clocks, so the pauses end on the same frame
+        clock = SimulatedClock(AnimationManager.FRAME_DURATION_MS)
+        while sim.current_state != AnimationState.IDLE:
+            clock.tick()
+            sim.update(clock.get_ticks())
+            rects.append((tuple(eye_pair.left_eye.rect), tuple(eye_pair.right_eye.rect)))
+            values.append(sim.laugh_offset if kind == "laugh" else sim.star_scale)
+            if kind == "concentrate" and split is None and not sim.shrinking:
+                split = len(rects)
+    finally:
+        random.setstate(random_state)
+
+    rects = np.array(rects, dtype=np.int16)
+    values = np.array(values, dtype=np.float64)
+    if kind == "concentrate":
+        return {
+            "concentrate_in": KeyframeTrack(rects[:split]),
+            "concentrate_out": KeyframeTrack(rects[split:]),
+        }
+    if kind in ("laugh", "star"):
+        return {kind: KeyframeTrack(values=values)}
+    return {kind: KeyframeTrack(rects)}
+
+
+class KeyframeTrackCache:
+    """
+    Cache of baked keyframe tracks, keyed by track name, parameter and the
+    bake signature (geometry and speeds) of the AnimationManager using them.
+    Tracks are baked on first use, or up front with `prebake()`.
+    """
+    def __init__(self):
+        self._tracks = {}
+        self.bakes = 0
+
+    def get(self, animation, kind, param=None):
+        """Returns the KeyframeTrack for the given track name and parameter, baking it if needed."""
+        signature = animation.get_bake_signature()
+        key = (kind, param, signature)
+        track = self._tracks.get(key)
+        if track is None:
+            bake_kind = "concentrate" if kind.startswith("concentrate") else kind
+            for name, baked in bake_keyframe_tracks(animation, bake_kind, param).items():
+                self._tracks[(name, param, signature)] = baked
+            self.bakes += 1
+            track = self._tracks[key]
+        return track
+
+    def prebake(self, animation):
+        """Bakes the tracks of the idle behaviour and the default expression durations."""
+        for kind, param in (("blink", 1), ("blink", 2), ("look", 1), ("look", -1),
+                            ("concentrate_in", None), ("laugh", None), ("star", 3000)):
+            self.get(animation, kind, param)
+
+
+class PygameClock:
+    """
+    Real-time clock of the render loop, backed by `pygame.time`.
+    """
+    realtime = True
+
+    def __init__(self):
+        self._clock = pygame.time.Clock()
+
+    def get_ticks(self):
+        """Returns the milliseconds since `pygame.init()`."""
+        return pygame.time.get_ticks()
+
+    def tick(self, framerate=0):
+        """Sleeps to keep the given frame rate and returns the frame duration in ms."""
+        return self._clock.tick(framerate)
+
+
+class SimulatedClock:
+    """
+    Deterministic clock for headless rendering, tests and benchmarks.
+
+    Every `tick()` advances the time by a fixed frame duration without sleeping,
+    so a run renders the same frames regardless of how fast the machine is.
+
+    Args:
+        frame_ms (float): Milliseconds added by every tick. Defaults to one 60 fps frame.
+        start_ticks (float): Initial value of the clock in milliseconds.
+    """
+    realtime = False
+
+    def __init__(self, frame_ms=1000 / 60, start_ticks=0):
+        self.frame_ms = frame_ms
+        self.ticks = start_ticks
+
+    def get_ticks(self):
+        """Returns the simulated milliseconds as an int, like `pygame.time.get_ticks()`."""
+        return int(self.ticks)
+
+    def tick(self, framerate=0):
+        """Advances the clock by one frame and returns the frame duration in ms."""
+        self.ticks += self.frame_ms
+        return self.frame_ms
+
+    def advance(self, milliseconds):
+        """Advances the clock by the given number of milliseconds."""
+        self.ticks += milliseconds
+
+
+# Shared-memory frame header: sequence number of the latest frame (u64),
+# frame width and height (u32). The two frame buffers follow the header.
+FRAME_HEADER_STRUCT = struct.Struct("<QII")
+
+
+class FrameExporter:
+    """
+    Copies rendered frames into a `multiprocessing.shared_memory` double
+    buffer that other processes read with `FrameReader`.
+
+    Every export writes the (optionally downscaled) frame as RGB into the
+    buffer the readers are not pointed at, then publishes it by bumping the
+    sequence number in the header. Frame `seq` lives in buffer `seq % 2`.
+
+    Args:
+        name (str): Name of the shared memory block to create.
+        screen_size (tuple): (width, height) of the rendered frames.
+        fps (float): Maximum export rate. 0 or None exports every frame.
+        scale (float): Downscale factor of the exported frames.
+    """
+    def __init__(self, name, screen_size, fps=15, scale=1.0):
+        from multiprocessing import shared_memory
+
+        self.width = max(1, round(screen_size[0] * scale))
+        self.height = max(1, round(screen_size[1] * scale))
+        self.interval_ms = 1000 / fps if fps else 0
+        self.last_export_ticks = None
+        self.sequence = 0
+        frame_bytes = self.width * self.height * 3
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=FRAME_HEADER_STRUCT.size + 2 * frame_bytes)
+        FRAME_HEADER_STRUCT.pack_into(self.shm.buf, 0, 0, self.width, self.height)
+        self.buffers = [
+            np.ndarray((self.height, self.width, 3), np.uint8, self.shm.buf, FRAME_HEADER_STRUCT.size + i * frame_bytes)
+            for i in range(2)
+        ]
+        self.downscale = (self.width, self.height) != tuple(screen_size)
+        # Scratch surface the screen is scaled into, in the screen's pixel format
+        self.scaled_surface = None
+
+    def export(self, surface, current_ticks):
+        """
+        Exports `surface` (a Surface or a `TextureCanvas`, which is only read
+        back when a frame is due) if the export interval has passed. Returns
+        True if a frame was written.
+        """
+        if self.last_export_ticks is not None and current_ticks - self.last_export_ticks < self.interval_ms:
+            return False
+        self.last_export_ticks = current_ticks
+        if isinstance(surface, TextureCanvas):
+            surface = surface.to_surface()
+        if self.downscale:
+            if self.scaled_surface is None:
+                self.scaled_surface = pygame.Surface((self.width, self.height), 0, surface)
+            surface = pygame.transform.scale(surface, (self.width, self.height), self.scaled_surface)
+        sequence = self.sequence + 1
+        # pixels3d is a (width, height, 3) view of the surface, so the only
+        # copy is the transposed write into shared memory.
+        pixels = pygame.surfarray.pixels3d(surface)
+        np.copyto(self.buffers[sequence % 2], pixels.transpose(1, 0, 2))
+        del pixels  # Unlocks the surface
+        self.sequence = sequence
+        FRAME_HEADER_STRUCT.pack_into(self.shm.buf, 0, sequence, self.width, self.height)
+        return True
+
+    def close(self):
+        """Releases and removes the shared memory block."""
+        self.buffers = []
+        self.shm.close()
+        self.shm.unlink()
+
+
+class FrameReader:
+    """
+    Reads the frames a `FrameExporter` publishes, as NumPy views into the
+    shared memory (no copying or pickling).
+
+    Args:
+        name (str): Name of the exporter's shared memory block.
+    """
+    def __init__(self, name):
+        from multiprocessing import shared_memory
+
+        self.shm = shared_memory.SharedMemory(name=name)
+        _, self.width, self.height = FRAME_HEADER_STRUCT.unpack_from(self.shm.buf, 0)
+        frame_bytes = self.width * self.height * 3
+        self.buffers = [
+            np.ndarray((self.height, self.width, 3), np.uint8, self.shm.buf, FRAME_HEADER_STRUCT.size + i * frame_bytes)
+            for i in range(2)
+        ]
+
+    def get_sequence(self):
+        """Returns the sequence number of the latest frame, 0 if none was exported yet."""
+        return FRAME_HEADER_STRUCT.unpack_from(self.shm.buf, 0)[0]
+
+    def get_latest_frame(self):
+        """
+        Returns (sequence, frame) with `frame` a read-only (height, width, 3)
+        RGB view of the latest frame, or (0, None) if none was exported yet.
+
+        The view stays intact while the exporter writes the next frame into
+        the other buffer and is overwritten by the export after that, so
+        call `frame.copy()` to keep it longer than one export interval.
+        """
+        sequence = self.get_sequence()
+        if sequence == 0:
+            return 0, None
+        frame = self.buffers[sequence % 2].view()
+        frame.flags.writeable = False
+        return sequence, frame
+
+    def close(self):
+        self.buffers = []
+        self.shm.close()
+
+
+# Gaze slot: version (u64, odd while being written), x and y (f64)
+GAZE_SLOT_STRUCT = struct.Struct("<Qdd")
+
+
+class GazeChannel:
+    """
+    Latest-value shared-memory slots for gaze targets, one per head.
+
+    There is no queue: every write overwrites the slot, so the reader only
+    ever sees the newest target and a 60 Hz tracker cannot build a backlog.
+    Writes are published with a sequence lock instead of a mutex. The
+    single writer makes the version odd, writes x and y and makes it even
+    again; a reader that sees an odd or changed version skips the slot for
+    this frame. A NaN target means "stop following".
+
+    Args:
+        name (str): Name of the shared memory block.
+        slots (int): Number of slots (heads).
+        create (bool): If True, the block is created (by the writer),
+            otherwise an existing one is attached.
+    """
+    def __init__(self, name, slots=1, create=False):
+        from multiprocessing import shared_memory
+
+        self.slots = slots
+        if create:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=slots * GAZE_SLOT_STRUCT.size)
+            self.shm.buf[:] = bytes(len(self.shm.buf))
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        # Version of every slot the reader has applied
+        self.read_versions = [0] * slots
+
+    def write(self, slot, x, y):
+        """Publishes the gaze target of `slot`. Only one process may write."""
+        offset = slot * GAZE_SLOT_STRUCT.size
+        version = GAZE_SLOT_STRUCT.unpack_from(self.shm.buf, offset)[0]
+        struct.pack_into("<Q", self.shm.buf, offset, version + 1)
+        GAZE_SLOT_STRUCT.pack_into(self.shm.buf, offset, version + 1, x, y)
+        struct.pack_into("<Q", self.shm.buf, offset, version + 2)
+
+    def read(self, slot):
+        """
+        Returns the (x, y) target of `slot` if it changed since the last
+        read, otherwise (or while it is being written) None.
+        """
+        offset = slot * GAZE_SLOT_STRUCT.size
+        version, x, y = GAZE_SLOT_STRUCT.unpack_from(self.shm.buf, offset)
+        if version == self.read_versions[slot] or version % 2:
+            return None
+        if struct.unpack_from("<Q", self.shm.buf, offset)[0] != version:
+            return None  # Torn read, the next frame picks it up
+        self.read_versions[slot] = version
+        return x, y
+
+    def has_changes(self):
+        """Returns True if any slot was written since its last read."""
+        return any(
+            struct.unpack_from("<Q", self.shm.buf, slot * GAZE_SLOT_STRUCT.size)[0] != self.read_versions[slot]
+            for slot in range(self.slots)
+        )
+
+    def close(self, unlink=False):
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+# Heartbeat block: frames presented (u64), time.monotonic() of the last beat
+# (f64), frames over the spike threshold (u64), duration of the last spike
+# and of the last frame in ms (f64)
+HEARTBEAT_STRUCT = struct.Struct("<QdQdd")
+
+
+class Heartbeat:
+    """
+    Shared-memory heartbeat of an eye process, watched by the controller.
+
+    The render loop publishes a frame counter, the time of its last frame
+    and the number of frames whose work took longer than `spike_ms`; while
+    power saving sleeps it keeps bumping the timestamp. Every field is
+    written by the eye process only, so a reader at worst sees a value one
+    frame old.
+
+    Args:
+        name (str): Name of the shared memory block.
+        create (bool): If True, the block is created (by the controller),
+            otherwise an existing one is attached.
+        spike_ms (float): Frame work time counted as a spike.
+    """
+    def __init__(self, name, create=False, spike_ms=250):
+        from multiprocessing import shared_memory
+
+        if create:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=HEARTBEAT_STRUCT.size)
+            self.reset()
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.spike_ms = spike_ms
+        self.frames = 0
+        self.spikes = 0
+        self.last_spike_ms = 0.0
+
+    def publish_frame(self, frame_ms):
+        """Publishes a presented frame whose work took `frame_ms`."""
+        self.frames += 1
+        if frame_ms > self.spike_ms:
+            self.spikes += 1
+            self.last_spike_ms = frame_ms
+        HEARTBEAT_STRUCT.pack_into(self.shm.buf, 0, self.frames, time.monotonic(), self.spikes,
+                                   self.last_spike_ms, frame_ms)
+
+    def publish_alive(self):
+        """Bumps the timestamp without a frame, while the render loop sleeps."""
+        struct.pack_into("<d", self.shm.buf, 8, time.monotonic())
+
+    def read(self):
+        """Returns (frames, last_beat, spikes, last_spike_ms, last_frame_ms)."""
+        return HEARTBEAT_STRUCT.unpack_from(self.shm.buf, 0)
+
+    def reset(self):
+        self.shm.buf[:HEARTBEAT_STRUCT.size] = bytes(HEARTBEAT_STRUCT.size)
+
+    def close(self, unlink=False):
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def encode_gaze(x, y):
+    """Packs a gaze target (-1..1 each, NaN to stop following) into a command argument."""
+    if math.isnan(x) or math.isnan(y):
+        return struct.unpack("<i", struct.pack("<hh", -0x8000, -0x8000))[0]
+    return struct.unpack("<i", struct.pack("<hh", round(min(max(x, -1.0), 1.0) * 0x7FFF),
+                                           round(min(max(y, -1.0), 1.0) * 0x7FFF)))[0]
+
+
+def decode_gaze(arg):
+    """Unpacks a gaze target packed by `encode_gaze()`. Returns (None, None) for "stop following"."""
+    x, y = struct.unpack("<hh", struct.pack("<i", arg))
+    if x == -0x8000:
+        return None, None
+    return x / 0x7FFF, y / 0x7FFF
+
+
+# Session log header: magic, format version, random seed (u32), wall-clock
+# start in ns (u64) and length of the JSON app options that follow (u32)
+SESSION_LOG_HEADER_STRUCT = struct.Struct("<4sHIQI")
+SESSION_LOG_MAGIC = b"MEYL"
+# Session log record: ticks since the start (u32), message length (u16),
+# followed by the message as received on the command pipe
+SESSION_RECORD_STRUCT = struct.Struct("<IH")
+
+
+class SessionRecorder:
+    """
+    Appends every message the eye process receives, with the tick of the
+    frame that received it, to a compact binary session log.
+
+    A record is 6 bytes plus the message (24 bytes for a plain command),
+    written through a large file buffer, so recording costs a struct pack
+    and a memory copy per command. The render loop calls `flush_if_due()`
+    every frame, which writes the buffer out at most once per
+    `flush_interval_ms`, so a crashed or killed renderer loses at most that
+    much of its log. The header stores the random seed and the app
+    options, so `SessionPlayer` can replay the session exactly.
+
+    Args:
+        path (str): Log file to create (an existing one is overwritten).
+        seed (int): Seed the app's blink randomness was initialized with.
+        options (dict): MonkeyEyeApp options the session was rendered with.
+        start_ticks (int): Clock ticks at the start of the session.
+        flush_interval_ms (float, optional): Longest time records stay in
+            the file buffer. Defaults to 1000.
+    """
+    def __init__(self, path, seed, options, start_ticks=0, flush_interval_ms=1000):
+        self.start_ticks = start_ticks
+        self.flush_interval_ms = flush_interval_ms
+        # time.monotonic() of the first record not written out yet, None if there is none
+        self.unflushed_since = None
+        self.file = open(path, "wb", buffering=64 * 1024)
+        options_json = json.dumps(options).encode()
+        self.file.write(SESSION_LOG_HEADER_STRUCT.pack(SESSION_LOG_MAGIC, 1, seed, time.time_ns(), len(options_json)))
+        self.file.write(options_json)
+        self.quit_recorded = False
+
+    def record(self, ticks, data):
+        """Appends a received message."""
+        self.file.write(SESSION_RECORD_STRUCT.pack(max(0, ticks - self.start_ticks), len(data)))
+        self.file.write(data)
+        if self.unflushed_since is None:
+            self.unflushed_since = time.monotonic()
+        if data[0] == CommandOp.QUIT:
+            self.quit_recorded = True
+
+    def flush_if_due(self):
+        """Writes the buffered records out if the oldest has waited for `flush_interval_ms`."""
+        if self.unflushed_since is not None and \
+                (time.monotonic() - self.unflushed_since) * 1000 >= self.flush_interval_ms:
+            self.file.flush()
+            self.unflushed_since = None
+
+    def close(self, end_ticks):
+        """Ends the log with a QUIT at `end_ticks` (unless one was received) and closes it."""
+        if not self.quit_recorded:
+            self.record(end_ticks, encode_command(CommandOp.QUIT))
+        self.file.close()
+
+
+class SessionPlayer:
+    """
+    Plays a session log back into a MonkeyEyeApp, standing in for its
+    command pipe: `poll()` reports a message once the app's clock reaches
+    the tick it was recorded at, replies are discarded, and the end of the
+    log reads as QUIT. See `replay_session()`.
+
+    Args:
+        path (str): Log written by `SessionRecorder`.
+    """
+    def __init__(self, path):
+        self.file = open(path, "rb", buffering=64 * 1024)
+        header = self.file.read(SESSION_LOG_HEADER_STRUCT.size)
+        if len(header) < SESSION_LOG_HEADER_STRUCT.size or header[:4] != SESSION_LOG_MAGIC:
+            self.file.close()
+            raise ValueError(f"{path} is not a Monkey Eyes session log")
+        _, self.version, self.seed, self.start_time_ns, options_length = SESSION_LOG_HEADER_STRUCT.unpack(header)
+        self.options = json.loads(self.file.read(options_length))
+        self.clock = None
+        self.messages = 0
+        self.next_record = self._read_record()
+
+    def _read_record(self):
+        header = self.file.read(SESSION_RECORD_STRUCT.size)
+        if len(header) < SESSION_RECORD_STRUCT.size:
+            return None
+        ticks, length = SESSION_RECORD_STRUCT.unpack(header)
+        data = self.file.read(length)
+        return (ticks, data) if len(data) == length else None
+
+    def get_duration_ms(self):
+        """Returns the ticks of the last record, reading the rest of the log."""
+        position = self.file.tell()
+        duration = self.next_record[0] if self.next_record else 0
+        record = self._read_record()
+        while record is not None:
+            duration = record[0]
+            record = self._read_record()
+        self.file.seek(position)
+        return duration
+
+    def poll(self, timeout=0):
+        return self.next_record is None or self.next_record[0] <= self.clock.get_ticks()
+
+    def recv_bytes(self):
+        if self.next_record is None:
+            return encode_command(CommandOp.QUIT)
+        data = self.next_record[1]
+        self.next_record = self._read_record()
+        self.messages += 1
+        return data
+
+    def send(self, reply):
+        pass
+
+    def close(self):
+        self.file.close()
+
+
+# Magic string of the WebSocket handshake (RFC 6455)
+WEBSOCKET_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+# Largest message a CommandServer client may send: a JSON line, an HTTP
+# upgrade request or a WebSocket message with all its fragments
+MAX_SERVER_MESSAGE_BYTES = 1 << 20
+
+
+class _ServerRequest:
+    """A request of a `CommandServer` client, standing in for the sequence number of its replies."""
+    __slots__ = ("client", "request_id")
+
+    def __init__(self, client, request_id):
+        self.client = client
+        self.request_id = request_id
+
+
+class _ServerClient:
+    """One persistent connection of a `CommandServer`, newline-delimited JSON or WebSocket."""
+    def __init__(self, sock):
+        self.sock = sock
+        self.websocket = None  # None until the first bytes tell the protocol apart
+        self.inbox = bytearray()
+        self.outbox = bytearray()
+        self.fragments = bytearray()
+        self.closed = False
+
+
+class CommandServer:
+    """
+    Local command server of the eye process, so a backend can drive the
+    eyes directly instead of through a Python parent with an EyesController.
+
+    Listens on a Unix socket ("unix:/run/eyes.sock") or TCP ("tcp:127.0.0.1:8765")
+    and serves every connection on one selector thread, off the render
+    thread. A connection speaks newline-delimited JSON, or WebSocket (text
+    frames of JSON) if it opens with an HTTP upgrade request. Connections
+    are persistent and pipelined: a message is one request object or a
+    JSON array of them (a batch), and requests are not answered in lock
+    step. Every request is acknowledged right away with
+    {"type": "ack", "id": ...}, or {"type": "error", ...} if it is invalid.
+    Accepted commands are queued for the render loop, which picks them up
+    once per frame like the command pipe and sends {"type": "completed",
+    "id": ..., "completed": bool} when a notified expression is over.
+
+    Requests:
+        {"id": 1, "expression": "smile", "duration_ms": 2000, "head": 0}
+            Any expression of EXPRESSION_OPS. "indefinite": true for
+            "concentrate", "head": "all" for every head and "notify": false
+            to skip the completion event.
+        {"id": 2, "sequence": [[0, "laugh"], [1500, "smile", 1000]], "replace": false}
+        {"id": 3, "cancel_sequence": 2}   (null cancels every sequence)
+        {"id": 4, "query": "stats"}       (or "latency"), answered with
+            {"type": "stats", "id": 4, "stats": {...}}
+        {"id": 5, "query": "profile", "duration_ms": 5000}, answered with
+            {"type": "profile", "id": 5, "profile": "<path>"} when done
+
+    Args:
+        address (str): "unix:<path>" or "tcp:<host>:<port>".
+    """
+    def __init__(self, address):
+        import selectors
+
+        self.address = address
+        # (message bytes, _ServerRequest or None) for the render loop
+        self.commands = collections.deque()
+        self.selector = selectors.DefaultSelector()
+        self.clients = {}
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+        self.sequence_ids = 0
+        self.listener = None
+        self.unix_path = None
+        # Socket pair the render thread wakes the selector with when replies are queued
+        self.wake_reader = None
+        self.wake_writer = None
+
+    def start(self):
+        """Opens the listening socket and starts the server thread."""
+        import selectors
+        import socket
+
+        kind, _, location = self.address.partition(":")
+        if kind == "unix":
+            if os.path.exists(location):
+                os.unlink(location)  # Left over from a process that was killed
+            self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.listener.bind(location)
+            self.unix_path = location
+        elif kind == "tcp":
+            host, _, port = location.rpartition(":")
+            self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.listener.bind((host or "127.0.0.1", int(port)))
+        else:
+            raise ValueError(f"Unknown command server address '{self.address}', expected unix:<path> or tcp:<host>:<port>")
+        self.listener.listen()
+        self.listener.setblocking(False)
+        self.wake_reader, self.wake_writer = socket.socketpair()
+        self.wake_reader.setblocking(False)
+        self.wake_writer.setblocking(False)
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.selector.register(self.wake_reader, selectors.EVENT_READ)
+        self.running = True
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+        print(f"EyeApp: Command server listening on {self.address}")
+
+    def close(self):
+        """Stops the server thread and closes every connection."""
+        if self.thread is None:
+            return
+        self.running = False
+        self._wake()
+        self.thread.join(timeout=1)
+        self.thread = None
+        for client in list(self.clients.values()):
+            client.sock.close()
+        self.clients.clear()
+        for sock in (self.listener, self.wake_reader, self.wake_writer):
+            sock.close()
+        self.selector.close()
+        if self.unix_path and os.path.exists(self.unix_path):
+            os.unlink(self.unix_path)
+
+    def has_commands(self):
+        return bool(self.commands)
+
+    def reply(self, request, kind, payload):
+        """Queues a reply of the render loop to the client of `request`. Thread-safe."""
+        message = {"type": kind, "id": request.request_id}
+        if kind == "completed": message["completed"] = payload
+        else: message[kind] = payload
+        self._send(request.client, message)
+        self._wake()
+
+    def _wake(self):
+        try: self.wake_writer.send(b"\0")
+        except (BlockingIOError, OSError): pass  # Already woken
+
+    def _send(self, client, message):
+        data = json.dumps(message, separators=(",", ":")).encode()
+        with self.lock:
+            if client.closed:
+                return
+            if client.websocket:
+                client.outbox += self._websocket_frame(0x1, data)
+            else:
+                client.outbox += data + b"\n"
+
+    def _serve(self):
+        import selectors
+
+        while self.running:
+            for key, events in self.selector.select(timeout=0.5):
+                if key.fileobj is self.listener:
+                    self._accept()
+                elif key.fileobj is self.wake_reader:
+                    try:
+                        while self.wake_reader.recv(4096): pass
+                    except (BlockingIOError, OSError): pass
+                else:
+                    client = key.data
+                    try:
+                        if events & selectors.EVENT_READ: self._receive(client)
+                        if events & selectors.EVENT_WRITE and not client.closed: self._flush(client)
+                    except Exception as e:
+                        # One misbehaving client must not stop the server thread
+                        print(f"EyeApp: Command server dropped a client after an error: {e}")
+                        if not client.closed: self._disconnect(client)
+            # Watch for writability only while a client has replies queued
+            with self.lock:
+                for client in list(self.clients.values()):
+                    if client.closed:
+                        continue
+                    if client.outbox: self._flush_locked(client)
+                    wanted = selectors.EVENT_READ | (selectors.EVENT_WRITE if client.outbox else 0)
+                    if self.selector.get_key(client.sock).events != wanted:
+                        self.selector.modify(client.sock, wanted, client)
+
+    def _accept(self):
+        import selectors
+
+        try: sock, _ = self.listener.accept()
+        except (BlockingIOError, OSError): return
+        sock.setblocking(False)
+        client = _ServerClient(sock)
+        self.clients[sock.fileno()] = client
+        self.selector.register(sock, selectors.EVENT_READ, client)
+
+    def _disconnect(self, client):
+        with self.lock:
+            client.closed = True
+            client.outbox.clear()
+        self.clients.pop(client.sock.fileno(), None)
+        self.selector.unregister(client.sock)
+        client.sock.close()
+
+    def _flush(self, client):
+        with self.lock:
+            self._flush_locked(client)
+
+    def _flush_locked(self, client):
+        try:
+            sent = client.sock.send(client.outbox)
+            del client.outbox[:sent]
+        except BlockingIOError:
+            pass
+        except OSError:
+            client.outbox.clear()
+
+    def _receive(self, client):
+        try: data = client.sock.recv(65536)
+        except BlockingIOError: return
+        except OSError: data = b""
+        if not data:
+            self._disconnect(client)
+            return
+        client.inbox += data
+        if client.websocket is None:
+            start = bytes(client.inbox.lstrip())
+            # JSON is known from its first byte, so a short request is not kept waiting
+            if start[:1] in (b"{", b"["):
+                client.websocket = False
+            elif b"GET ".startswith(start):
+                return
+            else:
+                client.websocket = start.startswith(b"GET ")
+        if client.websocket:
+            self._receive_websocket(client)
+        else:
+            while b"\n" in client.inbox:
+                line, _, rest = bytes(client.inbox).partition(b"\n")
+                client.inbox = bytearray(rest)
+                if line.strip():
+                    self._handle_message(client, line)
+            if len(client.inbox) > MAX_SERVER_MESSAGE_BYTES:
+                print(f"EyeApp: Command server dropped a client sending a line over {MAX_SERVER_MESSAGE_BYTES} bytes")
+                self._disconnect(client)
+
+    def _receive_websocket(self, client):
+        if client.websocket is True:
+            # Waiting for the end of the HTTP upgrade request
+            end = client.inbox.find(b"\r\n\r\n")
+            if end < 0:
+                if len(client.inbox) > MAX_SERVER_MESSAGE_BYTES:
+                    self._disconnect(client)
+                return
+            headers = bytes(client.inbox[:end]).decode("latin-1").split("\r\n")[1:]
+            del client.inbox[:end + 4]
+            key = next((line.split(":", 1)[1].strip() for line in headers
+                        if line.lower().startswith("sec-websocket-key:")), None)
+            if key is None:
+                self._disconnect(client)
+                return
+            accept = base64.b64encode(hashlib.sha1(key.encode() + WEBSOCKET_GUID).digest()).decode()
+            with self.lock:
+                client.outbox += (b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                                  b"Sec-WebSocket-Accept: " + accept.encode() + b"\r\n\r\n")
+            client.websocket = "open"
+        while True:
+            try:
+                frame = self._parse_websocket_frame(client.inbox, MAX_SERVER_MESSAGE_BYTES - len(client.fragments))
+            except ValueError as e:
+                # Closed with status 1009 (message too big) instead of buffering it
+                print(f"EyeApp: Command server dropped a WebSocket client: {e}")
+                with self.lock: client.outbox += self._websocket_frame(0x8, struct.pack(">H", 1009))
+                self._flush(client)
+                self._disconnect(client)
+                return
+            if frame is None:
+                return
+            fin, opcode, payload, size = frame
+            del client.inbox[:size]
+            if opcode == 0x8:
+                with self.lock: client.outbox += self._websocket_frame(0x8, payload[:2])
+                self._flush(client)
+                self._disconnect(client)
+                return
+            if opcode == 0x9:
+                with self.lock: client.outbox += self._websocket_frame(0xA, payload)
+            elif opcode in (0x0, 0x1, 0x2):
+                client.fragments += payload
+                if fin:
+                    self._handle_message(client, bytes(client.fragments))
+                    client.fragments.clear()
+
+    @staticmethod
+    def _parse_websocket_frame(data, max_length):
+        """
+        Returns (fin, opcode, unmasked payload, frame size) of the first
+        complete frame, or None. Raises ValueError for a payload longer than
+        `max_length`, as soon as the header announces it.
+        """
+        if len(data) < 2:
+            return None
+        fin, opcode = data[0] & 0x80, data[0] & 0x0F
+        masked, length = data[1] & 0x80, data[1] & 0x7F
+        offset = 2
+        if length == 126:
+            if len(data) < 4: return None
+            length = struct.unpack_from(">H", data, 2)[0]
+            offset = 4
+        elif length == 127:
+            if len(data) < 10: return None
+            length = struct.unpack_from(">Q", data, 2)[0]
+            offset = 10
+        if length > max_length:
+            raise ValueError(f"Frame of {length} bytes exceeds the limit of {max_length} bytes")
+        mask = b""
+        if masked:
+            mask = bytes(data[offset:offset + 4])
+            offset += 4
+        if len(data) < offset + length:
+            return None
+        payload = bytes(data[offset:offset + length])
+        if masked:
+            # XOR with the 4-byte key repeated over the payload, as one big integer
+            key = (mask * (length // 4 + 1))[:length]
+            payload = (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(length, "big")
+        return fin, opcode, payload, offset + length
+
+    @staticmethod
+    def _websocket_frame(opcode, payload):
+        length = len(payload)
+        if length < 126: header = struct.pack(">BB", 0x80 | opcode, length)
+        elif length < 0x10000: header = struct.pack(">BBH", 0x80 | opcode, 126, length)
+        else: header = struct.pack(">BBQ", 0x80 | opcode, 127, length)
+        return header + payload
+
+    def _handle_message(self, client, data):
+        try: message = json.loads(data)
+        except ValueError as e:
+            self._send(client, {"type": "error", "id": None, "error": f"Invalid JSON: {e}"})
+            return
+        for request in message if isinstance(message, list) else (message,):
+            try:
+                self._handle_request(client, request)
+            except (ValueError, TypeError, KeyError, OverflowError, struct.error) as e:
+                request_id = request.get("id") if isinstance(request, dict) else None
+                self._send(client, {"type": "error", "id": request_id, "error": str(e)})
+
+    def _handle_request(self, client, request):
+        """Turns a request into a command record for the render loop and acknowledges it."""
+        if not isinstance(request, dict):
+            raise ValueError("A request must be a JSON object")
+        request_id = request.get("id")
+        head = request.get("head", 0)
+        head = ALL_HEADS if head == "all" else _check_int(head, "head", ALL_HEADS)
+        token = _ServerRequest(client, request_id)
+        sent_ns = time.monotonic_ns()
+        if "expression" in request:
+            name = request["expression"]
+            if name not in EXPRESSION_OPS:
+                raise ValueError(f"Unknown expression '{name}'")
+            flags = COMMAND_FLAG_NOTIFY if request.get("notify", True) else 0
+            if request.get("indefinite"): flags |= COMMAND_FLAG_INDEFINITE
+            duration_ms = request.get("duration_ms")
+            if duration_ms is not None:
+                duration_ms = _check_int(duration_ms, "duration_ms", MAX_COMMAND_ARG)
+            data = encode_command(EXPRESSION_OPS[name], duration_ms, flags, sent_ns=sent_ns, head=head)
+        elif "sequence" in request:
+            self.sequence_ids = self.sequence_ids % 0xFFFF + 1
+            sequence_id = _check_int(request.get("sequence_id", self.sequence_ids), "sequence_id", 0xFFFF)
+            data = encode_sequence(self._check_steps(request["sequence"]), sequence_id,
+                                   request.get("replace", False), head)
+            token = None
+        elif "cancel_sequence" in request:
+            sequence_id = request["cancel_sequence"]
+            if sequence_id is not None:
+                sequence_id = _check_int(sequence_id, "cancel_sequence", 0xFFFF)
+            data = encode_command(CommandOp.CANCEL_SEQUENCE, sequence_id, sent_ns=sent_ns)
+            token = None
+        elif request.get("query") in ("stats", "latency"):
+            op = CommandOp.GET_STATS if request["query"] == "stats" else CommandOp.GET_LATENCY
+            data = encode_command(op, sent_ns=sent_ns, head=head)
+        elif request.get("query") == "profile":
+            duration_ms = _check_int(request.get("duration_ms", 5000), "duration_ms", MAX_COMMAND_ARG)
+            data = encode_command(CommandOp.PROFILE, duration_ms, sent_ns=sent_ns)
+        else:
+            raise ValueError("Expected 'expression', 'sequence', 'cancel_sequence' or 'query'")
+        self.commands.append((data, token))
+        self._send(client, {"type": "ack", "id": request_id})
+
+    @staticmethod
+    def _check_steps(steps):
+        """Checks the steps of a sequence request, whose numbers end up in fixed-size fields."""
+        if not isinstance(steps, list):
+            raise ValueError("'sequence' must be a list of [offset_ms, expression(, duration_ms)] steps")
+        for step in steps:
+            if not isinstance(step, list) or len(step) not in (2, 3):
+                raise ValueError(f"Invalid sequence step {step!r}, expected [offset_ms, expression(, duration_ms)]")
+            _check_int(step[0], "offset_ms", MAX_COMMAND_ARG)
+            if len(step) == 3 and step[2] != "indefinite":
+                _check_int(step[2], "duration_ms", MAX_COMMAND_ARG)
+        return steps
+
+
+class EyeHead:
+    """
+    One pair of eyes with its own animation, drawn into a region of the app's screen.
+
+    Args:
+        region (pygame.Rect): Area of the screen the head is drawn in.
+        eyes (EyePair): The eyes, positioned relative to the region.
+        animation (AnimationManager): Animation driving the eyes.
+    """
+    def __init__(self, region, eyes, animation):
+        self.region = region
+        self.eyes = eyes
+        self.animation = animation
+        self.surface = None
+        # Sequence numbers of the commands waiting for the head to return to IDLE
+        self.pending_completions = []
+        # Priority of the running expression, 0 while IDLE
+        self.priority = 0
+
+    def attach(self, screen):
+        """Makes the head draw into its region of `screen`."""
+        self.surface = screen.subsurface(self.region)
+
+    def draw(self):
+        draw = EXPRESSIONS.draws.get(self.animation.current_state, _draw_normal)
+        draw(self.eyes, self.surface, self.animation)
+
+    def get_dirty_rects(self):
+        """Returns the dirty rectangles of the eyes in screen coordinates."""
+        return [rect.move(self.region.topleft) for rect in self.eyes.get_dirty_rects()]
+
+
+class MonkeyEyeApp:
+    """
+    Main application rendering the eyes, meant to run in its own process.
+
+    Args:
+        command_conn (multiprocessing.connection.Connection): End of the pipe
+            the controller sends binary commands through. Replies are sent back
+            on the same connection. May be None for a standalone app.
+        dirty_rects (bool, optional): If True, only the areas around the eyes are
+            cleared, redrawn and pushed with `pygame.display.update(rects)` instead
+            of filling and flipping the whole screen every frame. Defaults to False.
+        sprite_cache_bytes (int, optional): Memory cap of the cache for the
+            pre-rendered circular and star sprites. 0 or None draws the shapes
+            directly every frame. Defaults to 4 MiB.
+        frame_based_animation (bool, optional): If True, animations advance by
+            a fixed step per frame instead of by elapsed time. Defaults to False.
+        headless (bool, optional): If True, no window is opened: pygame runs on
+            SDL's dummy video driver and the eyes are rendered to an offscreen
+            Surface. Defaults to False.
+        clock (optional): Clock driving the loop, with `get_ticks()` and
+            `tick(framerate)` methods like `PygameClock` or `SimulatedClock`.
+            Defaults to a `PygameClock`.
+        power_saving (bool, optional): If True, the loop stops redrawing while
+            the eyes are IDLE and sleeps until the next blink, a command or a
+            window event instead of rendering at full frame rate. Defaults to False.
+        baked_animations (bool, optional): If True, the animations are baked
+            into NumPy keyframe arrays at startup and played back by index
+            instead of being stepped frame by frame. Requires NumPy. Defaults to False.
+        heads (int, optional): Number of independent pairs of eyes, laid out in
+            a grid over the screen and addressed by head id 0..heads-1.
+            Ignored if `head_regions` is given. At most MAX_HEADS (255).
+            Defaults to 1.
+        head_regions (list, optional): (x, y, width, height) screen region of
+            every head. The eyes of a head are scaled to fit its region.
+        frame_export (str, optional): If given, every exported frame is written
+            into a shared memory block of this name (see `FrameExporter`),
+            which is removed when the app quits. Requires NumPy.
+        frame_export_fps (float, optional): Maximum export rate. Defaults to 15.
+        frame_export_scale (float, optional): Downscale factor of the exported
+            frames. Defaults to 1.0.
+        command_priorities (dict, optional): Priority per expression name, see
+            `CommandScheduler`. Defaults to equal priorities, with "stop" above.
+        max_pending_commands (int, optional): Most expression commands queued
+            within one frame. Defaults to 64.
+        command_drop_policy (str, optional): "oldest" or "newest", the command
+            dropped when more arrive within one frame. Defaults to "oldest".
+        render_scale (float, optional): Resolution the eyes are drawn at,
+            relative to the screen. Below 1 they are drawn into a smaller
+            surface that is upscaled to the screen, which cuts the fill cost
+            on slow devices. Defaults to 1.0.
+        auto_render_scale (bool, optional): If True, the render scale is
+            lowered (down to `min_render_scale`) while frames take longer than
+            the frame budget and raised again (up to `render_scale`) when
+            there is headroom. Defaults to False.
+        min_render_scale (float, optional): Lowest automatic render scale.
+            Defaults to 0.5.
+        expression_config (str, optional): JSON or TOML file of custom
+            expressions, see `load_expression_config()`. It is loaded again
+            in the eye process, so it also works with the "spawn" start method.
+        gaze_channel (str, optional): Name of an existing `GazeChannel`
+            with a slot per head, read every frame for gaze targets.
+        record_path (str, optional): If given, every received command and
+            gaze target is recorded into this session log (see
+            `SessionRecorder` and `replay_session()`).
+        random_seed (int, optional): Seed of the blink randomness. Chosen
+            at random and stored in the log when recording.
+        heartbeat (str, optional): Name of an existing `Heartbeat` block the
+            loop publishes its frames to.
+        heartbeat_spike_ms (float, optional): Frame work time the heartbeat
+            counts as a spike. Defaults to 250.
+        command_server (str, optional): Address of a `CommandServer` to run
+            in the app, "unix:<path>" or "tcp:<host>:<port>", so a backend
+            can send commands over a socket or WebSocket directly.
+        profile_dir (str, optional): Directory the profiles of PROFILE
+            commands are written to. Defaults to the temp directory.
+        backend (str, optional): "surface" draws every shape with
+            `pygame.draw` into the display surface; "texture" draws with
+            textures through a `pygame._sdl2.video.Renderer` (see
+            `TextureCanvas`), falling back to "surface" if that is not
+            available. The texture backend always redraws the whole frame
+            at render scale 1. Defaults to "surface".
+        software_renderer (bool, optional): If True, the texture backend
+            uses SDL's software renderer even if a GPU renderer is
+            available. Defaults to False.
+    """
+    def __init__(self, command_conn, dirty_rects=False, sprite_cache_bytes=4 * 1024 * 1024, frame_based_animation=False,
+                 headless=False, clock=None, power_saving=False, baked_animations=False, heads=1, head_regions=None,
+                 frame_export=None, frame_export_fps=15, frame_export_scale=1.0, command_priorities=None,
+                 max_pending_commands=64, command_drop_policy="oldest", render_scale=1.0, auto_render_scale=False,
+                 min_render_scale=0.5, expression_config=None, gaze_channel=None, record_path=None,
+                 random_seed=None, heartbeat=None, heartbeat_spike_ms=250, command_server=None, profile_dir=None,
+                 backend="surface", software_renderer=False):
+        self.command_conn = command_conn
+        if backend not in ("surface", "texture"):
+            raise ValueError(f"Unknown backend '{backend}', expected 'surface' or 'texture'")
+        self.backend = backend
+        self.software_renderer = software_renderer
+        # Window of the texture backend, which pygame.display does not manage
+        self.texture_window = None
+        self.profile_dir = profile_dir
+        # Running SamplingProfiler and the request waiting for its file
+        self.profiler = None
+        self.profile_seq = 0
+        self.command_server_address = command_server
+        self.command_server = None
+        self.heartbeat_name = heartbeat
+        self.heartbeat_spike_ms = heartbeat_spike_ms
+        self.heartbeat = None
+        self.record_path = record_path
+        self.random_seed = random_seed
+        # Generator of the blink and look timing of the heads. The eye process owns the module-level one
+        self.rng = random
+        self.recorder = None
+        # Ticks of the frame being processed, which received commands are recorded at
+        self.frame_ticks = 0
+        # Options a recorded session is replayed with
+        self.session_options = {
+            "dirty_rects": dirty_rects, "sprite_cache_bytes": sprite_cache_bytes,
+            "frame_based_animation": frame_based_animation, "baked_animations": baked_animations, "heads": heads,
+            "head_regions": [tuple(region) for region in head_regions] if head_regions else None,
+            "command_priorities": command_priorities, "max_pending_commands": max_pending_commands,
+            "command_drop_policy": command_drop_policy, "render_scale": render_scale,
+            "expression_config": expression_config, "backend": backend, "software_renderer": software_renderer,
+        }
+        self.gaze_channel = gaze_channel
+        self.gaze_reader = None
+        self.expression_config = expression_config
+        if expression_config:
+            load_expression_config(expression_config)
+        self.render_scale = render_scale
+        self.max_render_scale = render_scale
+        self.min_render_scale = min(min_render_scale, render_scale)
+        self.auto_render_scale = auto_render_scale
+        self.render_scale_step = 0.1
+        # Frames between two automatic render scale adjustments and the
+        # work time (everything but the clock.tick sleep) summed over them
+        self.render_scale_interval = 60
+        self.render_scale_frames = 0
+        self.render_scale_work_ms = 0.0
+        # Surface the heads draw into; the screen itself at render scale 1
+        self.render_surface = None
+        self.command_scheduler = CommandScheduler(command_priorities, max_pending_commands, command_drop_policy)
+        self.frame_export = frame_export
+        if frame_export and np is None:
+            print("EyeApp: NumPy is not installed, frame export is disabled.")
+            self.frame_export = None
+        self.frame_export_fps = frame_export_fps
+        self.frame_export_scale = frame_export_scale
+        self.frame_exporter = None
+        self.head_count = len(head_regions) if head_regions else max(1, heads)
+        if self.head_count > MAX_HEADS:
+            raise ValueError(f"At most {MAX_HEADS} heads are supported, got {self.head_count}")
+        self.head_regions = head_regions
+        self.heads = []
+        self.keyframe_tracks = None
+        if baked_animations:
+            if np is None: print("EyeApp: NumPy is not installed, baked animations are disabled.")
+            else: self.keyframe_tracks = KeyframeTrackCache()
+        self.power_saving = power_saving
+        # Longest time the idle wait blocks on the command pipe before
+        # handling pending window events.
+        self.idle_event_poll_ms = 100
+        # Shorter poll while sleeping, so a new gaze target or a command of
+        # the command server is picked up quickly
+        self.gaze_poll_ms = 20
+        self.idle_frame_presented = False
+        self.dirty_rects = dirty_rects
+        self.sprite_cache = SpriteCache(sprite_cache_bytes) if sprite_cache_bytes else None
+        self.frame_based_animation = frame_based_animation
+        self.headless = headless
+        self.full_redraw = True
+        self.screen = None
+        self.clock = clock
+        self.target_fps = 60
+        self.latency_stats = LatencyStats(1000 / self.target_fps)
+        self.frame_stats = FrameTimingStats(1000 / self.target_fps)
+        # Send times of the commands applied since the last presented frame
+        self.unrendered_command_times = []
+        # Scheduled sequence steps as a heap of
+        # (due_ticks, order, sequence_id, head, op, arg, flags)
+        self.timeline = []
+        self.timeline_order = 0
+        self.background_color = (0, 0, 0)
+        # Eyes and animation of head 0
+        self.eyes = None
+        self.animation = None
+        
+        self.screen_width = 1280
+        self.screen_height = 720
+        # Region size in which a head is drawn with the eye geometry below
+        self.head_reference_size = (1280, 720)
+        self.eye_width = 300
+        self.eye_height = 300
+        self.eye_distance = 300
+        self.eye_radius = 30
+        self.eye_color = (133, 242, 239)
+        self.star_color = self.eye_color
+
+        self.eye_y_offset = 150
+
+    def _initialize_pygame(self):
+        if self.headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+        pygame.init()
+
+    def _initialize_pygame_and_eyes(self):
+        if self.expression_config:
+            load_expression_config(self.expression_config)
+        self._initialize_pygame()
+        self.screen = self._create_texture_canvas() if self.backend == "texture" else None
+        if self.screen is None:
+            if self.headless:
+                self.screen = pygame.Surface((self.screen_width, self.screen_height))
+            else:
+                self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
+                pygame.display.set_caption("Monkey Eyes Animation")
+        if self.clock is None:
+            self.clock = PygameClock()
+
+        if self.record_path:
+            if self.random_seed is None:
+                self.random_seed = random.getrandbits(32)
+            self.recorder = SessionRecorder(self.record_path, self.random_seed, self.session_options,
+                                            self.clock.get_ticks())
+        if self.random_seed is not None:
+            random.seed(self.random_seed)
+        self._create_heads()
+        current_ticks = self.clock.get_ticks()
+        for head in self.heads:
+            head.animation.last_blink_time = current_ticks
+            head.animation.last_look_time = current_ticks
+
+        if self.frame_export:
+            self.frame_exporter = FrameExporter(self.frame_export, self.screen.get_size(),
+                                                self.frame_export_fps, self.frame_export_scale)
+        if self.gaze_channel:
+            self.gaze_reader = GazeChannel(self.gaze_channel, len(self.heads))
+        if self.heartbeat_name:
+            self.heartbeat = Heartbeat(self.heartbeat_name, spike_ms=self.heartbeat_spike_ms)
+        if self.command_server_address:
+            self.command_server = CommandServer(self.command_server_address)
+            self.command_server.start()
+
+    def _create_texture_canvas(self):
+        """
+        Opens the window with a Renderer for the texture backend (hidden when
+        headless). Returns its TextureCanvas, or None to fall back to the
+        Surface backend.
+        """
+        try:
+            from pygame._sdl2.video import Renderer, Window
+
+            window = Window("Monkey Eyes Animation", size=(self.screen_width, self.screen_height),
+                            hidden=self.headless)
+            # -1 prefers a GPU renderer and falls back to SDL's software renderer
+            renderer = Renderer(window, accelerated=0 if self.software_renderer else -1)
+        except (ImportError, pygame.error) as e:
+            print(f"EyeApp: Texture backend unavailable ({e}), using the surface backend.")
+            self.backend = "surface"
+            return None
+        if self.dirty_rects or self.render_scale != 1 or self.auto_render_scale:
+            print("EyeApp: The texture backend redraws whole frames at render scale 1.")
+        self.dirty_rects = False
+        self.render_scale = self.max_render_scale = self.min_render_scale = 1.0
+        self.auto_render_scale = False
+        self.texture_window = window
+        return TextureCanvas(renderer)
+
+    def _create_heads(self):
+        """Creates the render surface for the current render scale and the heads drawn into it."""
+        if self.render_scale == 1:
+            self.render_surface = self.screen
+        else:
+            render_size = (max(1, round(self.screen_width * self.render_scale)),
+                           max(1, round(self.screen_height * self.render_scale)))
+            self.render_surface = pygame.Surface(render_size, 0, self.screen)
+        render_rect = self.render_surface.get_rect()
+        self.heads = []
+        for region in self._get_head_regions():
+            region = pygame.Rect(region)
+            if not self.screen.get_rect().contains(region):
+                print(f"EyeApp: Head region {tuple(region)} exceeds the screen, clipping it.")
+            region = pygame.Rect(round(region.x * self.render_scale), round(region.y * self.render_scale),
+                                 round(region.width * self.render_scale), round(region.height * self.render_scale))
+            head = self._create_head(region.clip(render_rect))
+            head.attach(self.render_surface)
+            self.heads.append(head)
+        self.eyes = self.heads[0].eyes
+        self.animation = self.heads[0].animation
+        self.full_redraw = True
+
+    def _set_render_scale(self, render_scale):
+        """
+        Recreates the render surface and heads at a new render scale, keeping
+        their idle timers and the gaze they follow.
+        """
+        old_heads = self.heads
+        self.render_scale = render_scale
+        self._create_heads()
+        for old, new in zip(old_heads, self.heads):
+            for name in ("last_blink_time", "blink_interval", "last_look_time", "look_interval",
+                         "current_time", "last_update_time", "gaze_target"):
+                setattr(new.animation, name, getattr(old.animation, name))
+            # Gaze and its velocity are in screen-independent units, -1 to 1
+            new.animation.gaze = list(old.animation.gaze)
+            new.animation.gaze_velocity = list(old.animation.gaze_velocity)
+            new.pending_completions = old.pending_completions
+        print(f"EyeApp: Render scale set to {render_scale:.2f}.")
+
+    def _adjust_render_scale(self, work_ms):
+        """
+        Lowers the render scale while frames exceed their budget and raises it
+        when the pixel count of the next step up would still fit. Only switches
+        while all heads are IDLE, so no animation jumps.
+        """
+        self.render_scale_frames += 1
+        self.render_scale_work_ms += work_ms
+        if self.render_scale_frames < self.render_scale_interval:
+            return
+        if any(head.animation.current_state != AnimationState.IDLE for head in self.heads):
+            return
+        mean_work_ms = self.render_scale_work_ms / self.render_scale_frames
+        self.render_scale_frames = 0
+        self.render_scale_work_ms = 0.0
+
+        budget_ms = 1000 / self.target_fps
+        scale = self.render_scale
+        if mean_work_ms > 0.85 * budget_ms and scale > self.min_render_scale:
+            self._set_render_scale(max(self.min_render_scale, round(scale - self.render_scale_step, 2)))
+        elif scale < self.max_render_scale:
+            higher = min(self.max_render_scale, round(scale + self.render_scale_step, 2))
+            # Fill cost grows with the pixel count
+            if mean_work_ms * (higher / scale) ** 2 < 0.6 * budget_ms:
+                self._set_render_scale(higher)
+
+    def _get_head_regions(self):
+        """Returns the configured head regions, or a grid layout of `head_count` cells."""
+        if self.head_regions:
+            return self.head_regions
+        columns = math.ceil(math.sqrt(self.head_count))
+        rows = math.ceil(self.head_count / columns)
+        cell_width = self.screen_width // columns
+        cell_height = self.screen_height // rows
+        return [((i % columns) * cell_width, (i // columns) * cell_height, cell_width, cell_height)
+                for i in range(self.head_count)]
+
+    def _create_head(self, region):
+        """Creates the eyes and animation of a head, scaled to fit `region`."""
+        reference_width, reference_height = self.head_reference_size
+        scale = min(region.width / reference_width, region.height / reference_height)
+        eye_width = round(self.eye_width * scale)
+        eye_height = round(self.eye_height * scale)
+        eye_distance = round(self.eye_distance * scale)
+
+        center_x = region.width // 2
+        eye_y = region.height // 2 - eye_height // 2 - round(self.eye_y_offset * scale)
+        eye_left_x = center_x - eye_width - (eye_distance // 2)
+        eye_right_x = center_x + (eye_distance // 2)
+        
+        eyes = EyePair(
+            eye_left_x, eye_right_x, eye_y, 
+            eye_width, eye_height, eye_distance, 
+            max(1, round(self.eye_radius * scale)), self.eye_color, self.background_color, self.star_color,
+            self.sprite_cache, scale
+        )
+        animation = AnimationManager(eyes, frame_based=self.frame_based_animation,
+                                     keyframe_tracks=self.keyframe_tracks, rng=self.rng)
+        if scale != 1:
+            animation.scale_geometry(scale)
+        if self.keyframe_tracks is not None:
+            self.keyframe_tracks.prebake(animation)
+        return EyeHead(region, eyes, animation)
+
+    def _get_target_heads(self, head):
+        """Returns the heads addressed by a head id, which may be ALL_HEADS."""
+        if head == ALL_HEADS:
+            return self.heads
+        if head < len(self.heads):
+            return [self.heads[head]]
+        print(f"EyeApp: Unknown head: {head}")
+        return []
+
+    def _process_command(self, op, arg=None, flags=0, seq=0, head=0):
+        if op == CommandOp.GET_LATENCY: self._send_reply("latency", seq, self.latency_stats.get_stats())
+        elif op == CommandOp.GET_STATS:
+            self._send_reply("stats", seq, dict(self.frame_stats.get_stats(), commands=self.command_scheduler.get_stats()))
+        elif op == CommandOp.CANCEL_SEQUENCE: self._cancel_sequence(arg)
+        elif op == CommandOp.PROFILE: self._start_profile(arg, seq)
+        elif op == CommandOp.GAZE:
+            for eye_head in self._get_target_heads(head):
+                eye_head.animation.set_gaze_target(*decode_gaze(arg))
+        elif op in EXPRESSIONS.by_op:
+            priority = self.command_scheduler.get_priority(op)
+            for eye_head in self._get_target_heads(head):
+                if op != CommandOp.STOP_CONCENTRATE:
+                    if eye_head.animation.current_state != AnimationState.IDLE and priority < eye_head.priority:
+                        # A lower priority expression cannot cut off the running one
+                        self.command_scheduler.rejected += 1
+                        if flags & COMMAND_FLAG_NOTIFY: self._send_reply("completed", seq, False)
+                        continue
+                    # The new expression cuts off the one being waited for
+                    self._send_completions(eye_head, completed=False)
+                    eye_head.priority = priority
+                self._apply_expression(eye_head.animation, op, arg, flags)
+                if flags & COMMAND_FLAG_NOTIFY:
+                    eye_head.pending_completions.append(seq)
+        else: print(f"EyeApp: Unknown command: {op}")
+
+    def _start_profile(self, duration_ms, seq):
+        if self.profiler is not None:
+            print("EyeApp: A profile is already running.")
+            self._send_reply("profile", seq, None)
+            return
+        self.profiler = SamplingProfiler(threading.get_ident(), self._get_profile_state, duration_ms or 5000,
+                                         root_code=MonkeyEyeApp.run_app_loop.__code__)
+        self.profile_seq = seq
+        self.profiler.start()
+        print(f"EyeApp: Profiling for {self.profiler.duration_ms} ms.")
+
+    def _get_profile_state(self):
+        """Name of the animation state(s) shown, for the profiler thread."""
+        if self.power_saving and self.idle_frame_presented:
+            return "idle (sleeping)"
+        return "+".join(sorted({head.animation.current_state for head in self.heads}))
+
+    def _finish_profile(self):
+        """Writes the finished profile and replies with its path."""
+        profiler, self.profiler = self.profiler, None
+        try:
+            path = profiler.write(self.profile_dir)
+        except OSError as e:
+            print(f"EyeApp: Error writing profile: {e}")
+            path = None
+        else:
+            print(f"EyeApp: Profile of {profiler.samples} samples written to {path}")
+        self._send_reply("profile", self.profile_seq, path)
+
+    def _apply_expression(self, animation, op, arg, flags):
+        EXPRESSIONS.by_op[op].start(animation, arg, flags)
+
+    def _send_completions(self, head, completed=True):
+        """Answers the commands waiting on `head` with whether their expression ran to the end."""
+        for seq in head.pending_completions:
+            self._send_reply("completed", seq, completed)
+        head.pending_completions.clear()
+
+    def _schedule_sequence(self, data, count, flags, sequence_id, head=0):
+        """Schedules the steps of a SEQUENCE message relative to the current tick."""
+        if flags & COMMAND_FLAG_REPLACE:
+            if head == ALL_HEADS:
+                self.timeline.clear()
+            else:
+                self.timeline = [entry for entry in self.timeline if entry[3] != head]
+                heapq.heapify(self.timeline)
+        start_ticks = self.clock.get_ticks()
+        for i in range(count):
+            op, arg, step_flags, _, offset_ms, step_head = decode_command(data, COMMAND_STRUCT.size * (i + 1))
+            self.timeline_order += 1
+            heapq.heappush(self.timeline, (start_ticks + offset_ms, self.timeline_order, sequence_id, step_head,
+                                           op, arg, step_flags))
+
+    def _cancel_sequence(self, sequence_id=None):
+        """Drops the pending steps of one sequence, or of all sequences if no id is given."""
+        if sequence_id is None:
+            self.timeline.clear()
+        else:
+            self.timeline = [entry for entry in self.timeline if entry[2] != sequence_id]
+            heapq.heapify(self.timeline)
+
+    def _run_due_timeline_steps(self, current_ticks):
+        """Applies every scheduled step that is due, each at its exact scheduled tick."""
+        while self.timeline and self.timeline[0][0] <= current_ticks:
+            due_ticks, _, sequence_id, head, op, arg, flags = heapq.heappop(self.timeline)
+            for eye_head in self._get_target_heads(head):
+                eye_head.animation.current_time = due_ticks
+            self._process_command(op, arg, flags, sequence_id, head)
+
+    def _send_reply(self, kind, seq, payload):
+        if isinstance(seq, _ServerRequest):
+            # The command came in through the command server
+            if self.command_server is not None: self.command_server.reply(seq, kind, payload)
+            return
+        if self.command_conn is None:
+            return
+        try: self.command_conn.send((kind, seq, payload))
+        except (OSError, ValueError) as e: print(f"EyeApp: Error sending '{kind}' reply: {e}")
+
+    def _record_command_latencies(self):
+        if not self.unrendered_command_times:
+            return
+        now_ns = time.monotonic_ns()
+        for sent_ns in self.unrendered_command_times:
+            self.latency_stats.record((now_ns - sent_ns) / 1e6)
+        self.unrendered_command_times.clear()
+
+    def _draw_frame(self):
+        partial = self.dirty_rects and not self.full_redraw
+        if not partial:
+            self.render_surface.fill(self.background_color)
+        for head in self.heads:
+            if partial:
+                head.eyes.clear(head.surface)
+            head.draw()
+
+    def _present_frame(self):
+        if self.backend == "texture":
+            self.screen.present()
+            self.full_redraw = False
+            return
+        upscaled = self.render_surface is not self.screen
+        if upscaled:
+            pygame.transform.scale(self.render_surface, self.screen.get_size(), self.screen)
+        if self.headless:
+            self.full_redraw = False
+        elif self.dirty_rects and not self.full_redraw and not upscaled:
+            pygame.display.update([rect for head in self.heads for rect in head.get_dirty_rects()])
+        else:
+            pygame.display.flip()
+            self.full_redraw = False
+
+    def _process_pending_commands(self):
+        """
+        Processes all commands waiting on the pipe and the command server.
+        Returns False if a quit command was received or the controller
+        closed its end.
+        """
+        try:
+            if self.command_server is not None:
+                while self.command_server.commands:
+                    data, request = self.command_server.commands.popleft()
+                    self._handle_command_message(data, request)
+            if self.command_conn is None:
+                return True
+            while self.command_conn.poll():
+                if not self._handle_command_message(self.command_conn.recv_bytes()): return False
+        except (EOFError, OSError):
+            print("EyeApp: Command pipe closed, quitting.")
+            return False
+        finally:
+            self._apply_scheduled_commands()
+        return True
+
+    def _handle_command_message(self, data, request=None):
+        """
+        Schedules or processes one received message. `request` is the
+        `_ServerRequest` of a command server message, which its replies are
+        addressed to instead of the sequence number. Returns False for QUIT.
+        """
+        if self.recorder is not None: self.recorder.record(self.frame_ticks, data)
+        op, arg, flags, seq, sent_ns, head = decode_command(data)
+        if op == CommandOp.QUIT: return False
+        if op == CommandOp.SEQUENCE:
+            self._schedule_sequence(data, arg, flags, seq, head)
+            return True
+        if request is not None:
+            seq = request
+        if op in EXPRESSIONS.by_op:
+            dropped = self.command_scheduler.push((op, arg, flags, seq, sent_ns, head))
+            if dropped is not None:
+                self._reply_not_applied(dropped, len(self.heads) if dropped[5] == ALL_HEADS else 1)
+            return True
+        self._process_command(op, arg, flags, seq, head)
+        if op == CommandOp.CANCEL_SEQUENCE:
+            self.unrendered_command_times.append(sent_ns)
+        return True
+
+    def _apply_scheduled_commands(self):
+        """Applies the winning expression command of every head queued this frame."""
+        winners, losers = self.command_scheduler.pop_winners(len(self.heads))
+        for command, lost_heads in losers:
+            self._reply_not_applied(command, lost_heads)
+        sent_times = {}
+        for index, (op, arg, flags, seq, sent_ns, _) in winners.items():
+            self._process_command(op, arg, flags, seq, index)
+            sent_times[seq, sent_ns] = sent_ns
+        self.unrendered_command_times.extend(sent_times.values())
+
+    def _reply_not_applied(self, command, count):
+        """Tells a controller waiting for a dropped or coalesced command that it did not run."""
+        op, arg, flags, seq, sent_ns, head = command
+        if flags & COMMAND_FLAG_NOTIFY:
+            for _ in range(count):
+                self._send_reply("completed", seq, False)
+
+    def _process_events(self):
+        """Handles pygame window events. Returns False if the window was closed."""
+        running = True
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT: running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE: running = False
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED): self.full_redraw = True
+        return running
+
+    def _wait_for_wakeup(self):
+        """
+        Blocks until the next IDLE deadline of any head, a command or a window
+        event that needs a redraw. Returns False if the app should quit.
+        """
+        deadline = min(head.animation.get_next_idle_deadline() for head in self.heads)
+        if self.timeline:
+            deadline = min(deadline, self.timeline[0][0])
+        while True:
+            remaining = deadline - self.clock.get_ticks()
+            if remaining <= 0:
+                return True
+            if not getattr(self.clock, "realtime", True):
+                self.clock.advance(remaining)
+                return True
+
+            short_poll = self.gaze_reader is not None or self.command_server is not None
+            wait_ms = min(remaining, self.gaze_poll_ms if short_poll else self.idle_event_poll_ms)
+            if self.command_conn is None:
+                pygame.time.wait(int(wait_ms))
+            else:
+                try:
+                    if self.command_conn.poll(wait_ms / 1000): return True
+                except (EOFError, OSError):
+                    return True
+
+            if not self._process_events(): return False
+            if self.full_redraw: return True
+            if self.gaze_reader is not None and self.gaze_reader.has_changes(): return True
+            if self.command_server is not None and self.command_server.has_commands(): return True
+            if self.profiler is not None and self.profiler.finished.is_set(): self._finish_profile()
+            if self.heartbeat is not None: self.heartbeat.publish_alive()
+            if self.recorder is not None: self.recorder.flush_if_due()
+
+    def _run_frame(self):
+        """Runs one iteration of the render loop. Returns False when the app should quit."""
+        if self.power_saving and self.idle_frame_presented:
+            if not self._wait_for_wakeup(): return False
+            for head in self.heads:
+                head.animation.sync_clock(self.clock.get_ticks())
+
+        t_start = time.perf_counter()
+        current_ticks = self.clock.get_ticks()
+        self.frame_ticks = current_ticks
+        if not self._process_pending_commands(): return False
+        if self.gaze_reader is not None: self._read_gaze()
+        t_commands = time.perf_counter()
+        if not self._process_events(): return False
+        t_events = time.perf_counter()
+
+        self._run_due_timeline_steps(current_ticks)
+        self._update_heads(current_ticks)
+        t_update = time.perf_counter()
+        self._draw_frame()
+        t_draw = time.perf_counter()
+        self._present_frame()
+        t_present = time.perf_counter()
+        if self.frame_exporter is not None:
+            self.frame_exporter.export(self.screen, current_ticks)
+        t_export = time.perf_counter()
+        self._record_command_latencies()
+        states = {head.animation.current_state for head in self.heads}
+        self.idle_frame_presented = states == {AnimationState.IDLE} and not any(
+            head.animation.is_gaze_moving() for head in self.heads)
+        t_tick = time.perf_counter()
+        self.clock.tick(self.target_fps)
+        t_end = time.perf_counter()
+
+        self.frame_stats.record((
+            (t_commands - t_start) * 1000, (t_events - t_commands) * 1000, (t_update - t_events) * 1000,
+            (t_draw - t_update) * 1000, (t_present - t_draw) * 1000, (t_export - t_present) * 1000,
+            (t_end - t_tick) * 1000,
+        ), states, t_end)
+        if self.auto_render_scale:
+            self._adjust_render_scale((t_tick - t_start) * 1000)
+        if self.heartbeat is not None:
+            self.heartbeat.publish_frame((t_tick - t_start) * 1000)
+        if self.recorder is not None:
+            self.recorder.flush_if_due()
+        if self.profiler is not None and self.profiler.finished.is_set():
+            self._finish_profile()
+        return True
+
+    def _update_heads(self, current_ticks):
+        """Steps the animation of every head and answers the commands of heads that are IDLE again."""
+        for head in self.heads:
+            head.animation.update(current_ticks)
+            if head.animation.current_state == AnimationState.IDLE:
+                head.priority = 0
+                if head.pending_completions: self._send_completions(head)
+
+    def _read_gaze(self):
+        """Hands the latest gaze target of every head to its animation."""
+        for index, head in enumerate(self.heads):
+            target = self.gaze_reader.read(index)
+            if target is not None:
+                x, y = target
+                if self.recorder is not None:
+                    self.recorder.record(self.frame_ticks, encode_command(CommandOp.GAZE, encode_gaze(x, y), head=index))
+                if math.isnan(x) or math.isnan(y): head.animation.set_gaze_target(None, None)
+                else: head.animation.set_gaze_target(x, y)
+
+    def _wait_for_start(self):
+        """Blocks until a START command. Returns False on QUIT or if the controller went away."""
+        try:
+            while True:
+                op = decode_command(self.command_conn.recv_bytes())[0]
+                if op == CommandOp.START: return True
+                if op == CommandOp.QUIT: return False
+        except (EOFError, OSError):
+            return False
+
+    def run_app_loop(self, standby=False):
+        """
+        Runs the render loop until a quit command, the controller closing the
+        pipe or the window being closed. After the first frame is presented,
+        a "ready" reply is sent to the controller.
+
+        Args:
+            standby (bool, optional): If True, pygame is imported and initialized
+                right away, but the window only opens once a START command
+                arrives, so a standby process can take over almost instantly.
+        """
+        if standby:
+            self._initialize_pygame()
+            if not self._wait_for_start():
+                pygame.quit()
+                return
+        self._initialize_pygame_and_eyes()
+        try:
+            running = self._run_frame()
+            self._send_reply("ready", 0, True)
+            while running and self._run_frame():
+                pass
+        finally:
+            if self.command_server is not None:
+                self.command_server.close()
+            if self.frame_exporter is not None:
+                self.frame_exporter.close()
+            if self.gaze_reader is not None:
+                self.gaze_reader.close()
+            if self.heartbeat is not None:
+                self.heartbeat.close()
+            if self.recorder is not None:
+                self.recorder.close(self.clock.get_ticks())
+            pygame.quit()
+
+def replay_session(path, frame_ms=1000 / 60, **app_options):
+    """
+    Re-renders a recorded session headless and as fast as possible: the app
+    runs on a `SimulatedClock` that `tick()` advances without sleeping, with
+    the recorded random seed and options, and receives every logged command
+    at the frame whose tick reaches the recorded one (so within one frame
+    of when it was applied live). Power saving and the automatic render
+    scale are turned off, as they depend on wall-clock time.
+
+    Args:
+        path (str): Log written with `record_path` / `record_session`.
+        frame_ms (float, optional): Simulated frame duration. Defaults to 60 fps.
+        **app_options: MonkeyEyeApp options overriding the recorded ones,
+            e.g. `dirty_rects=True` to profile another mode.
+
+    Returns:
+        MonkeyEyeApp: The app after the replay, e.g. for `frame_stats`.
+    """
+    player = SessionPlayer(path)
+    options = dict(player.options, power_saving=False, auto_render_scale=False)
+    options.update(app_options)
+    app = MonkeyEyeApp(player, headless=True, clock=SimulatedClock(frame_ms), random_seed=player.seed, **options)
+    player.clock = app.clock
+    try:
+        app.run_app_loop()
+    finally:
+        player.close()
+    return app
+
+
+class EmbeddedEyes(MonkeyEyeApp):
+    """
+    The eyes as a widget of a host application that already runs pygame,
+    without an eye process.
+
+    The host drives everything from its own loop: `step(dt_ms)` advances the
+    animations and `render(surface, rect)` draws them into any surface.
+    Expressions are plain method calls that take effect at once, so there
+    is no process, pipe or pickling and no `pygame.init()` or window of its
+    own. It works the same with SDL's dummy video driver.
+
+    Args:
+        size (tuple, optional): (width, height) the eyes are laid out for.
+            `render()` into a rect of that size draws directly into the
+            target, other sizes are scaled. Defaults to (1280, 720).
+        heads (int, optional): Number of independent pairs of eyes, laid
+            out in a grid. Ignored if `head_regions` is given. At most
+            MAX_HEADS (255). Defaults to 1.
+        head_regions (list, optional): (x, y, width, height) region of every
+            head within `size`.
+        sprite_cache_bytes (int, optional): Memory cap of the sprite cache.
+            Defaults to 4 MiB.
+        baked_animations (bool, optional): Play animations from baked NumPy
+            keyframe tracks. Defaults to False.
+        expression_config (str, optional): JSON or TOML file of custom
+            expressions, see `load_expression_config()`.
+        background_color (tuple, optional): Color the rect is filled with
+            before the eyes are drawn. Defaults to black.
+        random_seed (int, optional): Seed of the blink randomness. The eyes
+            draw from a `random.Random` of their own, so neither the seed nor
+            the blinking touches the host's global `random` state.
+
+    Example:
+        >>> eyes = EmbeddedEyes(size=(640, 360))
+        >>> while running:
+        ...     eyes.step(clock.tick(60))
+        ...     eyes.render(screen, (0, 0, 640, 360))
+        ...     pygame.display.flip()
+        >>> eyes.trigger_smile(2000, on_complete=print)
+    """
+    def __init__(self, size=(1280, 720), heads=1, head_regions=None, sprite_cache_bytes=4 * 1024 * 1024,
+                 baked_animations=False, expression_config=None, background_color=(0, 0, 0), random_seed=None):
+        super().__init__(None, sprite_cache_bytes=sprite_cache_bytes, headless=True, clock=SimulatedClock(),
+                         baked_animations=baked_animations, heads=heads, head_regions=head_regions,
+                         expression_config=expression_config, random_seed=random_seed)
+        self.background_color = background_color
+        self.screen_width, self.screen_height = size
+        # Drawn into when render() targets a rect of another size, then scaled
+        self.screen = pygame.Surface(size)
+        # A generator of its own, as the global one belongs to the host
+        self.rng = random.Random(random_seed)
+        self._create_heads()
+        # Surface and rect the heads are attached to
+        self.target = None
+        self.sequence_ids = 0
+
+    def step(self, dt_ms):
+        """
+        Advances the animations by `dt_ms` milliseconds, e.g. the return
+        value of the host's `pygame.time.Clock.tick()`.
+        """
+        self.clock.advance(dt_ms)
+        current_ticks = self.clock.get_ticks()
+        self._run_due_timeline_steps(current_ticks)
+        self._update_heads(current_ticks)
+
+    def render(self, surface, rect=None):
+        """
+        Draws the eyes into `rect` of `surface`, filled with the background
+        color first.
+
+        Args:
+            surface (pygame.Surface): Target, e.g. the host's display surface.
+            rect (optional): Area of `surface` to draw into. Defaults to the
+                whole surface.
+
+        Returns:
+            pygame.Rect: The area drawn, for `pygame.display.update()`.
+        """
+        rect = pygame.Rect(rect) if rect is not None else surface.get_rect()
+        if rect.size == self.screen.get_size():
+            if self.target != (surface, rect):
+                self._attach_heads(surface.subsurface(rect))
+                self.target = (surface, rect)
+            self._draw_frame()
+        else:
+            if self.target is not None:
+                self._attach_heads(self.screen)
+                self.target = None
+            self._draw_frame()
+            pygame.transform.scale(self.screen, rect.size, surface.subsurface(rect))
+        return rect
+
+    def _attach_heads(self, surface):
+        self.render_surface = surface
+        for head in self.heads:
+            head.attach(surface)
+
+    def _send_reply(self, kind, seq, payload):
+        # Completion callbacks take the place of sequence numbers
+        if kind == "completed" and callable(seq):
+            seq(payload)
+
+    def _trigger(self, op, arg=None, flags=0, head=0, on_complete=None):
+        if on_complete is not None:
+            flags |= COMMAND_FLAG_NOTIFY
+        self._process_command(op, arg, flags, on_complete, head)
+
+    def get_state(self, head=0):
+        """Returns the animation state of a head."""
+        return self.heads[head].animation.current_state
+
+    def trigger_expression(self, name, duration_ms=None, head=0, on_complete=None):
+        """
+        Starts any registered expression by name.
+
+        Args:
+            name (str): Expression name, a key of EXPRESSION_OPS.
+            duration_ms (int, optional): Argument of the expression, the
+                duration for timed expressions.
+            head (int, optional): Id of the head, or ALL_HEADS. Defaults to 0.
+            on_complete (callable, optional): Called with True once the head
+                is back to IDLE, or False if another expression cut it off.
+                Called once per head for ALL_HEADS.
+        """
+        if name not in EXPRESSION_OPS:
+            print(f"EyeApp: Unknown expression '{name}'.")
+            return
+        self._trigger(EXPRESSION_OPS[name], duration_ms, head=head, on_complete=on_complete)
+
+    def trigger_laugh(self, head=0, on_complete=None):
+        self._trigger(CommandOp.LAUGH, head=head, on_complete=on_complete)
+
+    def trigger_smile(self, duration_ms=None, head=0, on_complete=None):
+        self._trigger(CommandOp.SMILE, duration_ms, head=head, on_complete=on_complete)
+
+    def trigger_star(self, duration_ms=None, head=0, on_complete=None):
+        self._trigger(CommandOp.STAR, duration_ms, head=head, on_complete=on_complete)
+
+    def trigger_concentrate(self, duration_ms=None, indefinite=False, head=0, on_complete=None):
+        if indefinite: self._trigger(CommandOp.CONCENTRATE, flags=COMMAND_FLAG_INDEFINITE, head=head,
+                                     on_complete=on_complete)
+        else: self._trigger(CommandOp.CONCENTRATE, duration_ms, head=head, on_complete=on_complete)
+
+    def stop_concentrate(self, head=0):
+        self._trigger(CommandOp.STOP_CONCENTRATE, head=head)
+
+    def stop_expression(self, head=0):
+        self._trigger(CommandOp.STOP_EXPRESSION, head=head)
+
+    def set_gaze(self, x, y, head=0):
+        """Makes the eyes look toward (x, y), both -1 to 1, see `EyesController.set_gaze()`."""
+        for eye_head in self._get_target_heads(head):
+            eye_head.animation.set_gaze_target(x, y)
+
+    def clear_gaze(self, head=0):
+        for eye_head in self._get_target_heads(head):
+            eye_head.animation.set_gaze_target(None, None)
+
+    def play_sequence(self, steps, replace=False, head=0):
+        """
+        Schedules a timeline of expressions relative to now, see
+        `EyesController.play_sequence()`. Returns the sequence id.
+        """
+        self.sequence_ids = self.sequence_ids % 0xFFFF + 1
+        sequence_id = self.sequence_ids
+        data = encode_sequence(steps, sequence_id, replace, head)
+        self._schedule_sequence(data, len(data) // COMMAND_STRUCT.size - 1,
+                                COMMAND_FLAG_REPLACE if replace else 0, sequence_id, head)
+        return sequence_id
+
+    def cancel_sequence(self, sequence_id=None):
+        self._cancel_sequence(sequence_id)
+
+
+class EyesController:
+    """
+    Manages and controls the Monkey Eyes animation program, which runs in a
+    separate process.
+
+    This controller provides a simple interface to start, stop, and trigger
+    various emotional animations (like laughing, smiling, concentrating, etc.)
+    for a pair of "monkey eyes" displayed in a dedicated Pygame window.
+
+    Args:
+        dirty_rects (bool, optional): If True, the eye process only redraws and
+            pushes the screen areas around the eyes each frame, which is much
+            cheaper on slow devices. Defaults to False (full-screen flip).
+        sprite_cache_bytes (int, optional): Memory cap of the eye process'
+            sprite cache for the circular and star eyes. 0 or None disables
+            the cache. Defaults to 4 MiB.
+        frame_based_animation (bool, optional): If True, the eye process steps
+            animations once per frame (so their speed depends on the achieved
+            frame rate) instead of by elapsed time. Defaults to False.
+        power_saving (bool, optional): If True, the eye process sleeps while the
+            eyes are idle instead of redrawing at 60 fps, waking up for the next
+            blink or an incoming command. Defaults to False.
+        baked_animations (bool, optional): If True, the eye process precomputes
+            the animations into NumPy arrays and plays them back by index,
+            which saves CPU on slow devices. Requires NumPy. Defaults to False.
+        heads (int, optional): Number of independent pairs of eyes. Every
+            command takes a `head` id from 0 to heads-1 (or ALL_HEADS). Head
+            ids are sent as one byte, so at most MAX_HEADS (255). Defaults to 1.
+        renderer_processes (int, optional): Number of eye processes the heads
+            are sharded across, each with its own window. Head `h` is drawn by
+            process `h % renderer_processes`. Defaults to 1.
+        command_priorities (dict, optional): Priority per expression name. A
+            running expression is only cut off by one of at least its
+            priority. Defaults to equal priorities, with "stop" above.
+        max_pending_commands (int, optional): Most expression commands the eye
+            process queues within one frame. Defaults to 64.
+        command_drop_policy (str, optional): Whether the "oldest" or "newest"
+            command is dropped once that limit is hit. Defaults to "oldest".
+        render_scale (float, optional): Resolution the eye process draws at,
+            relative to its window, upscaled to the window. Defaults to 1.0.
+        auto_render_scale (bool, optional): If True, the eye process lowers
+            the render scale while it misses its frame rate and raises it
+            again when there is headroom. Defaults to False.
+        prewarm (bool, optional): If True, a standby process per renderer is
+            kept with pygame already imported and initialized, which the next
+            `start_eyes()` (e.g. a restart) takes over. Defaults to False.
+        frame_export (bool, optional): If True, every eye process publishes its
+            frames in shared memory, readable with `get_frame_reader()`.
+            Requires NumPy. Defaults to False.
+        frame_export_fps (float, optional): Maximum frame export rate, so the
+            export does not slow down rendering. Defaults to 15.
+        frame_export_scale (float, optional): Downscale factor of the exported
+            frames. Defaults to 1.0.
+        expression_config (str, optional): JSON or TOML file of custom
+            expressions, loaded here and in the eye processes. See
+            `load_expression_config()` and `trigger_expression()`.
+        record_session (str, optional): Path of a session log every eye
+            process records its received commands to, for `replay_session()`.
+            With several renderers, renderer `r` writes "<name>.<r><ext>".
+            Overwritten by every start. When the watchdog restarts a
+            renderer, the log of the replaced process is kept as
+            "<log name>.<restart count><ext>".
+        watchdog (bool, optional): If True, a watchdog thread watches the
+            heartbeat every eye process publishes in shared memory and
+            restarts a renderer that exited, stopped presenting frames for
+            `stall_timeout` seconds or never showed a first frame, restoring
+            the expressions that were still running. Defaults to False.
+        stall_timeout (float, optional): Seconds without a frame after which
+            a renderer counts as hung. Defaults to 2.0.
+        spike_ms (float, optional): Frame work time reported as a spike.
+            Defaults to 250.
+        on_watchdog_event (callable, optional): Called from the watchdog
+            thread with every event dict, see `get_watchdog_events()`.
+        profile_dir (str, optional): Directory the eye processes write the
+            files of `profile()` to. Defaults to the temp directory.
+        backend (str, optional): "surface" or "texture", how the eye
+            processes draw, see `MonkeyEyeApp`. Defaults to "surface".
+        software_renderer (bool, optional): Forces SDL's software renderer
+            for the texture backend. Defaults to False.
+        command_server (str, optional): Address of a `CommandServer` every
+            eye process runs, "unix:<path>" or "tcp:<host>:<port>", so other
+            programs can drive the eyes alongside this controller. With
+            several renderers, renderer `r` listens on "<path>.<r>" or on
+            port + r, with its local head ids.
+        send_timeout (float, optional): Seconds a command waits for room in
+            the pipe of a renderer that is not reading, e.g. because it
+            hangs, before it is dropped, so the calling thread never blocks
+            for longer. Defaults to 0.1.
+
+    Example:
+        >>> controller = EyesController()
+        >>> controller.start_eyes()
+        >>> # Eyes window appears
+        >>> controller.trigger_smile(duration_ms=3000)
+        >>> # Eyes smile for 3 seconds
+        >>> controller.stop_eyes()
+        >>> # Eyes window closes
+    """
+    def __init__(self, dirty_rects=False, sprite_cache_bytes=4 * 1024 * 1024, frame_based_animation=False,
+                 power_saving=False, baked_animations=False, heads=1, renderer_processes=1,
+                 frame_export=False, frame_export_fps=15, frame_export_scale=1.0, command_priorities=None,
+                 max_pending_commands=64, command_drop_policy="oldest", render_scale=1.0, auto_render_scale=False,
+                 prewarm=False, expression_config=None, record_session=None, watchdog=False, stall_timeout=2.0,
+                 spike_ms=250, on_watchdog_event=None, command_server=None, profile_dir=None, backend="surface",
+                 software_renderer=False, send_timeout=0.1):
+        if heads > MAX_HEADS:
+            raise ValueError(f"At most {MAX_HEADS} heads are supported, got {heads}")
+        if expression_config:
+            load_expression_config(expression_config)
+        self.heads = max(1, heads)
+        self.renderer_processes = max(1, min(renderer_processes, self.heads))
+        # One pipe end, process and frame reader per renderer
+        self.command_conns = []
+        self.eye_processes = []
+        self.frame_export = frame_export
+        self.frame_readers = {}
+        # GazeChannel written by set_gaze() per renderer, while running
+        self.gaze_channels = {}
+        self.prewarm = prewarm
+        self.record_session = record_session
+        self.command_server = command_server
+        self.watchdog = watchdog
+        self.stall_timeout = stall_timeout
+        self.startup_timeout = max(10.0, stall_timeout)
+        self.on_watchdog_event = on_watchdog_event
+        self.watchdog_events = []
+        # Heartbeat block per renderer, while the watchdog runs
+        self.heartbeats = {}
+        self._watchdog_thread = None
+        self._watchdog_stop = threading.Event()
+        # Per renderer: time it was (re)started, spikes already reported and
+        # the time its stall was detected, until the new process shows a frame
+        self._watchdog_state = {}
+        # Restarts of every renderer, numbering the session logs they keep
+        self._restart_counts = {}
+        # Guards the pipes and processes, which the watchdog replaces on restart
+        self._renderer_lock = threading.RLock()
+        # Per renderer, serializes the messages written to its pipe
+        self._send_locks = {}
+        self.send_timeout = send_timeout
+        # Messages dropped because a renderer's pipe stayed full, and the
+        # pipes that did, which drop without waiting until they have room again
+        self.dropped_messages = 0
+        self._full_conns = set()
+        # Expression command last sent to every head, restored after a restart:
+        # head -> (op, arg, flags, seq, time.monotonic() it ends at, None if indefinite)
+        self.active_expressions = {}
+        # (process, pipe end) of the standby process of every renderer
+        self.standby_processes = {}
+        # Milliseconds from start_eyes() to the first frame of every renderer
+        self.time_to_first_frame_ms = None
+        self._seq = 0
+        # Options forwarded to the MonkeyEyeApp in the eye process
+        self.app_options = {
+            "dirty_rects": dirty_rects,
+            "sprite_cache_bytes": sprite_cache_bytes,
+            "frame_based_animation": frame_based_animation,
+            "power_saving": power_saving,
+            "baked_animations": baked_animations,
+            "frame_export_fps": frame_export_fps,
+            "frame_export_scale": frame_export_scale,
+            "command_priorities": command_priorities,
+            "max_pending_commands": max_pending_commands,
+            "command_drop_policy": command_drop_policy,
+            "render_scale": render_scale,
+            "auto_render_scale": auto_render_scale,
+            "expression_config": expression_config,
+            "heartbeat_spike_ms": spike_ms,
+            "profile_dir": profile_dir,
+            "backend": backend,
+            "software_renderer": software_renderer,
+        }
+
+    def _get_frame_export_name(self, renderer):
+        return f"monkey_eyes_{os.getpid()}_{id(self)}_{renderer}"
+
+    def _get_gaze_channel_name(self, renderer):
+        return f"monkey_eyes_gaze_{os.getpid()}_{id(self)}_{renderer}"
+
+    def _get_local_heads(self, renderer):
+        return len(range(renderer, self.heads, self.renderer_processes))
+
+    def _get_heartbeat_name(self, renderer):
+        return f"monkey_eyes_heartbeat_{os.getpid()}_{id(self)}_{renderer}"
+
+    def _get_record_path(self, renderer):
+        if not self.record_session or self.renderer_processes == 1:
+            return self.record_session
+        base, extension = os.path.splitext(self.record_session)
+        return f"{base}.{renderer}{extension}"
+
+    def _get_command_server_address(self, renderer):
+        if not self.command_server or self.renderer_processes == 1:
+            return self.command_server
+        kind, _, location = self.command_server.partition(":")
+        if kind == "tcp":
+            host, _, port = location.rpartition(":")
+            return f"tcp:{host}:{int(port) + renderer}"
+        return f"{self.command_server}.{renderer}"
+
+    def _is_running(self):
+        return any(process.is_alive() for process in self.eye_processes)
+
+    def start_eyes(self, wait=False, timeout=10.0):
+        """
+        Starts the Monkey Eyes animation program in a separate process, or
+        one process per renderer if the heads are sharded.
+
+        A new window will be created to display the eye animations. If the
         eye animation program is already running, this method will print a
         message and do nothing.
 
         The eye process is started as a daemon, meaning it will automatically
         terminate if the main program exits.
+
+        Args:
+            wait (bool, optional): If True, blocks until every eye process has
+                presented its first frame and stores the elapsed time in
+                `time_to_first_frame_ms`. Defaults to False.
+            timeout (float, optional): Seconds to wait for the first frame.
+
+        Returns:
+            bool: False if the eyes were already running or `wait` timed out.
         """
-        if self.eye_process and self.eye_process.is_alive():
+        if self._is_running():
             print("EyesController: Eyes are already running.")
-            return
-        self.command_queue = multiprocessing.Queue()
-        app_instance = MonkeyEyeApp(self.command_queue)
-        self.eye_process = multiprocessing.Process(target=app_instance.run_app_loop)
-        self.eye_process.daemon = True 
-        self.eye_process.start()
+            return False
+        start_time = time.monotonic()
+        self.command_conns = []
+        self.eye_processes = []
+        self.time_to_first_frame_ms = None
+        for renderer in range(self.renderer_processes):
+            # Created before the eye process attaches to it; standby processes attach after START
+            self.gaze_channels[renderer] = GazeChannel(self._get_gaze_channel_name(renderer),
+                                                       self._get_local_heads(renderer), create=True)
+            if self.watchdog:
+                self.heartbeats[renderer] = Heartbeat(self._get_heartbeat_name(renderer), create=True)
+            eye_process, command_conn = self._take_or_spawn_eye_process(renderer)
+            self.command_conns.append(command_conn)
+            self.eye_processes.append(eye_process)
         print("EyesController: Monkey Eyes program started.")
 
+        ready = True
+        if wait:
+            ready = self._wait_until_ready(start_time, timeout)
+        if self.prewarm:
+            for renderer in range(self.renderer_processes):
+                self.standby_processes[renderer] = self._spawn_eye_process(renderer, standby=True)
+        if self.watchdog:
+            self._start_watchdog()
+        return ready
+
+    def _take_or_spawn_eye_process(self, renderer):
+        """Starts the standby process of a renderer if there is one, otherwise spawns a new process."""
+        standby = self.standby_processes.pop(renderer, None)
+        if standby is not None and standby[0].is_alive():
+            eye_process, command_conn = standby
+            command_conn.send_bytes(encode_command(CommandOp.START))
+            return eye_process, command_conn
+        return self._spawn_eye_process(renderer)
+
+    def _spawn_eye_process(self, renderer, standby=False):
+        """Starts the eye process of a renderer and returns it with the controller's pipe end."""
+        command_conn, app_conn = multiprocessing.Pipe()
+        frame_export = self._get_frame_export_name(renderer) if self.frame_export else None
+        app_instance = MonkeyEyeApp(app_conn, heads=self._get_local_heads(renderer), frame_export=frame_export,
+                                    gaze_channel=self._get_gaze_channel_name(renderer),
+                                    record_path=self._get_record_path(renderer),
+                                    heartbeat=self._get_heartbeat_name(renderer) if self.watchdog else None,
+                                    command_server=self._get_command_server_address(renderer),
+                                    **self.app_options)
+        eye_process = multiprocessing.Process(target=app_instance.run_app_loop, args=(standby,))
+        eye_process.daemon = True 
+        eye_process.start()
+        # The eye process holds its own copy of the app end now
+        app_conn.close()
+        return eye_process, command_conn
+
+    def _wait_until_ready(self, start_time, timeout):
+        """Waits for the "ready" reply of every eye process. Returns False on timeout."""
+        waiting = list(self.command_conns)
+        deadline = start_time + timeout
+        while waiting:
+            remaining = deadline - time.monotonic()
+            ready_conns = multiprocessing.connection.wait(waiting, max(remaining, 0))
+            if not ready_conns:
+                print(f"EyesController: Eyes did not show a frame within {timeout}s.")
+                return False
+            for command_conn in ready_conns:
+                try: kind = command_conn.recv()[0]
+                except (EOFError, OSError):
+                    print("EyesController: Eye process exited before its first frame.")
+                    return False
+                if kind == "ready":
+                    waiting.remove(command_conn)
+        self.time_to_first_frame_ms = (time.monotonic() - start_time) * 1000
+        print(f"EyesController: First frame after {self.time_to_first_frame_ms:.0f} ms.")
+        return True
+
+    def release_standby(self):
+        """Stops the standby processes kept by `prewarm`."""
+        for eye_process, command_conn in self.standby_processes.values():
+            try: self._write_message(command_conn, encode_command(CommandOp.QUIT), "quit command")
+            except Exception as e: print(f"EyesController: Error sending quit command: {e}")
+            eye_process.join(timeout=3)
+            if eye_process.is_alive():
+                eye_process.terminate()
+            command_conn.close()
+        self.standby_processes = {}
+
     def stop_eyes(self):
         """
         Stops the Monkey Eyes animation program and closes its window.
@@ -573,37 +4204,453 @@ class EyesController:
         If the eye program is not running, this method will print a message
         and do nothing.
         """
-        if not self.eye_process or not self.eye_process.is_alive():
+        self._stop_watchdog()
+        if not self._is_running():
             print("EyesController: Eyes are not running or already stopped.")
             return
-        if self.command_queue:
-            try: self.command_queue.put("quit")
+        for command_conn in self.command_conns:
+            try: self._write_message(command_conn, encode_command(CommandOp.QUIT), "quit command")
             except Exception as e: print(f"EyesController: Error sending quit command: {e}")
-        if self.eye_process:
-            self.eye_process.join(timeout=3) 
-            if self.eye_process.is_alive():
+        for eye_process in self.eye_processes:
+            eye_process.join(timeout=3) 
+            if eye_process.is_alive():
                 print("EyesController: Eye process did not terminate gracefully, attempting to terminate.")
-                self.eye_process.terminate()
-                self.eye_process.join(timeout=1) 
-        self.eye_process = None
-        self.command_queue = None
+                eye_process.terminate()
+                eye_process.join(timeout=1) 
+        for command_conn in self.command_conns:
+            command_conn.close()
+        for frame_reader in self.frame_readers.values():
+            frame_reader.close()
+        self.frame_readers = {}
+        for gaze_channel in self.gaze_channels.values():
+            gaze_channel.close(unlink=True)
+        self.gaze_channels = {}
+        for heartbeat in self.heartbeats.values():
+            heartbeat.close(unlink=True)
+        self.heartbeats = {}
+        self.active_expressions = {}
+        self.eye_processes = []
+        self.command_conns = []
+        self._full_conns = set()
         print("EyesController: Monkey Eyes program stopped.")
 
-    def _send_command(self, command_str):
-        if not self.command_queue or (self.eye_process and not self.eye_process.is_alive()):
-            print(f"EyesController: Cannot send '{command_str}'. Eyes not running or queue unavailable.")
+    def get_frame_reader(self, renderer=0):
+        """
+        Returns a `FrameReader` for the frames exported by an eye process.
+
+        `reader.get_latest_frame()` returns the sequence number and a
+        (height, width, 3) RGB NumPy view of the latest frame, read straight
+        from shared memory.
+
+        Args:
+            renderer (int, optional): Index of the eye process. Defaults to 0.
+
+        Returns:
+            FrameReader: The reader, or None if frame export is disabled or
+            the eye process has not published any frame buffer yet.
+        """
+        if not self.frame_export or not self._is_running():
+            print("EyesController: Frame export is disabled or eyes are not running.")
+            return None
+        if renderer not in self.frame_readers:
+            try: self.frame_readers[renderer] = FrameReader(self._get_frame_export_name(renderer))
+            except FileNotFoundError:
+                print(f"EyesController: Frame buffer of renderer {renderer} is not available yet.")
+                return None
+        return self.frame_readers[renderer]
+
+    def _next_seq(self):
+        # 0 is reserved for unsolicited replies such as "ready"
+        self._seq = self._seq % 0xFFFF + 1
+        return self._seq
+
+    def get_watchdog_events(self):
+        """
+        Returns the events the watchdog reported, oldest first. Every event
+        is a dict with `event`, `renderer` and `time` (time.time()):
+
+        - "exited" / "stalled" / "no_first_frame": the renderer was restarted
+          (`stalled_s`: seconds since its last frame).
+        - "recovered": the restarted renderer showed its first frame
+          (`recovery_ms`: from its last good frame, or the restart, until then).
+        - "spike": frames took longer than `spike_ms` (`count`, `frame_ms`
+          of the last one).
+        """
+        return list(self.watchdog_events)
+
+    def _start_watchdog(self):
+        now = time.monotonic()
+        self._watchdog_state = {
+            renderer: {"started": now, "spikes": 0, "stalled_at": None}
+            for renderer in range(self.renderer_processes)
+        }
+        self._watchdog_stop.clear()
+        self._watchdog_thread = threading.Thread(target=self._run_watchdog, daemon=True)
+        self._watchdog_thread.start()
+
+    def _stop_watchdog(self):
+        self._watchdog_stop.set()
+        if self._watchdog_thread is not None and self._watchdog_thread is not threading.current_thread():
+            self._watchdog_thread.join()
+        self._watchdog_thread = None
+
+    def _run_watchdog(self):
+        interval = min(0.25, self.stall_timeout / 4)
+        while not self._watchdog_stop.wait(interval):
+            for renderer in range(self.renderer_processes):
+                try: self._check_renderer(renderer)
+                except Exception as e: print(f"EyesController: Watchdog error on renderer {renderer}: {e}")
+
+    def _report_watchdog_event(self, event, renderer, **details):
+        entry = dict(details, event=event, renderer=renderer, time=time.time())
+        self.watchdog_events.append(entry)
+        if self.on_watchdog_event is not None:
+            self.on_watchdog_event(entry)
+
+    def _check_renderer(self, renderer):
+        """Reads the heartbeat of a renderer and restarts it if it exited or hangs."""
+        state = self._watchdog_state[renderer]
+        frames, last_beat, spikes, last_spike_ms, _ = self.heartbeats[renderer].read()
+        now = time.monotonic()
+        if frames and state["stalled_at"] is not None:
+            recovery_ms = (last_beat - state["stalled_at"]) * 1000
+            print(f"EyesController: Renderer {renderer} recovered after {recovery_ms:.0f} ms.")
+            self._report_watchdog_event("recovered", renderer, recovery_ms=recovery_ms)
+            state["stalled_at"] = None
+        if spikes > state["spikes"]:
+            self._report_watchdog_event("spike", renderer, count=spikes - state["spikes"], frame_ms=last_spike_ms)
+            state["spikes"] = spikes
+
+        if not self.eye_processes[renderer].is_alive():
+            reason = "exited"
+        elif frames and now - last_beat > self.stall_timeout:
+            reason = "stalled"
+        elif not frames and now - state["started"] > self.startup_timeout:
+            reason = "no_first_frame"
+        else:
             return
-        try: self.command_queue.put(command_str)
-        except Exception as e: print(f"EyesController: Error sending '{command_str}': {e}")
+        stalled_at = last_beat if frames else now
+        if state["stalled_at"] is None:
+            state["stalled_at"] = stalled_at
+        print(f"EyesController: Renderer {renderer} {reason.replace('_', ' ')}, restarting it.")
+        self._report_watchdog_event(reason, renderer, stalled_s=now - stalled_at if frames else None)
+        self._restart_renderer(renderer)
+        state.update(started=time.monotonic(), spikes=0)
 
-    def trigger_laugh(self):
+    def _restart_renderer(self, renderer):
+        """Replaces the eye process of a renderer and restores the expressions of its heads."""
+        old_process = self.eye_processes[renderer]
+        if old_process.is_alive():
+            # SDL turns SIGTERM into a quit event, which a hung loop never handles. Killed before
+            # taking the lock, so a send blocked on the full pipe of the hung process fails
+            old_process.kill()
+            old_process.join(timeout=1)
+        with self._renderer_lock:
+            old_conn = self.command_conns[renderer]
+            if self.record_session:
+                self._rotate_session_log(renderer)
+            if self.frame_export:
+                self._remove_frame_export(renderer)
+            self.heartbeats[renderer].reset()
+            eye_process, command_conn = self._take_or_spawn_eye_process(renderer)
+            self.eye_processes[renderer] = eye_process
+            self.command_conns[renderer] = command_conn
+            self._on_renderer_restarted(renderer, old_conn, command_conn)
+            # Not while a send to the dead process is still failing
+            with self._send_locks.setdefault(renderer, threading.Lock()):
+                old_conn.close()
+            self._full_conns.discard(old_conn)
+            if self.prewarm:
+                self.standby_processes[renderer] = self._spawn_eye_process(renderer, standby=True)
+            self._restore_expressions(renderer)
+
+    def _rotate_session_log(self, renderer):
+        """Moves the session log of a replaced eye process aside, before its successor overwrites it."""
+        path = self._get_record_path(renderer)
+        if not os.path.exists(path):
+            return
+        count = self._restart_counts[renderer] = self._restart_counts.get(renderer, 0) + 1
+        base, extension = os.path.splitext(path)
+        try: os.replace(path, f"{base}.{count}{extension}")
+        except OSError as e: print(f"EyesController: Cannot keep session log {path}: {e}")
+
+    def _remove_frame_export(self, renderer):
+        """Removes the frame export block a killed eye process could not clean up."""
+        from multiprocessing import shared_memory
+
+        frame_reader = self.frame_readers.pop(renderer, None)
+        if frame_reader is not None:
+            frame_reader.close()
+        try:
+            shm = shared_memory.SharedMemory(name=self._get_frame_export_name(renderer))
+        except FileNotFoundError:
+            return
+        shm.close()
+        shm.unlink()
+
+    def _on_renderer_restarted(self, renderer, old_conn, new_conn):
+        """Called with the pipe ends of a restarted renderer, before the old one is closed."""
+
+    def _restore_expressions(self, renderer):
+        """Resends the expressions still running on the heads of a restarted renderer."""
+        now = time.monotonic()
+        for head, (op, arg, flags, seq, deadline) in list(self.active_expressions.items()):
+            if head % self.renderer_processes != renderer:
+                continue
+            if deadline is not None:
+                # Only the time left of the duration asked for. A laugh, which has no duration, restarts
+                remaining = (deadline - now) * 1000
+                if remaining <= 0:
+                    del self.active_expressions[head]
+                    continue
+                arg = int(remaining)
+            local_head = head // self.renderer_processes
+            self._send_bytes(renderer, encode_command(op, arg, flags, seq, head=local_head), f"command {op}")
+
+    def _route(self, head):
+        """
+        Maps a head id to the (renderer, local head id) pairs the command is
+        sent to. ALL_HEADS goes to every renderer.
+        """
+        if head == ALL_HEADS:
+            return [(renderer, ALL_HEADS) for renderer in range(self.renderer_processes)]
+        if 0 <= head < self.heads:
+            return [(head % self.renderer_processes, head // self.renderer_processes)]
+        print(f"EyesController: Unknown head {head}.")
+        return []
+
+    def _send_bytes(self, renderer, message, description):
+        """
+        Sends a message to one renderer. Returns False if it could not be sent.
+
+        The renderer lock is only held to look up the pipe, not while writing
+        to it, so the watchdog can still replace a renderer that hangs with a
+        full pipe. See `_write_message()` for a pipe that stays full.
+        """
+        with self._renderer_lock:
+            if renderer >= len(self.command_conns) or not self.eye_processes[renderer].is_alive():
+                print(f"EyesController: Cannot send {description}. Eyes not running or pipe unavailable.")
+                return False
+            command_conn = self.command_conns[renderer]
+            send_lock = self._send_locks.setdefault(renderer, threading.Lock())
+        try:
+            with send_lock:
+                return self._write_message(command_conn, message, description)
+        except Exception as e:
+            print(f"EyesController: Error sending {description}: {e}")
+            return False
+
+    def _write_message(self, command_conn, message, description):
+        """
+        Writes a message to a pipe once it has room. Returns False if the pipe
+        stayed full for `send_timeout` seconds and the message was dropped.
+        Once a pipe timed out, further messages are dropped right away until
+        it has room again.
+
+        `send_bytes` blocks while the pipe is full, which happens after a few
+        hundred commands a renderer has not read. A socket only counts as
+        writable with half of its buffer free, so a message fits without
+        blocking once `select` reports it.
+        """
+        timeout = 0 if command_conn in self._full_conns else self.send_timeout
+        _, writable, _ = select.select([], [command_conn], [], timeout)
+        if not writable:
+            self.dropped_messages += 1
+            if command_conn not in self._full_conns:
+                self._full_conns.add(command_conn)
+                print(f"EyesController: Eye process is not reading its pipe, dropping {description} "
+                      "and further messages until it does.")
+            return False
+        if command_conn in self._full_conns:
+            self._full_conns.discard(command_conn)
+            print("EyesController: Eye process reads its pipe again.")
+        command_conn.send_bytes(message)
+        return True
+
+    def _track_expression(self, op, arg, flags, seq, head):
+        """Remembers the expression running on each head, for the watchdog to restore."""
+        heads = range(self.heads) if head == ALL_HEADS else (head,)
+        deadline = None
+        if not flags & COMMAND_FLAG_INDEFINITE:
+            # The duration sent, or the length the expression runs without one
+            duration = arg if arg is not None else EXPRESSIONS.by_op[op].default_duration
+            deadline = time.monotonic() + duration / 1000
+        with self._renderer_lock:
+            for index in heads:
+                if op == CommandOp.STOP_EXPRESSION:
+                    self.active_expressions.pop(index, None)
+                elif op == CommandOp.STOP_CONCENTRATE:
+                    if self.active_expressions.get(index, (None,))[0] == CommandOp.CONCENTRATE:
+                        del self.active_expressions[index]
+                else:
+                    self.active_expressions[index] = (op, arg, flags, seq, deadline)
+
+    def _send_command(self, op, arg=None, flags=0, seq=0, head=0):
+        """Sends a binary command record. Returns False if it could not be sent."""
+        if self.watchdog and op in EXPRESSIONS.by_op:
+            self._track_expression(op, arg, flags, seq, head)
+        targets = self._route(head)
+        sent = [self._send_bytes(renderer, encode_command(op, arg, flags, seq, head=local_head), f"command {op}")
+                for renderer, local_head in targets]
+        return bool(sent) and all(sent)
+
+    def _request(self, op, timeout=1.0, head=0, arg=None):
+        """
+        Sends a query command to the renderer of `head` and waits for the reply
+        with the same sequence number. Returns the reply payload, or None on timeout.
+        """
+        targets = self._route(head)
+        if not targets:
+            return None
+        renderer, local_head = targets[0]
+        seq = self._next_seq()
+        if not self._send_bytes(renderer, encode_command(op, arg, seq=seq, head=local_head), f"command {op}"):
+            return None
+        command_conn = self.command_conns[renderer]
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0 or not command_conn.poll(remaining):
+                    print(f"EyesController: No reply to command {op} within {timeout}s.")
+                    return None
+                kind, reply_seq, payload = command_conn.recv()
+            except (EOFError, OSError) as e:
+                print(f"EyesController: Error receiving reply to command {op}: {e}")
+                return None
+            if reply_seq == seq:
+                return payload
+
+    def play_sequence(self, steps, replace=False, head=0):
+        """
+        Sends a whole timeline of expressions to the eye process in one message.
+
+        The eye process schedules every step against its own clock, so the
+        steps start on the exact frame they are due, without the caller
+        sleeping in between. Steps of several sequences may overlap unless
+        `replace` is used.
+
+        Args:
+            steps (list): (offset_ms, expression) or (offset_ms, expression, arg)
+                tuples. `offset_ms` is relative to the moment the eye process
+                receives the sequence, `expression` one of "laugh", "smile",
+                "star", "concentrate", "stop_concentrate" or "stop" and `arg` the
+                duration in ms (or "indefinite" for "concentrate").
+            replace (bool, optional): If True, all pending steps of earlier
+                sequences for the same head are dropped first. Defaults to False.
+            head (int, optional): Id of the head playing the sequence, or
+                ALL_HEADS. Defaults to 0.
+
+        Returns:
+            int: The sequence id to pass to `cancel_sequence()`, or None if the
+            sequence could not be sent.
+
+        Example:
+            >>> controller.play_sequence([
+            ...     (0, "smile", 2000),
+            ...     (2500, "laugh"),
+            ...     (5000, "concentrate", "indefinite"),
+            ...     (8000, "stop_concentrate"),
+            ... ])
+        """
+        sequence_id = self._next_seq()
+        targets = self._route(head)
+        messages = [(renderer, encode_sequence(steps, sequence_id, replace, local_head))
+                    for renderer, local_head in targets]
+        sent = [self._send_bytes(renderer, message, "sequence") for renderer, message in messages]
+        if not sent or not all(sent):
+            return None
+        return sequence_id
+
+    def replace_sequence(self, steps, head=0):
+        """
+        Drops all pending sequence steps of the head and plays the given steps
+        instead. Same as `play_sequence(steps, replace=True, head=head)`.
+        """
+        return self.play_sequence(steps, replace=True, head=head)
+
+    def cancel_sequence(self, sequence_id=None):
+        """
+        Drops the pending steps of a sequence. Expressions that already
+        started keep running.
+
+        Args:
+            sequence_id (int, optional): Id returned by `play_sequence()`. If
+                None, the steps of all sequences are dropped.
+        """
+        self._send_command(CommandOp.CANCEL_SEQUENCE, sequence_id, head=ALL_HEADS)
+
+    def get_command_latency(self, timeout=1.0, head=0):
+        """
+        Returns the statistics of the latency between sending a command and
+        the first rendered frame showing it, measured by the eye process
+        drawing `head`.
+
+        Returns:
+            dict: `count`, `within_frame` (commands that landed within one
+            frame, i.e. `frame_budget_ms`), `mean_ms`, `min_ms`, `max_ms` and
+            `last_ms`, or None if the eyes did not answer within `timeout` seconds.
+        """
+        return self._request(CommandOp.GET_LATENCY, timeout, head)
+
+    def get_stats(self, timeout=1.0, head=0):
+        """
+        Returns a snapshot of the frame timings of the eye process drawing
+        `head`, covering its last 600 frames.
+
+        Returns:
+            dict: `frames` and `dropped_frames` (total counts), achieved `fps`,
+            `frame_budget_ms`, and `count`, `mean_ms`, `p50_ms`, `p95_ms`,
+            `p99_ms` and `max_ms` of the whole `frame`, of each of the
+            `phases` ("commands", "events", "update", "draw", "present",
+            "export", "sleep") and of the frame time per animation state in
+            `states`. `commands` holds the `received`, `coalesced`, `dropped`
+            and `rejected` command counters. None if the eyes did not answer
+            within `timeout` seconds.
+        """
+        return self._request(CommandOp.GET_STATS, timeout, head)
+
+    def profile(self, duration_ms=5000, head=0, timeout=None):
+        """
+        Profiles the render loop of the eye process drawing `head` for
+        `duration_ms` with a `SamplingProfiler` and waits for the result.
+
+        The eye process samples the stack of its render thread every 5 ms,
+        with the animation state(s) shown at each sample as the root frame,
+        and writes the samples as collapsed stacks (for flamegraph.pl or
+        speedscope) into `profile_dir`. No profiling code runs outside the
+        window.
+
+        Args:
+            duration_ms (int, optional): Length of the profile. Defaults to 5000.
+            head (int, optional): Head whose eye process is profiled. Defaults to 0.
+            timeout (float, optional): Seconds to wait for the file. Defaults
+                to the duration plus 2 seconds.
+
+        Returns:
+            str: Path of the collapsed-stack file in the eye process's file
+            system, or None if the profile failed or timed out.
+
+        Example:
+            >>> path = controller.profile(10000)
+            >>> # flamegraph.pl path > profile.svg
+        """
+        if timeout is None:
+            timeout = duration_ms / 1000 + 2
+        return self._request(CommandOp.PROFILE, timeout, head, int(duration_ms))
+
+    def trigger_laugh(self, head=0):
         """
         Triggers the laughing animation.
 
         The eyes will laugh for a predefined number of cycles.
+
+        Args:
+            head (int, optional): Id of the head to animate, or ALL_HEADS.
+                Defaults to 0.
         """ 
-        self._send_command("laugh")
-    def trigger_smile(self, duration_ms=None):
+        self._send_command(CommandOp.LAUGH, head=head)
+    def trigger_smile(self, duration_ms=None, head=0):
         """
         Triggers the smiling animation.
 
@@ -614,10 +4661,11 @@ class EyesController:
             duration_ms (int, optional): The duration of the smile animation
                 in milliseconds. If None, a default duration (e.g., 2000ms)
                 defined within the animation logic will be used.
+            head (int, optional): Id of the head to animate, or ALL_HEADS.
+                Defaults to 0.
         """
-        cmd = f"smile:{duration_ms}" if duration_ms is not None else "smile"
-        self._send_command(cmd)
-    def trigger_star(self, duration_ms=None):
+        self._send_command(CommandOp.SMILE, duration_ms, head=head)
+    def trigger_star(self, duration_ms=None, head=0):
         """
         Triggers the star-eyes animation in the Monkey Eyes program.
 
@@ -627,10 +4675,11 @@ class EyesController:
             duration_ms (int, optional): The total duration of the star
                 animation in milliseconds. If None, a default duration
                 (e.g., 3000ms) defined within the animation logic will be used.
+            head (int, optional): Id of the head to animate, or ALL_HEADS.
+                Defaults to 0.
         """
-        cmd = f"star:{duration_ms}" if duration_ms is not None else "star"
-        self._send_command(cmd)
-    def trigger_concentrate(self, duration_ms=None, indefinite=False):
+        self._send_command(CommandOp.STAR, duration_ms, head=head)
+    def trigger_concentrate(self, duration_ms=None, indefinite=False, head=0):
         """
         Triggers the concentrating (squinting) animation in the Monkey Eyes program.
 
@@ -644,17 +4693,294 @@ class EyesController:
             indefinite (bool, optional): If True, the eyes will remain in the
                 concentrated state until `stop_concentrate()` is called.
                 Defaults to False.
+            head (int, optional): Id of the head to animate, or ALL_HEADS.
+                Defaults to 0.
         """
-        if indefinite: cmd = "concentrate:indefinite"
-        elif duration_ms is not None: cmd = f"concentrate:{duration_ms}"
-        else: cmd = "concentrate"
-        self._send_command(cmd)
-    def stop_concentrate(self): 
+        if indefinite: self._send_command(CommandOp.CONCENTRATE, flags=COMMAND_FLAG_INDEFINITE, head=head)
+        else: self._send_command(CommandOp.CONCENTRATE, duration_ms, head=head)
+    def stop_concentrate(self, head=0): 
         """
         Stops an ongoing 'concentrate' animation.
 
         If the concentration animation was triggered with `indefinite=True`,
         this method will cause the eyes to return to their normal idle state.
         If it was a timed concentration, this will end it prematurely.
+
+        Args:
+            head (int, optional): Id of the head, or ALL_HEADS. Defaults to 0.
+        """
+        self._send_command(CommandOp.STOP_CONCENTRATE, head=head)
+
+    def stop_expression(self, head=0):
         """
-        self._send_command("stop_concentrate")
\ No newline at end of file
+        Stops whatever animation is running and returns the eyes to their
+        idle state.
+
+        Args:
+            head (int, optional): Id of the head, or ALL_HEADS. Defaults to 0.
+        """
+        self._send_command(CommandOp.STOP_EXPRESSION, head=head)
+
+    def set_gaze(self, x, y, head=0):
+        """
+        Makes the eyes look toward a point, e.g. a face found by a tracker.
+
+        Meant to be called at the tracker's rate (30-60 Hz): the target is
+        written into a shared-memory slot that the eye process reads every
+        frame, bypassing the command pipe, so only the latest target counts
+        and no backlog builds up. The eyes follow smoothly and narrow the
+        further they look sideways; expressions take precedence while they run.
+
+        Args:
+            x (float): -1 (left) to 1 (right), 0 is straight ahead.
+            y (float): -1 (up) to 1 (down).
+            head (int, optional): Id of the head, or ALL_HEADS. Defaults to 0.
+        """
+        if not self.gaze_channels:
+            print("EyesController: Eyes are not running.")
+            return
+        for renderer, local_head in self._route(head):
+            gaze_channel = self.gaze_channels[renderer]
+            for slot in range(gaze_channel.slots) if local_head == ALL_HEADS else (local_head,):
+                gaze_channel.write(slot, x, y)
+
+    def clear_gaze(self, head=0):
+        """
+        Stops following the gaze set with `set_gaze()`; the eyes return to the center.
+
+        Args:
+            head (int, optional): Id of the head, or ALL_HEADS. Defaults to 0.
+        """
+        self.set_gaze(math.nan, math.nan, head)
+
+    def trigger_expression(self, name, duration_ms=None, head=0):
+        """
+        Triggers any registered expression by name, including the custom
+        ones of `expression_config`.
+
+        Args:
+            name (str): Expression name, a key of EXPRESSION_OPS.
+            duration_ms (int, optional): Passed to the expression as its
+                argument, the duration for timed expressions.
+            head (int, optional): Id of the head to animate, or ALL_HEADS.
+                Defaults to 0.
+        """
+        if name not in EXPRESSION_OPS:
+            print(f"EyesController: Unknown expression '{name}'.")
+            return
+        self._send_command(EXPRESSION_OPS[name], duration_ms, head=head)
+
+
+class AsyncEyesController(EyesController):
+    """
+    asyncio variant of `EyesController` whose expressions can be awaited.
+
+    Every `trigger_*` coroutine resolves once the eye process reports that the
+    head returned to IDLE, so callers no longer sleep for a guessed duration.
+    Replies from the eye processes are read by a background thread and handed
+    to the event loop, so many expressions can be awaited concurrently without
+    blocking it. Takes the same arguments as `EyesController`.
+
+    If an awaited expression times out or the awaiting task is cancelled, the
+    expression is stopped and the eyes return to their idle state.
+
+    Example:
+        >>> controller = AsyncEyesController()
+        >>> await controller.start_eyes()
+        >>> await controller.trigger_smile(2000)  # Returns after the smile
+        True
+        >>> await controller.stop_eyes()
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._loop = None
+        self._reply_thread = None
+        self._stop_replies = threading.Event()
+        # Pipes the reply thread waits on, updated when the watchdog restarts a renderer
+        self._reply_conns = []
+        # Futures waiting for replies, by sequence number
+        self._waiters = {}
+
+    async def start_eyes(self, wait=False, timeout=10.0):
+        """
+        Starts the eye process(es) and the thread receiving their replies.
+        With `wait`, returns once every eye process presented its first frame,
+        like `EyesController.start_eyes()`.
+        """
+        if self._is_running():
+            print("EyesController: Eyes are already running.")
+            return False
+        start_time = time.monotonic()
+        # Spawning the processes forks, which must not happen while the reply thread runs
+        super().start_eyes()
+        self._loop = asyncio.get_running_loop()
+        self._stop_replies.clear()
+        if wait:
+            future = self._loop.create_future()
+            self._waiters[0] = {"future": future, "remaining": self.renderer_processes, "completed": True}
+        self._reply_conns = list(self.command_conns)
+        self._reply_thread = threading.Thread(target=self._receive_replies, args=(self._reply_conns,),
+                                              daemon=True)
+        self._reply_thread.start()
+        if not wait:
+            return True
+        try:
+            await asyncio.wait_for(future, max(start_time + timeout - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            print(f"EyesController: Eyes did not show a frame within {timeout}s.")
+            return False
+        finally:
+            self._waiters.pop(0, None)
+        self.time_to_first_frame_ms = (time.monotonic() - start_time) * 1000
+        print(f"EyesController: First frame after {self.time_to_first_frame_ms:.0f} ms.")
+        return True
+
+    async def stop_eyes(self):
+        """Stops the eye process(es). Pending awaits are cancelled."""
+        self._stop_replies.set()
+        if self._reply_thread is not None:
+            await asyncio.to_thread(self._reply_thread.join)
+            self._reply_thread = None
+        for waiter in self._waiters.values():
+            waiter["future"].cancel()
+        self._waiters.clear()
+        await asyncio.to_thread(super().stop_eyes)
+
+    def _receive_replies(self, command_conns):
+        # Runs until stop_eyes(), also while the watchdog replaces every pipe
+        while not self._stop_replies.is_set():
+            if not command_conns:
+                self._stop_replies.wait(0.1)
+                continue
+            # The watchdog may close a pipe while it is waited on
+            try: ready_conns = multiprocessing.connection.wait(list(command_conns), timeout=0.1)
+            except (OSError, ValueError):
+                command_conns[:] = [command_conn for command_conn in command_conns if not command_conn.closed]
+                continue
+            for command_conn in ready_conns:
+                try: kind, seq, payload = command_conn.recv()
+                except (EOFError, OSError):
+                    if command_conn in command_conns: command_conns.remove(command_conn)
+                    continue
+                self._loop.call_soon_threadsafe(self._dispatch_reply, kind, seq, payload)
+
+    def _on_renderer_restarted(self, renderer, old_conn, new_conn):
+        # Makes the reply thread wait on the pipe of the restarted renderer
+        if self._reply_thread is not None:
+            if old_conn in self._reply_conns: self._reply_conns.remove(old_conn)
+            self._reply_conns.append(new_conn)
+
+    def _dispatch_reply(self, kind, seq, payload):
+        waiter = self._waiters.get(seq)
+        if waiter is None or waiter["future"].done():
+            return
+        if kind not in ("completed", "ready"):
+            waiter["future"].set_result(payload)
+            return
+        # One "completed" reply arrives per addressed head, one "ready" per process
+        waiter["remaining"] -= 1
+        waiter["completed"] = waiter["completed"] and payload
+        if waiter["remaining"] <= 0:
+            waiter["future"].set_result(waiter["completed"])
+
+    async def _send_and_wait(self, op, arg=None, flags=0, head=0, timeout=None, replies=1):
+        """
+        Sends a command and waits for its reply. Returns the reply payload, or
+        None if the command could not be sent. Raises `asyncio.TimeoutError`
+        if no reply arrives within `timeout` seconds.
+        """
+        seq = self._next_seq()
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[seq] = {"future": future, "remaining": replies, "completed": True}
+        try:
+            if not self._send_command(op, arg, flags, seq, head):
+                return None
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._waiters.pop(seq, None)
+
+    async def _await_expression(self, op, arg=None, flags=0, head=0, timeout=None):
+        """
+        Triggers an expression and waits until the head is idle again.
+        Returns True if it ran to the end, False if another expression cut it
+        off and None if it could not be sent.
+        """
+        replies = self.heads if head == ALL_HEADS else 1
+        try:
+            return await self._send_and_wait(op, arg, flags | COMMAND_FLAG_NOTIFY, head, timeout, replies)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            super().stop_expression(head)
+            raise
+
+    async def get_command_latency(self, timeout=1.0, head=0):
+        """Async version of `EyesController.get_command_latency()`."""
+        try: return await self._send_and_wait(CommandOp.GET_LATENCY, head=head, timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"EyesController: No reply to command {CommandOp.GET_LATENCY} within {timeout}s.")
+            return None
+
+    async def get_stats(self, timeout=1.0, head=0):
+        """Async version of `EyesController.get_stats()`."""
+        try: return await self._send_and_wait(CommandOp.GET_STATS, head=head, timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"EyesController: No reply to command {CommandOp.GET_STATS} within {timeout}s.")
+            return None
+
+    async def profile(self, duration_ms=5000, head=0, timeout=None):
+        """Async version of `EyesController.profile()`."""
+        if timeout is None:
+            timeout = duration_ms / 1000 + 2
+        try: return await self._send_and_wait(CommandOp.PROFILE, int(duration_ms), head=head, timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"EyesController: No reply to command {CommandOp.PROFILE} within {timeout}s.")
+            return None
+
+    async def trigger_laugh(self, head=0, timeout=None):
+        """
+        Triggers the laughing animation and waits until it is over.
+
+        Args:
+            head (int, optional): Id of the head to animate, or ALL_HEADS.
+                Defaults to 0.
+            timeout (float, optional): Seconds to wait before stopping the
+                expression and raising `asyncio.TimeoutError`. None waits
+                until the expression ends.
+
+        Returns:
+            bool: True if the expression ran to the end, False if another
+            expression cut it off, None if it could not be sent.
+        """
+        return await self._await_expression(CommandOp.LAUGH, head=head, timeout=timeout)
+
+    async def trigger_smile(self, duration_ms=None, head=0, timeout=None):
+        """Triggers the smiling animation and waits until it is over. See `trigger_laugh()`."""
+        return await self._await_expression(CommandOp.SMILE, duration_ms, head=head, timeout=timeout)
+
+    async def trigger_star(self, duration_ms=None, head=0, timeout=None):
+        """Triggers the star-eyes animation and waits until it is over. See `trigger_laugh()`."""
+        return await self._await_expression(CommandOp.STAR, duration_ms, head=head, timeout=timeout)
+
+    async def trigger_concentrate(self, duration_ms=None, indefinite=False, head=0, timeout=None):
+        """
+        Triggers the concentrating animation and waits until it is over,
+        i.e. until `stop_concentrate()` for an indefinite one. See `trigger_laugh()`.
+        """
+        if indefinite:
+            return await self._await_expression(CommandOp.CONCENTRATE, flags=COMMAND_FLAG_INDEFINITE, head=head,
+                                                timeout=timeout)
+        return await self._await_expression(CommandOp.CONCENTRATE, duration_ms, head=head, timeout=timeout)
+
+    async def stop_concentrate(self, head=0, timeout=None):
+        """Stops an ongoing 'concentrate' animation and waits until the eyes are idle."""
+        return await self._await_expression(CommandOp.STOP_CONCENTRATE, head=head, timeout=timeout)
+
+    async def stop_expression(self, head=0, timeout=None):
+        """Stops the running animation and waits until the eyes are idle."""
+        return await self._await_expression(CommandOp.STOP_EXPRESSION, head=head, timeout=timeout)
+
+    async def trigger_expression(self, name, duration_ms=None, head=0, timeout=None):
+        """Triggers a registered expression by name and waits until it is over. See `trigger_laugh()`."""
+        if name not in EXPRESSION_OPS:
+            print(f"EyesController: Unknown expression '{name}'.")
+            return None
+        return await self._await_expression(EXPRESSION_OPS[name], duration_ms, head=head, timeout=timeout)
\ No newline at end of file
@@ -0,0 +1,75 @@
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import time
+
+# Keep pygame's import banner out of the --json output
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from monkey_eyes_lib import SessionPlayer, replay_session
+
+"""
+Replays a recorded Monkey Eyes session headless and faster than real time.
+
+Sessions are recorded with `EyesController(record_session="session.meyl")`
+(or `MonkeyEyeApp(..., record_path=...)`). The replay renders every frame of
+the session on a simulated clock without sleeping and reports how long it
+took plus the frame timings per phase and animation state, optionally under
+cProfile.
+
+Usage:
+    python replay_eyes.py session.meyl
+    python replay_eyes.py session.meyl --profile 20
+    python replay_eyes.py session.meyl --dirty-rects --json
+"""
+
+
+def print_report(duration_ms, wall_time, stats):
+    print(f"Session: {duration_ms / 1000:.1f} s, {stats['frames']} frames")
+    speedup = duration_ms / 1000 / wall_time if wall_time > 0 else float("inf")
+    print(f"Replayed in {wall_time:.2f} s ({speedup:.0f}x real time)")
+    print(f"{'':<15}{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    rows = [("frame", stats["frame"])] + list(stats["phases"].items()) + list(stats["states"].items())
+    for name, timing in rows:
+        if timing["count"]:
+            print(f"{name:<15}{timing['mean_ms']:>10.3f}{timing['p95_ms']:>10.3f}{timing['max_ms']:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded Monkey Eyes session headless.")
+    parser.add_argument("log", help="Session log to replay")
+    parser.add_argument("--fps", type=float, default=60, help="Simulated frame rate (default: 60)")
+    parser.add_argument("--dirty-rects", action="store_true", default=None, help="Replay in dirty-rectangle mode")
+    parser.add_argument("--baked", action="store_true", default=None, help="Replay with baked animations")
+    parser.add_argument("--render-scale", type=float, help="Override the recorded render scale")
+    parser.add_argument("--profile", type=int, metavar="N", help="Run under cProfile and print the top N functions")
+    parser.add_argument("--json", action="store_true", help="Print the frame timings as JSON")
+    args = parser.parse_args()
+
+    player = SessionPlayer(args.log)
+    duration_ms = player.get_duration_ms()
+    player.close()
+
+    overrides = {"dirty_rects": args.dirty_rects, "baked_animations": args.baked, "render_scale": args.render_scale}
+    overrides = {name: value for name, value in overrides.items() if value is not None}
+    profiler = cProfile.Profile() if args.profile else None
+
+    start = time.perf_counter()
+    if profiler is not None: profiler.enable()
+    app = replay_session(args.log, frame_ms=1000 / args.fps, **overrides)
+    if profiler is not None: profiler.disable()
+    wall_time = time.perf_counter() - start
+
+    stats = app.frame_stats.get_stats()
+    if args.json:
+        print(json.dumps(dict(stats, duration_ms=duration_ms, wall_time_s=wall_time), indent=2))
+    else:
+        print_report(duration_ms, wall_time, stats)
+    if profiler is not None:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(args.profile)
+
+
+if __name__ == "__main__":
+    main()
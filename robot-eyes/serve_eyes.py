@@ -0,0 +1,34 @@
+import argparse
+
+from monkey_eyes_lib import MonkeyEyeApp
+
+"""
+Runs the Monkey Eyes as a standalone process with its built-in command
+server, so a backend (e.g. the Node.js one) can start it and send commands
+over a Unix socket, TCP or WebSocket without a Python parent process.
+
+Usage:
+    python serve_eyes.py --address unix:/tmp/monkey_eyes.sock
+    python serve_eyes.py --address tcp:127.0.0.1:8765 --power-saving
+
+See command_client_example.py for the protocol.
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Monkey Eyes with a socket/WebSocket command server.")
+    parser.add_argument("--address", default="tcp:127.0.0.1:8765",
+                        help="unix:<path> or tcp:<host>:<port> (default: tcp:127.0.0.1:8765)")
+    parser.add_argument("--headless", action="store_true", help="Render offscreen without a window")
+    parser.add_argument("--power-saving", action="store_true", help="Stop redrawing while the eyes are idle")
+    parser.add_argument("--dirty-rects", action="store_true", help="Only redraw the areas around the eyes")
+    parser.add_argument("--expression-config", help="JSON or TOML file of custom expressions")
+    args = parser.parse_args()
+
+    app = MonkeyEyeApp(None, command_server=args.address, headless=args.headless, power_saving=args.power_saving,
+                       dirty_rects=args.dirty_rects, expression_config=args.expression_config)
+    app.run_app_loop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import os
+import signal
+import sys
+import time
+
+# Keep pygame's import banner out of the output
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from monkey_eyes_lib import AsyncEyesController
+
+"""
+Recovery check of the renderer watchdog.
+
+Starts an AsyncEyesController with the watchdog, awaits an expression,
+kills the eye process with SIGKILL and waits for the watchdog to bring a
+new one up. Then awaits another expression, which only resolves if the
+replies of the new process still reach the controller.
+
+Usage:
+    python watchdog_check.py                   # Exit with 1 if a step fails
+    SDL_VIDEODRIVER=dummy python watchdog_check.py
+"""
+
+
+async def wait_for_event(controller, event, timeout):
+    """Waits until the watchdog reported `event`. Returns False on timeout."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if any(entry["event"] == event for entry in controller.get_watchdog_events()):
+            return True
+        await asyncio.sleep(0.05)
+    return False
+
+
+async def run_check(stall_timeout, expression_timeout):
+    """Runs the check and returns the list of failed steps."""
+    failures = []
+    controller = AsyncEyesController(watchdog=True, stall_timeout=stall_timeout)
+    if not await controller.start_eyes(wait=True):
+        return ["eyes did not start"]
+    try:
+        if await controller.trigger_smile(300, timeout=expression_timeout) is not True:
+            failures.append("smile before the restart did not complete")
+        os.kill(controller.eye_processes[0].pid, signal.SIGKILL)
+        if not await wait_for_event(controller, "recovered", controller.startup_timeout + stall_timeout):
+            failures.append("watchdog did not recover the killed renderer")
+            return failures
+        try:
+            if await controller.trigger_smile(300, timeout=expression_timeout) is not True:
+                failures.append("smile after the restart did not complete")
+        except asyncio.TimeoutError:
+            failures.append(f"no reply to the smile after the restart within {expression_timeout}s")
+    finally:
+        await controller.stop_eyes()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the watchdog recovers a killed renderer.")
+    parser.add_argument("--stall-timeout", type=float, default=1.0,
+                        help="Stall timeout of the watchdog in seconds (default: 1.0)")
+    parser.add_argument("--expression-timeout", type=float, default=5.0,
+                        help="Seconds an awaited expression may take (default: 5.0)")
+    args = parser.parse_args()
+
+    failures = asyncio.run(run_check(args.stall_timeout, args.expression_timeout))
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    print("Watchdog check " + ("failed" if failures else "passed"))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()